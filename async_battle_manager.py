@@ -1,10 +1,15 @@
 import asyncio
 from typing import Optional, Dict, Any
 
+from pacing import resolve_clock
+from metrics import resolve_metrics
+
 class AsyncBattleManager:
     """Battle system for Pokemon trainer battles."""
     
-    def __init__(self):
+    def __init__(self, clock=None, metrics=None):
+        self.clock = resolve_clock(clock)
+        self.metrics = resolve_metrics(metrics)
         self.battle_active = False
         self.current_animations = []
         self.status_effects = {}
@@ -25,12 +30,12 @@ class AsyncBattleManager:
         
         for message in messages:
             print(f"📢 {message}")
-            await asyncio.sleep(1.2)
+            await self.clock.sleep(1.2)
     
     async def execute_move(self, attacker, defender, move_name):
         print(f"\n⚡ {attacker.name} uses {move_name}!")
         
-        await asyncio.sleep(0.8)
+        await self.clock.sleep(0.8)
         
         damage = self.calculate_move_damage(attacker, move_name)
         
@@ -40,32 +45,39 @@ class AsyncBattleManager:
     
     async def damage_animation(self, pokemon, damage):
         print(f"💥 {pokemon.name} takes {damage} damage!")
-        await asyncio.sleep(0.6)
+        await self.clock.sleep(0.6)
         
         pokemon.current_hp = max(0, pokemon.current_hp - damage)
         
         print(f"❤️  {pokemon.name}: {pokemon.current_hp}/{pokemon.max_hp} HP")
-        await asyncio.sleep(0.4)
+        await self.clock.sleep(0.4)
     
     async def battle_loop(self, pokemon1, pokemon2):
+        metrics = self.metrics
+        metrics.count("battles_total")
         turn = 1
         
         while self.battle_active and pokemon1.current_hp > 0 and pokemon2.current_hp > 0:
+            turn_started = metrics.start()
+            metrics.count("turns_total")
             print(f"\n🔄 Turn {turn}")
-            await asyncio.sleep(0.5)
+            await self.clock.sleep(0.5)
             
             if pokemon1.current_hp > 0:
                 await self.pokemon_turn(pokemon1, pokemon2)
                 if pokemon2.current_hp <= 0:
+                    metrics.stop_turn(turn_started)
                     break
             
             if pokemon2.current_hp > 0:
                 await self.pokemon_turn(pokemon2, pokemon1)
                 if pokemon1.current_hp <= 0:
+                    metrics.stop_turn(turn_started)
                     break
             
             turn += 1
-            await asyncio.sleep(1)
+            await self.clock.sleep(1)
+            metrics.stop_turn(turn_started)
         
         winner = pokemon1 if pokemon1.current_hp > 0 else pokemon2
         await self.battle_end_animation(winner)
@@ -73,11 +85,14 @@ class AsyncBattleManager:
     
     async def pokemon_turn(self, attacker, defender):
         move = "Tackle"
+        self.metrics.count("moves_total", move)
+        started = self.metrics.start()
         await self.execute_move(attacker, defender, move)
+        self.metrics.stop("move", started)
     
     async def battle_end_animation(self, winner):
         print(f"\n🎉 {winner.name} wins the battle!")
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
         print("Battle concluded!")
     
     def calculate_move_damage(self, pokemon, move_name):
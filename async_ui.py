@@ -1,33 +1,78 @@
 import asyncio
-import sys
+import functools
 from typing import List, Optional, Tuple
 
+from pacing import resolve_clock
+from battle_ai import BattleAI
+from game_input import resolve_input
+from renderer import FrameRenderer
+from rng_streams import resolve_rng
+from metrics import resolve_metrics
+from moves import MOVES, remaining_pp
+
+@functools.lru_cache(maxsize=1024)
+def health_bar(hp_percent: float, length: int = 20) -> str:
+    filled = int(hp_percent * length)
+    empty = length - filled
+    
+    if hp_percent > 0.5:
+        bar_char = "🟢"
+    elif hp_percent > 0.25:
+        bar_char = "🟡"
+    else:
+        bar_char = "🔴"
+    
+    return bar_char * filled + "⬜" * empty
+
+def status_names(pokemon) -> List[str]:
+    if not getattr(pokemon, 'status_effects', None):
+        return []
+    if isinstance(pokemon.status_effects, dict):
+        return list(pokemon.status_effects.keys())
+    return [effect.effect_type.value for effect in pokemon.status_effects]
+
+BATTLE_MENU_LINES = [
+    "",
+    "="*50,
+    "🎮 What will you do?",
+    "="*50,
+    "1. 👊 Attack",
+    "2. 🎒 Items",
+    "3. 🔄 Switch Pokemon",
+    "4. 🏃 Run Away",
+    "="*50,
+]
+
 class AsyncUI:
     """Interactive battle interface for Pokemon games."""
     
-    def __init__(self):
+    def __init__(self, clock=None, output=None, refresh_rate: float = 30.0,
+                 animate: Optional[bool] = None, input_timeout: Optional[float] = None, metrics=None):
+        self.clock = resolve_clock(clock)
+        self.metrics = resolve_metrics(metrics)
         self.input_queue = asyncio.Queue()
+        self.prompt = None
+        self.prompted = asyncio.Event()
+        self.input_source = None
+        self.input_task = None
+        self.input_closed = False
+        self.input_timeout = input_timeout
         self.display_lock = asyncio.Lock()
+        self.renderer = FrameRenderer(output, refresh_rate, animate=animate)
+    
+    def display(self):
+        """The display lock, wrapped for timing when metrics are on."""
+        return self.metrics.display(self.display_lock)
     
     async def display_battle_menu(self, pokemon, opponent) -> str:
-        async with self.display_lock:
-            self.clear_screen()
-            await self.display_battle_status(pokemon, opponent)
-            
-            print("\n" + "="*50)
-            print("🎮 What will you do?")
-            print("="*50)
-            print("1. 👊 Attack")
-            print("2. 🎒 Items") 
-            print("3. 🔄 Switch Pokemon")
-            print("4. 🏃 Run Away")
-            print("="*50)
+        async with self.display():
+            self.renderer.draw_panel(self.battle_status_lines(pokemon, opponent) + BATTLE_MENU_LINES)
         
         choice = await self.get_user_input("Choose an action (1-4): ")
         return choice
     
     async def display_move_menu(self, pokemon) -> Tuple[str, int]:
-        async with self.display_lock:
+        async with self.display():
             print("\n" + "="*40)
             print(f"🎯 {pokemon.name}'s Moves:")
             print("="*40)
@@ -36,8 +81,10 @@ class AsyncUI:
             
             for i, move in enumerate(moves, 1):
                 pp_info = ""
-                if hasattr(pokemon, 'move_pp') and move in pokemon.move_pp:
-                    pp_info = f" (PP: {pokemon.move_pp[move]})"
+                entry = MOVES.get(move)
+                left = None if entry is None else remaining_pp(pokemon, entry)
+                if left is not None:
+                    pp_info = f" (PP: {left}/{entry.max_pp})"
                 print(f"{i}. {move}{pp_info}")
             
             print("0. ← Back to main menu")
@@ -57,71 +104,113 @@ class AsyncUI:
                 print("❌ Please enter a number!")
     
     async def display_battle_status(self, pokemon, opponent):
-        opponent_hp_percent = opponent.current_hp / opponent.max_hp
-        opponent_bar = self.create_health_bar(opponent_hp_percent)
-        
-        print(f"\n🔴 {opponent.name}")
-        print(f"❤️  HP: {opponent_bar} {opponent.current_hp}/{opponent.max_hp}")
-        
-        if hasattr(opponent, 'status_effects') and opponent.status_effects:
-            if isinstance(opponent.status_effects, list):
-                effects = [effect.effect_type.value for effect in opponent.status_effects]
-            else:
-                effects = list(opponent.status_effects.keys())
-            print(f"🌟 Status: {', '.join(effects)}")
-        
-        print("\n" + "─"*50)
-        
-        player_hp_percent = pokemon.current_hp / pokemon.max_hp
-        player_bar = self.create_health_bar(player_hp_percent)
-        
-        print(f"🔵 {pokemon.name}")
-        print(f"❤️  HP: {player_bar} {pokemon.current_hp}/{pokemon.max_hp}")
+        print("\n".join(self.battle_status_lines(pokemon, opponent)))
+    
+    def battle_status_lines(self, pokemon, opponent) -> List[str]:
+        lines = ["", f"🔴 {opponent.name}",
+                 f"❤️  HP: {self.create_health_bar(opponent.current_hp / opponent.max_hp)} "
+                 f"{opponent.current_hp}/{opponent.max_hp}"]
+        effects = status_names(opponent)
+        if effects:
+            lines.append(f"🌟 Status: {', '.join(effects)}")
         
-        if hasattr(pokemon, 'status_effects') and pokemon.status_effects:
-            if isinstance(pokemon.status_effects, list):
-                effects = [effect.effect_type.value for effect in pokemon.status_effects]
-            else:
-                effects = list(pokemon.status_effects.keys())
-            print(f"🌟 Status: {', '.join(effects)}")
+        lines += ["", "─"*50, f"🔵 {pokemon.name}",
+                  f"❤️  HP: {self.create_health_bar(pokemon.current_hp / pokemon.max_hp)} "
+                  f"{pokemon.current_hp}/{pokemon.max_hp}"]
+        effects = status_names(pokemon)
+        if effects:
+            lines.append(f"🌟 Status: {', '.join(effects)}")
+        return lines
     
     def create_health_bar(self, hp_percent: float, length: int = 20) -> str:
-        filled = int(hp_percent * length)
-        empty = length - filled
+        return health_bar(hp_percent, length)
+    
+    async def get_user_input(self, prompt: str, timeout: Optional[float] = None) -> str:
+        print(prompt, end="", flush=True)
         
-        if hp_percent > 0.5:
-            bar_char = "🟢"
-        elif hp_percent > 0.25:
-            bar_char = "🟡"
-        else:
-            bar_char = "🔴"
+        if self.input_task is None:
+            self.attach_input()
+        if self.input_closed and self.input_queue.empty():
+            raise EOFError("input closed")
         
-        return bar_char * filled + "⬜" * empty
+        self.prompt = prompt
+        self.prompted.set()
+        timeout = timeout if timeout is not None else self.input_timeout
+        started = self.metrics.start()
+        line = await asyncio.wait_for(self.input_queue.get(), timeout)
+        self.metrics.stop("input_wait", started)
+        if line is None:
+            self.input_queue.put_nowait(None)
+            raise EOFError("input closed")
+        self.renderer.echoed_line()
+        return line
     
-    async def get_user_input(self, prompt: str) -> str:
-        print(prompt, end="", flush=True)
+    def attach_input(self, source=None, type_ahead: int = 16):
+        """Start feeding ``input_queue`` from a terminal, script, or stream source.
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, input)
+        Lines typed ahead of the next prompt wait in the queue; beyond
+        ``type_ahead`` of them, further lines from a terminal or socket are
+        dropped, while scripted sources simply wait for room.
+        """
+        self.close_input()
+        self.input_source = resolve_input(source)
+        self.input_queue = asyncio.Queue(type_ahead)
+        self.input_closed = False
+        self.input_task = asyncio.get_running_loop().create_task(self.pump_input(self.input_source))
+    
+    async def pump_input(self, source):
+        queue = self.input_queue
+        drops = getattr(source, 'drops_type_ahead', True)
+        try:
+            while True:
+                line = await source.readline()
+                if line is None:
+                    break
+                if not drops:
+                    await queue.put(line)
+                elif queue.full():
+                    self.renderer.write("\n⚠️  Too much type-ahead; input dropped.\n")
+                else:
+                    queue.put_nowait(line)
+        finally:
+            if self.input_task is asyncio.current_task():
+                self.input_closed = True
+                if not queue.full():
+                    queue.put_nowait(None)
+    
+    def close_input(self):
+        if self.input_task is not None:
+            self.input_task.cancel()
+            self.input_source.close()
+            self.input_task = None
+            self.input_source = None
     
     def clear_screen(self):
-        print("\033[2J\033[H", end="")
+        self.renderer.clear_screen()
     
     async def display_message(self, message: str, delay: float = 1.0):
-        async with self.display_lock:
+        async with self.display():
+            await self.renderer.drain()
             print(message)
             if delay > 0:
-                await asyncio.sleep(delay)
+                await self.clock.sleep(delay)
     
     async def type_message(self, message: str, delay: float = 0.03):
-        async with self.display_lock:
+        async with self.display():
+            await self.renderer.drain()
+            if not self.renderer.animate:
+                print(message)
+                await self.clock.sleep(delay * len(message))
+                return
+            
+            flush = not self.renderer.active
             for char in message:
-                print(char, end="", flush=True)
-                await asyncio.sleep(delay)
+                print(char, end="", flush=flush)
+                await self.clock.sleep(delay)
             print()
     
     async def display_pokemon_info(self, pokemon):
-        async with self.display_lock:
+        async with self.display():
             print(f"\n📋 {pokemon.name} Info:")
             print("─" * 30)
             print(f"❤️  HP: {pokemon.current_hp}/{pokemon.max_hp}")
@@ -132,28 +221,35 @@ class AsyncUI:
             if hasattr(pokemon, 'pokemon_type'):
                 print(f"🏷️  Type: {pokemon.pokemon_type}")
             
-            if hasattr(pokemon, 'status_effects') and pokemon.status_effects:
-                if isinstance(pokemon.status_effects, list):
-                    effects = [effect.effect_type.value for effect in pokemon.status_effects]
-                else:
-                    effects = list(pokemon.status_effects.keys())
+            effects = status_names(pokemon)
+            if effects:
                 print(f"🌟 Status Effects: {', '.join(effects)}")
 
 class InteractiveBattleSystem:
     """Real-time battle system with player interaction."""
     
-    def __init__(self):
-        self.ui = AsyncUI()
+    def __init__(self, clock=None, rng=None, difficulty="normal"):
+        self.clock = resolve_clock(clock)
+        self.rng = resolve_rng(rng)
+        self.ui = AsyncUI(self.clock)
+        self.ai = BattleAI(difficulty)
         self.battle_active = False
     
     async def start_interactive_battle(self, player_pokemon, opponent_pokemon):
+        try:
+            async with self.ui.renderer:
+                await self.run_battle(player_pokemon, opponent_pokemon)
+        finally:
+            self.ui.close_input()
+    
+    async def run_battle(self, player_pokemon, opponent_pokemon):
         self.battle_active = True
         
         await self.ui.type_message("🔥 A wild Pokemon appears!", 0.05)
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
         
         await self.ui.type_message(f"Go, {player_pokemon.name}!", 0.05)
-        await asyncio.sleep(1.5)
+        await self.clock.sleep(1.5)
         
         while (self.battle_active and 
                player_pokemon.current_hp > 0 and 
@@ -193,12 +289,12 @@ class InteractiveBattleSystem:
             
             elif action == "2":
                 await self.ui.display_message("🎒 No items available in this demo!")
-                await asyncio.sleep(1)
+                await self.clock.sleep(1)
                 continue
             
             elif action == "3":
                 await self.ui.display_message("🔄 No other Pokemon available!")
-                await asyncio.sleep(1)
+                await self.clock.sleep(1)
                 continue
             
             elif action == "4":
@@ -208,37 +304,42 @@ class InteractiveBattleSystem:
             
             else:
                 await self.ui.display_message("❌ Invalid choice! Please try again.")
-                await asyncio.sleep(1)
+                await self.clock.sleep(1)
     
     async def execute_player_attack(self, attacker, defender, move_name):
         await self.ui.type_message(f"⚡ {attacker.name} uses {move_name}!")
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
         
-        base_damage = getattr(attacker, 'attack', 50)
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
+        from battle_rules import roll_damage
+        from moves import MOVES
+        from type_chart import TYPE_CHART, scale_damage
+        
+        damage = scale_damage(roll_damage(getattr(attacker, 'attack', 50), self.rng),
+                              TYPE_CHART.move_multiplier(attacker, defender, MOVES.ids.get(move_name)))
         
         defender.current_hp = max(0, defender.current_hp - damage)
         
         await self.ui.type_message(f"💥 {defender.name} takes {damage} damage!")
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
     
     async def opponent_turn(self, opponent, player_pokemon):
         await self.ui.type_message(f"🤖 {opponent.name} is thinking...")
-        await asyncio.sleep(1.5)
-        
-        moves = getattr(opponent, 'moves', ['Tackle', 'Scratch'])
-        chosen_move = random.choice(moves)
+        chosen_move = (await self.ai.choose_move_async(opponent, player_pokemon)).move
         
         await self.ui.type_message(f"⚡ {opponent.name} uses {chosen_move}!")
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
+        
+        from battle_rules import roll_damage
+        from moves import MOVES
+        from type_chart import TYPE_CHART, scale_damage
         
-        base_damage = getattr(opponent, 'attack', 45)
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
+        damage = scale_damage(roll_damage(getattr(opponent, 'attack', 45), self.rng),
+                              TYPE_CHART.move_multiplier(opponent, player_pokemon, MOVES.ids.get(chosen_move)))
         
         player_pokemon.current_hp = max(0, player_pokemon.current_hp - damage)
         
         await self.ui.type_message(f"💢 {player_pokemon.name} takes {damage} damage!")
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
 
 async def test_interactive_battle():
     from pokemon import Pokemon
@@ -250,6 +351,5 @@ async def test_interactive_battle():
     await battle_system.start_interactive_battle(pikachu, wild_pokemon)
 
 if __name__ == "__main__":
-    import random
     print("🧪 Testing Interactive Battle System")
     asyncio.run(test_interactive_battle())
\ No newline at end of file
@@ -0,0 +1,215 @@
+import time
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from pokemon import Pokemon
+from status_effects import StatusType
+from battle_rules import (CRITICAL_CHANCE, DAMAGE_ROLL_HIGH, DAMAGE_ROLL_LOW, DEFAULT_MOVES,
+                          MOVE_STATUS_CHANCE, MOVE_STATUS_EFFECTS, MOVE_STATUS_TURNS,
+                          PARALYSIS_SKIP_CHANCE, move_effect, run_battle)
+from moves import MOVES
+from type_chart import TYPE_CHART
+
+STATUS_SLOTS = (StatusType.POISON, StatusType.BURN, StatusType.PARALYSIS, StatusType.SLEEP)
+STATUS_INDEX = {status: index for index, status in enumerate(STATUS_SLOTS)}
+POISON, BURN, PARALYSIS, SLEEP = range(len(STATUS_SLOTS))
+MAX_MOVES = 4
+
+# Each status slot holds the turns left on that condition. Re-applying an
+# active status keeps the longer duration, matching StatusStore.add.
+
+class BatchResult(NamedTuple):
+    wins: np.ndarray
+    unfinished: int
+    turn_histogram: np.ndarray
+
+    @property
+    def battles(self) -> int:
+        return int(self.wins.sum()) + self.unfinished
+
+    def win_rate(self, side: int = 0) -> float:
+        return float(self.wins[side]) / max(1, self.battles)
+
+    def mean_turns(self) -> float:
+        turns = np.arange(len(self.turn_histogram))
+        return float((turns * self.turn_histogram).sum()) / max(1, self.turn_histogram.sum())
+
+def as_pokemon(spec) -> Pokemon:
+    if isinstance(spec, Pokemon):
+        return spec
+    return Pokemon(*spec)
+
+def move_status_row(pokemon) -> list:
+    moves = list(getattr(pokemon, 'moves', DEFAULT_MOVES))[:MAX_MOVES]
+    row = [-1] * MAX_MOVES
+    for slot, move in enumerate(moves):
+        status_type = move_effect(MOVE_STATUS_EFFECTS, move)
+        if status_type is not None:
+            row[slot] = STATUS_INDEX[status_type]
+    return row
+
+def move_multiplier_row(attacker, defender) -> list:
+    moves = list(getattr(attacker, 'moves', DEFAULT_MOVES))[:MAX_MOVES]
+    row = [1.0] * MAX_MOVES
+    for slot, move in enumerate(moves):
+        row[slot] = TYPE_CHART.move_multiplier(attacker, defender, MOVES.ids.get(move))
+    return row
+
+class BatchBattleSimulator:
+    """Advances many independent 1v1 battles one turn at a time on NumPy arrays."""
+
+    def __init__(self, seed=None, max_turns: int = 500):
+        self.rng = np.random.default_rng(seed)
+        self.max_turns = max_turns
+
+    def simulate(self, pokemon1, pokemon2, battles: int) -> BatchResult:
+        return self.simulate_pairs([(pokemon1, pokemon2)], battles)[0]
+
+    def simulate_pairs(self, pairs: Sequence, battles_per_pair: int):
+        pairs = [(as_pokemon(first), as_pokemon(second)) for first, second in pairs]
+        pair_ids = np.repeat(np.arange(len(pairs)), battles_per_pair)
+        winners, turns = self.run(self.build_arrays(pairs, pair_ids))
+
+        results = []
+        for pair_index in range(len(pairs)):
+            mask = pair_ids == pair_index
+            pair_winners = winners[mask]
+            finished = pair_winners >= 0
+            results.append(BatchResult(
+                wins=np.bincount(pair_winners[finished], minlength=2),
+                unfinished=int((~finished).sum()),
+                turn_histogram=np.bincount(turns[mask][finished], minlength=self.max_turns + 2),
+            ))
+        return results
+
+    def build_arrays(self, pairs, pair_ids) -> dict:
+        def column(getter, dtype=np.int32):
+            table = np.array([[getter(first), getter(second)] for first, second in pairs], dtype=dtype)
+            return table[pair_ids]
+
+        move_counts = column(lambda p: min(MAX_MOVES, len(getattr(p, 'moves', DEFAULT_MOVES))))
+        move_status = np.array([[move_status_row(first), move_status_row(second)]
+                                for first, second in pairs], dtype=np.int8)[pair_ids]
+        move_multiplier = np.array([[move_multiplier_row(first, second), move_multiplier_row(second, first)]
+                                    for first, second in pairs])[pair_ids]
+        speed = column(lambda p: p.speed)
+
+        return {
+            "hp": column(lambda p: p.current_hp),
+            "tick_damage": column(lambda p: p.max_hp // 16),
+            "damage_low": column(lambda p: int(getattr(p, 'attack', 50) * DAMAGE_ROLL_LOW)),
+            "damage_high": column(lambda p: int(getattr(p, 'attack', 50) * DAMAGE_ROLL_HIGH)),
+            "move_counts": move_counts,
+            "move_status": move_status,
+            "move_multiplier": move_multiplier,
+            "first": (speed[:, 0] < speed[:, 1]).astype(np.int8),
+            "status": np.zeros((len(pair_ids), 2, len(STATUS_SLOTS)), dtype=np.uint8),
+        }
+
+    def run(self, arrays: dict):
+        hp = arrays["hp"]
+        status = arrays["status"]
+        first = arrays["first"]
+        battles = len(hp)
+
+        winners = np.full(battles, -1, dtype=np.int8)
+        turns = np.zeros(battles, dtype=np.int32)
+        active = np.flatnonzero((hp[:, 0] > 0) & (hp[:, 1] > 0))
+        turn = 1
+
+        while len(active) and turn <= self.max_turns:
+            attacker = first[active]
+            self.attack(arrays, active, attacker)
+
+            knocked_out = hp[active, 1 - attacker] <= 0
+            finished = active[knocked_out]
+            winners[finished] = attacker[knocked_out]
+            turns[finished] = turn
+            active = active[~knocked_out]
+
+            attacker = 1 - first[active]
+            self.attack(arrays, active, attacker)
+
+            self.tick(arrays, active)
+
+            turn += 1
+            ended = (hp[active, 0] <= 0) | (hp[active, 1] <= 0)
+            finished = active[ended]
+            winners[finished] = np.where(hp[finished, 0] > 0, 0, 1)
+            turns[finished] = turn
+            active = active[~ended]
+
+        return winners, turns
+
+    def attack(self, arrays: dict, battles: np.ndarray, attacker: np.ndarray):
+        if not len(battles):
+            return
+        rng = self.rng
+        hp = arrays["hp"]
+        status = arrays["status"]
+
+        moves = (rng.random(len(battles)) * arrays["move_counts"][battles, attacker]).astype(np.intp)
+
+        paralyzed = status[battles, attacker, PARALYSIS] != 0
+        moving = ~(paralyzed & (rng.random(len(battles)) < PARALYSIS_SKIP_CHANCE))
+        battles, attacker, moves = battles[moving], attacker[moving], moves[moving]
+        defender = 1 - attacker
+
+        damage = rng.integers(arrays["damage_low"][battles, attacker],
+                              arrays["damage_high"][battles, attacker] + 1)
+        damage = np.maximum(1, (damage * arrays["move_multiplier"][battles, attacker, moves]).astype(np.int64))
+        critical = rng.random(len(battles)) < CRITICAL_CHANCE
+        damage = np.where(critical, damage * 3 // 2, damage)
+        hp[battles, defender] = np.maximum(0, hp[battles, defender] - damage)
+
+        inflicted = arrays["move_status"][battles, attacker, moves]
+        applied = (inflicted >= 0) & (rng.random(len(battles)) < MOVE_STATUS_CHANCE)
+        slots = (battles[applied], defender[applied], inflicted[applied])
+        status[slots] = np.maximum(status[slots], MOVE_STATUS_TURNS)
+
+    def tick(self, arrays: dict, battles: np.ndarray):
+        if not len(battles):
+            return
+        hp = arrays["hp"]
+        status = arrays["status"]
+
+        for side in (0, 1):
+            turns_left = status[battles, side]
+            damaging = (turns_left[:, POISON] > 0).astype(np.int32) + (turns_left[:, BURN] > 0)
+            hp[battles, side] = np.maximum(0, hp[battles, side] - damaging * arrays["tick_damage"][battles, side])
+            status[battles, side] = np.maximum(turns_left, 1) - 1
+
+def scalar_win_rate(pokemon1, pokemon2, battles: int, seed: int = 0):
+    import random
+
+    rng = random.Random(seed)
+    first, second = as_pokemon(pokemon1), as_pokemon(pokemon2)
+    spec = lambda p: (p.name, p.pokemon_type, p.max_hp, p.attack, p.defense, p.speed)
+    wins = np.zeros(2, dtype=np.int64)
+    total_turns = 0
+
+    for _ in range(battles):
+        state = run_battle(Pokemon(*spec(first)), Pokemon(*spec(second)), rng)
+        wins[state.winner] += 1
+        total_turns += state.turn
+    return wins, total_turns / battles
+
+def test_batch_sim():
+    pikachu = ("Pikachu", "Electric", 100, 55, 40, 90)
+    charmander = ("Charmander", "Fire", 95, 52, 43, 65)
+    simulator = BatchBattleSimulator(seed=1)
+
+    start = time.perf_counter()
+    result = simulator.simulate(pikachu, charmander, 1_000_000)
+    elapsed = time.perf_counter() - start
+
+    print(f"🎲 {result.battles:,} battles in {elapsed:.2f}s ({result.battles / elapsed:,.0f} battles/s)")
+    print(f"🏆 Pikachu win rate: {result.win_rate(0):.4f}, mean turns: {result.mean_turns():.3f}")
+
+    wins, mean_turns = scalar_win_rate(pikachu, charmander, 20_000)
+    print(f"🐍 Scalar engine win rate: {wins[0] / wins.sum():.4f}, mean turns: {mean_turns:.3f}")
+
+if __name__ == "__main__":
+    print("🧪 Testing Batch Battle Simulator")
+    test_batch_sim()
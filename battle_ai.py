@@ -0,0 +1,483 @@
+import asyncio
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from battle_rules import (ARENA_SIDE_EFFECTS, DAMAGE_ROLL_HIGH, DAMAGE_ROLL_LOW, PARALYSIS_SKIP_CHANCE,
+                          SPECIAL_DAMAGE_HIGH, SPECIAL_DAMAGE_LOW, SPECIAL_SIDE_EFFECTS, move_effect,
+                          status_store)
+from effect_rules import RULES
+from moves import MOVES, SPECIAL_MOVES, UNLIMITED_PP, remaining_pp
+from status_effects import STATUS_INDEX, STATUS_ORDER, StatusType
+from type_chart import NEUTRAL, TYPE_CHART, scale_damage
+
+AI, FOE = 0, 1
+NO_STATUS = -1
+WIN, LOSS = 1.0, -1.0
+# Terminal values move by this much per attack of depth left, so sooner wins and later losses score better.
+DEPTH_BONUS = 0.001
+
+POISON = STATUS_INDEX[StatusType.POISON.value]
+BURN = STATUS_INDEX[StatusType.BURN.value]
+PARALYSIS = STATUS_INDEX[StatusType.PARALYSIS.value]
+SLEEP = STATUS_INDEX[StatusType.SLEEP.value]
+FREEZE = STATUS_INDEX[StatusType.FREEZE.value]
+CONFUSION = STATUS_INDEX[StatusType.CONFUSION.value]
+FREEZE_CURE_CHANCE = RULES.statuses[FREEZE].chance
+CONFUSION_SELF_HIT_CHANCE = RULES.statuses[CONFUSION].chance
+CONFUSION_ATTACK_DIVISOR = RULES.statuses[CONFUSION].divisor
+# The arena deals max_hp // (divisor - severity) per turn; the model assumes severity 1.
+POISON_DIVISOR = RULES.statuses[POISON].divisor - 1
+
+class SearchBudget(NamedTuple):
+    max_depth: int
+    max_nodes: int
+    time_limit: float
+
+# Depth is counted in single attacks, so depth 2 is one full exchange.
+DIFFICULTY_BUDGETS = {
+    "easy": SearchBudget(1, 500, 0.01),
+    "normal": SearchBudget(3, 5_000, 0.05),
+    "hard": SearchBudget(6, 50_000, 0.25),
+    "expert": SearchBudget(12, 400_000, 1.0),
+}
+
+class Outcome(NamedTuple):
+    chance: float
+    damage: int
+    status: int
+    turns: int
+    hits_attacker: bool
+
+class Combatant(NamedTuple):
+    max_hp: int
+    attack: int
+    speed: int
+    moves: Tuple[str, ...]
+    typing: int = NEUTRAL
+
+class SearchResult(NamedTuple):
+    move: str
+    value: float
+    depth: int
+    nodes: int
+    seconds: float
+    table_probes: int
+    table_hits: int
+    move_values: Tuple[Tuple[str, float], ...]
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.table_hits / self.table_probes if self.table_probes else 0.0
+
+class SearchExhausted(Exception):
+    pass
+
+def damage_buckets(low: int, high: int, buckets: int) -> List[Tuple[float, int]]:
+    """Split a uniform damage roll into ``buckets`` equally likely ranges, each at its mean."""
+    rolls = high - low + 1
+    buckets = min(buckets, rolls)
+    result = []
+    for index in range(buckets):
+        start = low + index * rolls // buckets
+        stop = low + (index + 1) * rolls // buckets
+        result.append(((stop - start) / rolls, round((start + stop - 1) / 2)))
+    return result
+
+def move_outcomes(attack: int, move: str, buckets: int, multiplier: float = 1.0) -> Tuple[Outcome, ...]:
+    """What ``move`` can do when it is used, following the rules the game resolves it with.
+
+    ``multiplier`` is the type chart's multiplier for this move against the defender.
+    """
+    special = SPECIAL_MOVES.get(move)
+    status_type = None
+    if special is not None:
+        base = (special.power * attack) // 50
+        rolls = damage_buckets(int(base * SPECIAL_DAMAGE_LOW), int(base * SPECIAL_DAMAGE_HIGH), buckets)
+        rolls = [(chance, scale_damage(max(1, damage), multiplier)) for chance, damage in rolls]
+        hit_chance = min(1.0, special.accuracy / 100)
+        status_type, turns, chance, hits_attacker = SPECIAL_SIDE_EFFECTS[special.id]
+        status_chance = 0.0 if status_type is None else (1.0 if chance is None else chance)
+    else:
+        rolls = damage_buckets(int(attack * DAMAGE_ROLL_LOW), int(attack * DAMAGE_ROLL_HIGH), buckets)
+        rolls = [(chance, scale_damage(damage, multiplier)) for chance, damage in rolls]
+        hit_chance = 1.0
+        effect = move_effect(ARENA_SIDE_EFFECTS, move)
+        status_chance = 0.0
+        if effect is not None:
+            status_type, turns, status_chance, hits_attacker = effect
+
+    outcomes = []
+    if hit_chance < 1.0:
+        outcomes.append(Outcome(1.0 - hit_chance, 0, NO_STATUS, 0, False))
+    for chance, damage in rolls:
+        chance *= hit_chance
+        if status_chance > 0.0:
+            outcomes.append(Outcome(chance * status_chance, damage, STATUS_INDEX[status_type.value],
+                                    turns, hits_attacker))
+        if status_chance < 1.0:
+            outcomes.append(Outcome(chance * (1.0 - status_chance), damage, NO_STATUS, 0, False))
+    return tuple(outcomes)
+
+def status_turns(pokemon) -> Tuple[int, ...]:
+    store = status_store(pokemon)
+    return tuple(max(0, store.turns_remaining(status_type)) for status_type in STATUS_ORDER)
+
+class MatchModel:
+    """Everything the search needs to know about one battle, as plain picklable data.
+
+    Side 0 is the Pokemon the AI plays and side 1 its opponent. The PP left
+    on both sides' PP-limited moves is part of the search state.
+    """
+
+    def __init__(self, ai_pokemon, foe, buckets: int = 3):
+        self.sides = tuple(Combatant(pokemon.max_hp, pokemon.attack, pokemon.speed, tuple(pokemon.moves),
+                                     getattr(pokemon, 'typing', NEUTRAL))
+                           for pokemon in (ai_pokemon, foe))
+        self.pp_moves = tuple((side, move) for side, combatant in enumerate(self.sides)
+                              for move in combatant.moves
+                              if move in MOVES and MOVES[move].max_pp != UNLIMITED_PP)
+        self.pp_index = {side_move: slot for slot, side_move in enumerate(self.pp_moves)}
+        self.outcomes = tuple({move: move_outcomes(side.attack, move, buckets,
+                                                   TYPE_CHART.move_multiplier(side, other, MOVES.ids.get(move)))
+                               for move in side.moves}
+                              for side, other in zip(self.sides, self.sides[::-1]))
+        self.tick_damage = tuple(max(1, side.max_hp // POISON_DIVISOR) for side in self.sides)
+        # The game resolves the player's attack first on a speed tie.
+        self.first = FOE if self.sides[FOE].speed >= self.sides[AI].speed else AI
+        self.key = (self.sides, buckets)
+
+    def initial_pp(self, ai_pokemon, foe) -> Tuple[int, ...]:
+        pokemon = (ai_pokemon, foe)
+        left = (remaining_pp(pokemon[side], MOVES[move]) for side, move in self.pp_moves)
+        return tuple(MOVES[move].max_pp if pp is None else pp
+                     for (side, move), pp in zip(self.pp_moves, left))
+
+    def legal_moves(self, side: int, pp: Tuple[int, ...]) -> Sequence[str]:
+        moves = self.sides[side].moves
+        pp_index = self.pp_index
+        legal = [move for move in moves if (side, move) not in pp_index or pp[pp_index[side, move]] > 0]
+        return legal or moves
+
+    def evaluate(self, hp: Tuple[int, int], status: tuple) -> float:
+        ai, foe = self.sides
+        score = 0.9 * (hp[AI] / ai.max_hp - hp[FOE] / foe.max_hp)
+        score += 0.02 * (sum(1 for turns in status[FOE] if turns) - sum(1 for turns in status[AI] if turns))
+        return score
+
+    def status_phase(self, side: int, hp: int, status: tuple) -> List[Tuple[float, int, bool, tuple]]:
+        """Every (chance, hp, can_act, status) after ``side``'s conditions resolve and age."""
+        branches = [(1.0, hp, True, list(status))]
+        for index, turns in enumerate(status):
+            if not turns:
+                continue
+            if index == POISON or index == BURN:
+                branches = [(chance, hp - self.tick_damage[side], can_act, left)
+                            for chance, hp, can_act, left in branches]
+            elif index == SLEEP:
+                branches = [(chance, hp, False, left) for chance, hp, can_act, left in branches]
+            elif index == PARALYSIS:
+                branches = [branch for chance, hp, can_act, left in branches for branch in (
+                    (chance * PARALYSIS_SKIP_CHANCE, hp, False, left),
+                    (chance * (1 - PARALYSIS_SKIP_CHANCE), hp, can_act, left))]
+            elif index == FREEZE:
+                branches = [branch for chance, hp, can_act, left in branches for branch in (
+                    (chance * FREEZE_CURE_CHANCE, hp, can_act, left[:FREEZE] + [0] + left[FREEZE + 1:]),
+                    (chance * (1 - FREEZE_CURE_CHANCE), hp, False, left))]
+            elif index == CONFUSION:
+                self_hit = self.sides[side].attack // CONFUSION_ATTACK_DIVISOR
+                branches = [branch for chance, hp, can_act, left in branches for branch in (
+                    (chance * CONFUSION_SELF_HIT_CHANCE, hp - self_hit, False, left),
+                    (chance * (1 - CONFUSION_SELF_HIT_CHANCE), hp, can_act, left))]
+        return [(chance, max(0, hp), can_act, tuple(turns - 1 if turns > 0 else 0 for turns in left))
+                for chance, hp, can_act, left in branches]
+
+class ExpectimaxSearch:
+    """Depth-limited expectiminimax over a MatchModel with a transposition table.
+
+    The AI maximises, its opponent minimises, and every random roll
+    (damage bucket, side effect, status check) is a chance node. Values are
+    stored in ``table`` keyed by the full search state tuple, including the
+    depth left, so repeated positions across branches, deepening passes and
+    later decisions of the same battle are only searched once. Searches
+    deepen one attack at a time until the node or time budget runs out and
+    keep the deepest pass that finished.
+    """
+
+    def __init__(self, model: MatchModel, budget: SearchBudget, table: Optional[dict] = None,
+                 max_table: int = 1_000_000):
+        self.model = model
+        self.budget = budget
+        self.table = {} if table is None else table
+        self.max_table = max_table
+        self.nodes = self.probes = self.hits = 0
+        self.node_limit = None
+        self.deadline = None
+
+    def choose(self, hp: Tuple[int, int], status: tuple, pp: Tuple[int, ...],
+               foe_pending: bool = False) -> SearchResult:
+        if len(self.table) > self.max_table:
+            self.table.clear()
+
+        start = time.perf_counter()
+        best = None
+        for depth in range(1, self.budget.max_depth + 1):
+            # The first pass always finishes so there is a move to play.
+            if depth > 1:
+                self.node_limit = self.nodes + self.budget.max_nodes
+                self.deadline = start + self.budget.time_limit
+            try:
+                values = tuple((move, self.after_move(AI, move, hp, status, pp, foe_pending, depth - 1))
+                               for move in self.model.legal_moves(AI, pp))
+            except SearchExhausted:
+                break
+            finally:
+                self.node_limit = self.deadline = None
+            move, value = max(values, key=lambda item: item[1])
+            best = (move, value, depth, values)
+            if abs(value) >= WIN:
+                break
+
+        move, value, depth, values = best
+        return SearchResult(move, value, depth, self.nodes, time.perf_counter() - start,
+                            self.probes, self.hits, values)
+
+    def count_node(self):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes & 255 == 0:
+            if self.nodes > self.node_limit or time.perf_counter() > self.deadline:
+                raise SearchExhausted
+
+    def terminal(self, won: bool, depth: int) -> float:
+        return WIN + DEPTH_BONUS * depth if won else LOSS - DEPTH_BONUS * depth
+
+    def act(self, side: int, hp: tuple, status: tuple, pp: tuple, pending: bool, depth: int) -> float:
+        if depth == 0:
+            return self.model.evaluate(hp, status)
+
+        key = (0, side, hp, status, pp, pending, depth)
+        self.probes += 1
+        value = self.table.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.count_node()
+        values = [self.after_move(side, move, hp, status, pp, pending, depth - 1)
+                  for move in self.model.legal_moves(side, pp)]
+        value = max(values) if side == AI else min(values)
+        self.table[key] = value
+        return value
+
+    def after_move(self, side: int, move: str, hp: tuple, status: tuple, pp: tuple,
+                   pending: bool, depth: int) -> float:
+        self.count_node()
+        model = self.model
+        defender = 1 - side
+
+        slot = model.pp_index.get((side, move))
+        if slot is not None:
+            if pp[slot] <= 0:
+                return self.continue_turn(side, hp, status, pp, pending, depth)
+            pp = pp[:slot] + (pp[slot] - 1,) + pp[slot + 1:]
+
+        value = 0.0
+        for chance, damage, status_index, turns, hits_attacker in model.outcomes[side][move]:
+            next_hp = list(hp)
+            next_hp[defender] = max(0, hp[defender] - damage)
+            if next_hp[defender] == 0:
+                value += chance * self.terminal(defender == FOE, depth)
+                continue
+
+            next_status = status
+            if status_index != NO_STATUS:
+                target = side if hits_attacker else defender
+                current = status[target]
+                if current[status_index] < turns:
+                    changed = current[:status_index] + (turns,) + current[status_index + 1:]
+                    next_status = (changed, status[1]) if target == 0 else (status[0], changed)
+
+            value += chance * self.continue_turn(side, tuple(next_hp), next_status, pp, pending, depth)
+        return value
+
+    def continue_turn(self, side: int, hp: tuple, status: tuple, pp: tuple, pending: bool,
+                      depth: int) -> float:
+        if pending:
+            return self.act(1 - side, hp, status, pp, False, depth)
+        return self.new_turn(hp, status, pp, depth)
+
+    def new_turn(self, hp: tuple, status: tuple, pp: tuple, depth: int) -> float:
+        if depth == 0:
+            return self.model.evaluate(hp, status)
+
+        key = (1, hp, status, pp, depth)
+        self.probes += 1
+        value = self.table.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.count_node()
+        model = self.model
+        first = model.first
+        second = 1 - first
+        value = 0.0
+        for ai_chance, ai_hp, ai_acts, ai_status in model.status_phase(AI, hp[AI], status[AI]):
+            for foe_chance, foe_hp, foe_acts, foe_status in model.status_phase(FOE, hp[FOE], status[FOE]):
+                chance = ai_chance * foe_chance
+                next_hp = (ai_hp, foe_hp)
+                if ai_hp == 0 or foe_hp == 0:
+                    # The game ends the battle here and the player wins if still standing.
+                    value += chance * self.terminal(foe_hp == 0, depth)
+                    continue
+
+                next_status = (ai_status, foe_status)
+                acts = (ai_acts, foe_acts)
+                if acts[first]:
+                    value += chance * self.act(first, next_hp, next_status, pp, acts[second], depth)
+                elif acts[second]:
+                    value += chance * self.act(second, next_hp, next_status, pp, False, depth)
+                else:
+                    value += chance * self.new_turn(next_hp, next_status, pp, depth - 1)
+
+        self.table[key] = value
+        return value
+
+def search_move(model: MatchModel, budget: SearchBudget, hp: tuple, status: tuple, pp: tuple,
+                foe_pending: bool = False, table: Optional[dict] = None) -> SearchResult:
+    return ExpectimaxSearch(model, budget, table).choose(hp, status, pp, foe_pending)
+
+class BattleAI:
+    """Picks moves for a computer-controlled Pokemon by searching the battle rules.
+
+    ``difficulty`` names one of ``DIFFICULTY_BUDGETS`` or is a SearchBudget of
+    its own. Searches run in ``executor`` (the loop's default thread pool when
+    None) so the UI keeps rendering while the AI thinks. With a thread pool
+    the transposition table is kept between decisions of the same matchup; a
+    process pool gets a fresh table per decision because the table cannot be
+    shared across processes.
+    """
+
+    def __init__(self, difficulty="normal", executor=None, buckets: int = 3):
+        self.budget = DIFFICULTY_BUDGETS[difficulty] if isinstance(difficulty, str) else difficulty
+        self.executor = executor
+        self.buckets = buckets
+        self.model = None
+        self.table = {}
+        self.last_result = None
+        self.decisions = 0
+        self.nodes = 0
+        self.seconds = 0.0
+        self.table_probes = 0
+        self.table_hits = 0
+
+    def prepare(self, ai_pokemon, foe, foe_pending: bool = False):
+        model = MatchModel(ai_pokemon, foe, self.buckets)
+        if self.model is None or self.model.key != model.key:
+            self.model = model
+            self.table = {}
+        hp = (ai_pokemon.current_hp, foe.current_hp)
+        status = (status_turns(ai_pokemon), status_turns(foe))
+        return self.model, hp, status, self.model.initial_pp(ai_pokemon, foe), foe_pending
+
+    def record(self, result: SearchResult) -> SearchResult:
+        self.last_result = result
+        self.decisions += 1
+        self.nodes += result.nodes
+        self.seconds += result.seconds
+        self.table_probes += result.table_probes
+        self.table_hits += result.table_hits
+        return result
+
+    def choose_move(self, ai_pokemon, foe, foe_pending: bool = False) -> SearchResult:
+        model, hp, status, pp, pending = self.prepare(ai_pokemon, foe, foe_pending)
+        return self.record(search_move(model, self.budget, hp, status, pp, pending, self.table))
+
+    async def choose_move_async(self, ai_pokemon, foe, foe_pending: bool = False) -> SearchResult:
+        model, hp, status, pp, pending = self.prepare(ai_pokemon, foe, foe_pending)
+        table = None if self.uses_processes() else self.table
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, search_move, model, self.budget,
+                                            hp, status, pp, pending, table)
+        return self.record(result)
+
+    def uses_processes(self) -> bool:
+        from concurrent.futures import ProcessPoolExecutor
+        return isinstance(self.executor, ProcessPoolExecutor)
+
+    def report(self) -> dict:
+        return {
+            "decisions": self.decisions,
+            "nodes": self.nodes,
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes / self.seconds if self.seconds > 0 else 0.0,
+            "table_hit_rate": self.table_hits / self.table_probes if self.table_probes else 0.0,
+        }
+
+def play_match(ai: Optional[BattleAI], ai_species: tuple, foe_species: tuple, rng) -> bool:
+    """Play one battle the way CompletePokemonGame resolves it, with a random-move opponent.
+
+    ``ai`` None makes the AI side pick at random too. Returns True if the AI side won.
+    """
+    from battle_rules import resolve_regular_move, resolve_special_move, resolve_status_effects
+    from pokemon import Pokemon
+    sides = (Pokemon(*ai_species), Pokemon(*foe_species))
+    first = FOE if sides[FOE].speed >= sides[AI].speed else AI
+    events = []
+
+    def attack(side: int, foe_pending: bool):
+        attacker, defender = sides[side], sides[1 - side]
+        if side == AI and ai is not None:
+            move = ai.choose_move(attacker, defender, foe_pending).move
+        else:
+            move = rng.choice(attacker.moves)
+        if move in SPECIAL_MOVES:
+            resolve_special_move(attacker, defender, 1 - side, SPECIAL_MOVES[move], events, rng)
+        else:
+            resolve_regular_move(attacker, defender, 1 - side, move, events, rng)
+
+    while sides[AI].current_hp > 0 and sides[FOE].current_hp > 0:
+        acts = [resolve_status_effects(pokemon, side, events, rng) for side, pokemon in enumerate(sides)]
+        if sides[AI].current_hp <= 0 or sides[FOE].current_hp <= 0:
+            break
+        second = 1 - first
+        if acts[first]:
+            attack(first, acts[second])
+        if sides[second].current_hp > 0 and acts[second]:
+            attack(second, False)
+        events.clear()
+    return sides[FOE].current_hp <= 0
+
+def benchmark_ai(matches: int = 40, seed: int = 3, difficulties=("easy", "normal", "hard")) -> dict:
+    from rng_streams import BattleRNG
+
+    pairs = [(("Charmander", "Fire", 95, 52, 48, 65), ("Pikachu", "Electric", 100, 55, 50, 90)),
+             (("Squirtle", "Water", 98, 48, 55, 43), ("Charmander", "Fire", 95, 52, 48, 65))]
+    results = {}
+    for difficulty in ("random",) + tuple(difficulties):
+        ai = None if difficulty == "random" else BattleAI(difficulty)
+        wins = 0
+        for index in range(matches):
+            ai_species, foe_species = pairs[index % len(pairs)]
+            wins += play_match(ai, ai_species, foe_species, BattleRNG(seed, index))
+        result = {"win_rate": wins / matches}
+        if ai is not None:
+            result.update(ai.report())
+        results[difficulty] = result
+    return results
+
+def test_battle_ai():
+    for difficulty, result in benchmark_ai().items():
+        line = f"🤖 {difficulty:>7}: wins {result['win_rate']:.0%} against random moves"
+        if "decisions" in result:
+            line += (f", {result['nodes'] / result['decisions']:8,.0f} nodes/decision, "
+                     f"{result['nodes_per_second']:9,.0f} nodes/s, "
+                     f"table hit rate {result['table_hit_rate']:.0%}")
+        print(line)
+
+if __name__ == "__main__":
+    print("🧪 Testing Battle AI")
+    test_battle_ai()
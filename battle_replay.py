@@ -0,0 +1,396 @@
+import asyncio
+import bisect
+import mmap
+import struct
+import zlib
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from battle_rules import BattleEvent, EventType
+
+MAGIC = b"PKRP"
+INDEX_MAGIC = b"PKIX"
+VERSION = 1
+FLAG_ZLIB = 1
+
+FILE_HEADER = struct.Struct("<4sHH")
+BATTLE_HEADER = struct.Struct("<QIB")
+ROSTER_STATS = struct.Struct("<HHHHH")
+BLOCK_HEADER = struct.Struct("<IIIHH")
+RECORD = struct.Struct("<IBBIHH")
+BATTLE_ENTRY = struct.Struct("<QIQQ")
+BLOCK_ENTRY = struct.Struct("<IQIIHH")
+TRAILER = struct.Struct("<QQ4s")
+STRING_LENGTH = struct.Struct("<H")
+COUNT = struct.Struct("<I")
+# Events that set a side's HP; a team battle's SWITCH brings in the replacement's.
+HP_EVENTS = (EventType.DAMAGE, EventType.STATUS_DAMAGE, EventType.SWITCH)
+
+MASK64 = (1 << 64) - 1
+
+class RosterEntry(NamedTuple):
+    name: str
+    pokemon_type: str
+    max_hp: int
+    current_hp: int
+    attack: int
+    defense: int
+    speed: int
+
+class BlockEntry(NamedTuple):
+    first_turn: int
+    offset: int
+    stored_length: int
+    raw_length: int
+    hp: Tuple[int, int]
+
+class BattleIndex(NamedTuple):
+    seed: int
+    battle_id: int
+    roster: Tuple[RosterEntry, ...]
+    strings: Tuple[str, ...]
+    blocks: Tuple[BlockEntry, ...]
+
+def pack_string(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return STRING_LENGTH.pack(len(data)) + data
+
+def unpack_string(buffer, offset: int) -> Tuple[str, int]:
+    (length,) = STRING_LENGTH.unpack_from(buffer, offset)
+    offset += STRING_LENGTH.size
+    return bytes(buffer[offset:offset + length]).decode("utf-8"), offset + length
+
+def roster_entry(pokemon) -> RosterEntry:
+    return RosterEntry(pokemon.name, pokemon.pokemon_type, pokemon.max_hp, pokemon.current_hp,
+                       pokemon.attack, pokemon.defense, pokemon.speed)
+
+def seed_value(seed) -> int:
+    if isinstance(seed, int):
+        return seed & MASK64
+    return zlib.crc32(str(seed).encode("utf-8"))
+
+class ReplayWriter:
+    """Streams battle events into a compact binary archive."""
+
+    def __init__(self, path: str, compress: bool = False, block_turns: int = 64):
+        self.path = path
+        self.compress = compress
+        self.block_turns = block_turns
+        self.file = open(path, "wb")
+        self.position = 0
+        self.battles = []
+        self.current = None
+        self._emit(FILE_HEADER.pack(MAGIC, VERSION, FLAG_ZLIB if compress else 0))
+
+    def _emit(self, data: bytes):
+        self.file.write(data)
+        self.position += len(data)
+
+    def begin_battle(self, seed, battle_id: int, roster: Sequence):
+        if self.current is not None:
+            self.end_battle()
+
+        entries = tuple(roster_entry(pokemon) for pokemon in roster)
+        header = bytearray(BATTLE_HEADER.pack(seed_value(seed), battle_id, len(entries)))
+        for entry in entries:
+            header += pack_string(entry.name) + pack_string(entry.pokemon_type)
+            header += ROSTER_STATS.pack(entry.max_hp, entry.current_hp, entry.attack,
+                                        entry.defense, entry.speed)
+
+        self.current = {
+            "seed": seed_value(seed),
+            "battle_id": battle_id,
+            "header_offset": self.position,
+            "strings": [""],
+            "string_ids": {"": 0},
+            "blocks": [],
+            "buffer": bytearray(),
+            "block_first_turn": 1,
+            "block_hp": [entry.current_hp for entry in entries],
+            "block_turn_count": 0,
+            "hp": [entry.current_hp for entry in entries],
+            "turn": 0,
+        }
+        self._emit(bytes(header))
+
+    def string_id(self, text: str) -> int:
+        string_ids = self.current["string_ids"]
+        index = string_ids.get(text)
+        if index is None:
+            index = len(self.current["strings"])
+            string_ids[text] = index
+            self.current["strings"].append(text)
+        return index
+
+    def record(self, events: Iterable[BattleEvent]):
+        battle = self.current
+        if battle is None:
+            raise RuntimeError("begin_battle() must be called before record()")
+
+        for event in events:
+            if event.kind == EventType.TURN_START:
+                if battle["block_turn_count"] >= self.block_turns:
+                    self.seal_block(event.value)
+                battle["turn"] = event.value
+                battle["block_turn_count"] += 1
+
+            battle["buffer"] += RECORD.pack(battle["turn"], event.kind, event.side, event.value,
+                                            self.string_id(event.detail), event.hp)
+
+            if event.kind in HP_EVENTS:
+                battle["hp"][event.side] = event.hp
+
+    def seal_block(self, next_first_turn: Optional[int] = None):
+        battle = self.current
+        raw = bytes(battle["buffer"])
+        if raw:
+            payload = zlib.compress(raw) if self.compress else raw
+            hp = (battle["block_hp"] + [0, 0])[:2]
+            battle["blocks"].append(BlockEntry(battle["block_first_turn"], self.position,
+                                               len(payload), len(raw), tuple(hp)))
+            self._emit(BLOCK_HEADER.pack(battle["block_first_turn"], len(raw), len(payload), *hp))
+            self._emit(payload)
+
+        battle["buffer"] = bytearray()
+        battle["block_hp"] = list(battle["hp"])
+        battle["block_turn_count"] = 0
+        if next_first_turn is not None:
+            battle["block_first_turn"] = next_first_turn
+
+    def end_battle(self):
+        if self.current is None:
+            return
+        self.seal_block()
+        self.battles.append(self.current)
+        self.current = None
+
+    def close(self):
+        self.end_battle()
+
+        details_offsets = []
+        for battle in self.battles:
+            details_offsets.append(self.position)
+            details = bytearray(COUNT.pack(len(battle["strings"])))
+            for text in battle["strings"]:
+                details += pack_string(text)
+            details += COUNT.pack(len(battle["blocks"]))
+            for block in battle["blocks"]:
+                details += BLOCK_ENTRY.pack(block.first_turn, block.offset, block.stored_length,
+                                            block.raw_length, *block.hp)
+            self._emit(bytes(details))
+
+        table_offset = self.position
+        table = bytearray()
+        for battle, details_offset in zip(self.battles, details_offsets):
+            table += BATTLE_ENTRY.pack(battle["seed"], battle["battle_id"],
+                                       battle["header_offset"], details_offset)
+        self._emit(bytes(table))
+        self._emit(TRAILER.pack(table_offset, len(self.battles), INDEX_MAGIC))
+        self._finish()
+
+    def _finish(self):
+        self.file.close()
+
+class AsyncReplayWriter(ReplayWriter):
+    """ReplayWriter that hands finished blocks to a background flush task."""
+
+    def __init__(self, path: str, compress: bool = False, block_turns: int = 64):
+        self.queue = asyncio.Queue()
+        self.flusher = None
+        super().__init__(path, compress, block_turns)
+
+    def _emit(self, data: bytes):
+        self.queue.put_nowait(data)
+        self.position += len(data)
+        if self.flusher is None:
+            self.flusher = asyncio.get_running_loop().create_task(self.flush_loop())
+
+    async def flush_loop(self):
+        while True:
+            data = await self.queue.get()
+            if data is None:
+                break
+            chunks = [data]
+            while not self.queue.empty():
+                chunk = self.queue.get_nowait()
+                if chunk is None:
+                    await asyncio.to_thread(self.file.write, b"".join(chunks))
+                    return
+                chunks.append(chunk)
+            await asyncio.to_thread(self.file.write, b"".join(chunks))
+
+    def _finish(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+        self.queue.put_nowait(None)
+        await self.flusher
+        await asyncio.to_thread(self.file.close)
+
+class ReplayReader:
+    """Memory-maps a replay archive and decodes battles one block at a time."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags = FILE_HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} battle replay")
+        self.compressed = bool(flags & FLAG_ZLIB)
+
+        table_offset, battle_count, index_magic = TRAILER.unpack_from(
+            self.buffer, len(self.buffer) - TRAILER.size)
+        if index_magic != INDEX_MAGIC:
+            raise ValueError(f"{path} has no index; was the writer closed?")
+        self.table_offset = table_offset
+        self.battle_count = battle_count
+
+    def __len__(self) -> int:
+        return self.battle_count
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def battle(self, index: int) -> BattleIndex:
+        if not 0 <= index < self.battle_count:
+            raise IndexError(index)
+        seed, battle_id, header_offset, details_offset = BATTLE_ENTRY.unpack_from(
+            self.buffer, self.table_offset + index * BATTLE_ENTRY.size)
+
+        _, _, roster_count = BATTLE_HEADER.unpack_from(self.buffer, header_offset)
+        offset = header_offset + BATTLE_HEADER.size
+        roster = []
+        for _ in range(roster_count):
+            name, offset = unpack_string(self.buffer, offset)
+            pokemon_type, offset = unpack_string(self.buffer, offset)
+            stats = ROSTER_STATS.unpack_from(self.buffer, offset)
+            offset += ROSTER_STATS.size
+            roster.append(RosterEntry(name, pokemon_type, *stats))
+
+        (string_count,) = COUNT.unpack_from(self.buffer, details_offset)
+        offset = details_offset + COUNT.size
+        strings = []
+        for _ in range(string_count):
+            text, offset = unpack_string(self.buffer, offset)
+            strings.append(text)
+
+        (block_count,) = COUNT.unpack_from(self.buffer, offset)
+        offset += COUNT.size
+        blocks = []
+        for _ in range(block_count):
+            first_turn, block_offset, stored, raw, hp0, hp1 = BLOCK_ENTRY.unpack_from(self.buffer, offset)
+            offset += BLOCK_ENTRY.size
+            blocks.append(BlockEntry(first_turn, block_offset, stored, raw, (hp0, hp1)))
+
+        return BattleIndex(seed, battle_id, tuple(roster), tuple(strings), tuple(blocks))
+
+    def block_records(self, block: BlockEntry) -> memoryview:
+        start = block.offset + BLOCK_HEADER.size
+        payload = self.buffer[start:start + block.stored_length]
+        if self.compressed:
+            payload = zlib.decompress(payload)
+        return memoryview(payload)
+
+    def find_block(self, battle: BattleIndex, turn: int) -> int:
+        first_turns = [block.first_turn for block in battle.blocks]
+        return max(0, bisect.bisect_right(first_turns, turn) - 1)
+
+    def events(self, battle: BattleIndex, from_turn: int = 1) -> Iterator[Tuple[int, BattleEvent]]:
+        strings = battle.strings
+        for block in battle.blocks[self.find_block(battle, from_turn):]:
+            records = self.block_records(block)
+            for turn, kind, side, value, detail, hp in RECORD.iter_unpack(records):
+                if turn >= from_turn:
+                    yield turn, BattleEvent(EventType(kind), side, value, strings[detail], hp)
+
+    def hp_at(self, battle: BattleIndex, turn: int) -> List[int]:
+        if not battle.blocks:
+            return [entry.current_hp for entry in battle.roster]
+
+        block = battle.blocks[self.find_block(battle, turn)]
+        hp = list(block.hp)
+        for record_turn, kind, side, value, detail, event_hp in RECORD.iter_unpack(self.block_records(block)):
+            if record_turn >= turn:
+                break
+            if kind in HP_EVENTS:
+                hp[side] = event_hp
+        return hp
+
+def record_battle(writer: ReplayWriter, pokemon1, pokemon2, rng, max_turns: int = 1000):
+    from battle_rules import BattleState, step
+
+    writer.begin_battle(getattr(rng, "stream_seed", 0), getattr(rng, "battle_id", 0), (pokemon1, pokemon2))
+    state = BattleState(pokemon1, pokemon2)
+    while not state.finished and state.turn <= max_turns:
+        state, events = step(state, rng=rng)
+        writer.record(events)
+    writer.end_battle()
+    return state
+
+async def replay_battle(reader: ReplayReader, index: int, battle_system, from_turn: int = 1):
+    from pokemon import Pokemon
+
+    battle = reader.battle(index)
+    sides = [Pokemon(entry.name, entry.pokemon_type, entry.max_hp, entry.attack,
+                     entry.defense, entry.speed) for entry in battle.roster]
+    hp_display = reader.hp_at(battle, from_turn)
+    for pokemon, hp in zip(sides, hp_display):
+        pokemon.current_hp = hp
+
+    events = []
+    for _, event in reader.events(battle, from_turn):
+        if event.kind in HP_EVENTS:
+            sides[event.side].current_hp = event.hp
+        events.append(event)
+    await battle_system.render_events(sides, events, hp_display)
+    return sides
+
+async def test_battle_replay():
+    import contextlib
+    import io
+    import os
+    import tempfile
+    import time
+    from pokemon import Pokemon
+    from pacing import VirtualClock
+    from enhanced_battle import EnhancedBattleSystem
+    from rng_streams import RNGStreamFactory
+
+    path = os.path.join(tempfile.mkdtemp(), "battles.pkrp")
+    streams = RNGStreamFactory(2024)
+    battles = 20_000
+
+    start = time.perf_counter()
+    writer = AsyncReplayWriter(path, compress=True)
+    for _ in range(battles):
+        record_battle(writer, Pokemon("Geodude", "Rock", 90, 60, 70, 20),
+                      Pokemon("Squirtle", "Water", 98, 48, 55, 43), streams.next_stream())
+        await asyncio.sleep(0)
+    await writer.aclose()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    print(f"💾 Recorded {battles:,} battles in {elapsed:.2f}s ({size / battles:.0f} bytes/battle)")
+
+    with ReplayReader(path) as reader:
+        battle = reader.battle(len(reader) - 1)
+        turns = [turn for turn, _ in reader.events(battle)]
+        print(f"📼 Last battle: seed={battle.seed} id={battle.battle_id}, "
+              f"{len(turns)} events over {turns[-1] if turns else 0} turns")
+        # Seek to the final turn; a type advantage can end the battle on turn 1.
+        last_turn = turns[-1] if turns else 1
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            await replay_battle(reader, len(reader) - 1, EnhancedBattleSystem(clock=VirtualClock()), last_turn)
+        lines = output.getvalue().strip().splitlines()
+        print(f"⏩ Turn {last_turn}: {lines[0] if lines else 'nothing to replay'}")
+
+if __name__ == "__main__":
+    print("🧪 Testing Battle Replay Format")
+    asyncio.run(test_battle_replay())
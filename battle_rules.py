@@ -0,0 +1,471 @@
+import random
+from enum import IntEnum
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from effect_rules import RULES, StatusRule, TurnAction
+from moves import MOVES, Move, remaining_pp, spend_pp
+from status_effects import STATUS_INDEX, StatusType, StatusEffect, StatusStore
+from type_chart import TYPE_CHART, scale_damage
+
+DAMAGE_ROLL_LOW = 0.8
+DAMAGE_ROLL_HIGH = 1.2
+CRITICAL_CHANCE = 0.0625
+CRITICAL_MULTIPLIER = 1.5
+PARALYSIS_SKIP_CHANCE = RULES.statuses[STATUS_INDEX[StatusType.PARALYSIS.value]].chance
+DEFAULT_MOVES = ('Tackle', 'Scratch')
+
+# Status and side-effect rules are compiled from effect_rules.json at import.
+STATUS_RULES = RULES.statuses
+DAMAGING_STATUSES = tuple(STATUS_RULES[index].status for index in RULES.tick_indices)
+
+MOVE_STATUS_CHANCE = RULES.move_status_chance
+MOVE_STATUS_TURNS = RULES.move_status_turns
+# Side-effect tables are indexed by move id, with None for moves that have none.
+MOVE_STATUS_EFFECTS = RULES.move_status_effects
+
+ARENA_STATUS_TURNS = RULES.arena_status_turns
+ARENA_SIDE_EFFECTS = RULES.arena_side_effects
+
+SPECIAL_DAMAGE_LOW = 0.85
+SPECIAL_DAMAGE_HIGH = 1.15
+
+SPECIAL_SIDE_EFFECTS = RULES.special_side_effects
+
+def move_effect(table: tuple, move: str, default=None):
+    """Look ``move`` up by name in an id-indexed table; unknown moves get ``default``."""
+    move_id = MOVES.ids.get(move)
+    return default if move_id is None else table[move_id]
+
+class EventType(IntEnum):
+    TURN_START = 0
+    MOVE = 1
+    CRITICAL = 2
+    DAMAGE = 3
+    MISS = 4
+    FULLY_PARALYZED = 5
+    STATUS_APPLIED = 6
+    STATUS_ACTIVE = 7
+    STATUS_DAMAGE = 8
+    STATUS_CURED = 9
+    STATUS_EXPIRED = 10
+    SELF_HIT = 11
+    SIDE_EFFECT = 12
+    TURN_END = 13
+    FAINT = 14
+    SWITCH = 15
+
+class BattleEvent(NamedTuple):
+    kind: EventType
+    side: int
+    value: int = 0
+    detail: str = ""
+    hp: int = 0
+
+class BattleState:
+    """The two combatants of a 1v1 battle plus turn bookkeeping."""
+
+    __slots__ = ("sides", "turn", "winner")
+
+    def __init__(self, pokemon1, pokemon2, turn: int = 1):
+        self.sides = (pokemon1, pokemon2)
+        self.turn = turn
+        self.winner = None
+
+    @property
+    def finished(self) -> bool:
+        return self.winner is not None
+
+def turn_order(pokemon1, pokemon2) -> Tuple[int, int]:
+    if pokemon1.speed >= pokemon2.speed:
+        return 0, 1
+    return 1, 0
+
+def roll_damage(attack: int, rng=random) -> int:
+    return rng.randint(int(attack * DAMAGE_ROLL_LOW), int(attack * DAMAGE_ROLL_HIGH))
+
+def roll_critical(damage: int, rng=random) -> Tuple[int, bool]:
+    if rng.random() < CRITICAL_CHANCE:
+        return int(damage * CRITICAL_MULTIPLIER), True
+    return damage, False
+
+def special_damage(attack: int, power: int, rng=random) -> int:
+    damage = (power * attack) // 50
+    damage = rng.randint(int(damage * SPECIAL_DAMAGE_LOW), int(damage * SPECIAL_DAMAGE_HIGH))
+    return max(1, damage)
+
+def apply_damage(pokemon, damage: int) -> int:
+    pokemon.current_hp = max(0, pokemon.current_hp - damage)
+    return pokemon.current_hp
+
+def status_store(pokemon) -> StatusStore:
+    effects = pokemon.status_effects
+    if type(effects) is not StatusStore and not isinstance(effects, StatusStore):
+        effects = pokemon.status_effects = StatusStore(effects)
+    return effects
+
+def writable_status(pokemon) -> StatusStore:
+    """``pokemon``'s status store for writing; copy-on-write views copy their record first.
+
+    ``status_store`` is for reading only, so checks and ticks of a Pokemon
+    with no conditions never copy anything.
+    """
+    writable = getattr(pokemon, "writable_status", None)
+    if writable is not None:
+        return writable()
+    return status_store(pokemon)
+
+def has_status(pokemon, status_type: StatusType) -> bool:
+    return status_store(pokemon).has(status_type)
+
+def add_status(pokemon, status_type: StatusType, turns: int, severity: int = 1) -> bool:
+    return writable_status(pokemon).add(status_type, turns, severity)
+
+def resolve_attack(attacker, defender, attacker_side: int, move: Optional[str],
+                   events: List[BattleEvent], rng=random, roller=None):
+    defender_side = 1 - attacker_side
+    if move is None:
+        move = rng.choice(getattr(attacker, 'moves', DEFAULT_MOVES))
+    move_id = MOVES.ids.get(move)
+
+    if has_status(attacker, StatusType.PARALYSIS) and rng.random() < PARALYSIS_SKIP_CHANCE:
+        events.append(BattleEvent(EventType.FULLY_PARALYZED, attacker_side, detail=move))
+        return
+
+    events.append(BattleEvent(EventType.MOVE, attacker_side, detail=move))
+
+    if roller is None:
+        damage = scale_damage(roll_damage(getattr(attacker, 'attack', 50), rng),
+                              TYPE_CHART.move_multiplier(attacker, defender, move_id))
+        damage, critical = roll_critical(damage, rng)
+    else:
+        damage, critical = roller(attacker_side, move, rng)
+    if critical:
+        events.append(BattleEvent(EventType.CRITICAL, attacker_side, detail=move))
+
+    hp = apply_damage(defender, damage)
+    events.append(BattleEvent(EventType.DAMAGE, defender_side, damage, move, hp))
+
+    status_type = None if move_id is None else MOVE_STATUS_EFFECTS[move_id]
+    if (status_type is not None and rng.random() < MOVE_STATUS_CHANCE
+            and add_status(defender, status_type, MOVE_STATUS_TURNS)):
+        events.append(BattleEvent(EventType.STATUS_APPLIED, defender_side, MOVE_STATUS_TURNS,
+                                  status_type.value, hp))
+
+    if hp <= 0:
+        events.append(BattleEvent(EventType.FAINT, defender_side, hp=hp))
+
+def tick_status_effects(pokemon, side: int, events: List[BattleEvent]):
+    store = status_store(pokemon)
+    if not store:
+        return
+
+    mask = store.mask
+    for index in RULES.tick_indices:
+        if mask >> index & 1:
+            rule = STATUS_RULES[index]
+            damage = pokemon.max_hp // rule.tick_divisor
+            hp = apply_damage(pokemon, damage)
+            events.append(BattleEvent(EventType.STATUS_DAMAGE, side, damage, rule.name, hp))
+
+    for effect_type in writable_status(pokemon).tick():
+        events.append(BattleEvent(EventType.STATUS_EXPIRED, side, detail=effect_type.value,
+                                  hp=pokemon.current_hp))
+
+def step(state: BattleState, actions: Optional[Sequence[Optional[str]]] = None,
+         rng=random, roller=None, events: Optional[List[BattleEvent]] = None
+         ) -> Tuple[BattleState, List[BattleEvent]]:
+    """Advance ``state`` by one turn in place and return it with the turn's events.
+
+    ``actions`` holds the move for each side; ``None`` picks a random move from
+    the Pokemon's move list, drawing from ``rng`` in the same order as the
+    animated engine so a seeded generator reproduces the same battle.
+    ``roller(attacker_side, move, rng)``, if given, returns each hit's
+    ``(damage, critical)`` in place of the roll, e.g. a ``damage_tables.TableRoller``.
+    Pass an ``events`` list to reuse it; it is appended to, not cleared.
+    """
+    if events is None:
+        events = []
+    if state.finished:
+        return state, events
+
+    pokemon1, pokemon2 = state.sides
+    if actions is None:
+        actions = (None, None)
+
+    events.append(BattleEvent(EventType.TURN_START, 0, state.turn))
+
+    first, second = turn_order(pokemon1, pokemon2)
+    first_pokemon, second_pokemon = state.sides[first], state.sides[second]
+
+    if first_pokemon.current_hp > 0:
+        resolve_attack(first_pokemon, second_pokemon, first, actions[first], events, rng, roller)
+        if second_pokemon.current_hp <= 0:
+            state.winner = first
+            return state, events
+
+    if second_pokemon.current_hp > 0:
+        resolve_attack(second_pokemon, first_pokemon, second, actions[second], events, rng, roller)
+
+    tick_status_effects(first_pokemon, first, events)
+    tick_status_effects(second_pokemon, second, events)
+
+    events.append(BattleEvent(EventType.TURN_END, 0, state.turn))
+    state.turn += 1
+
+    if pokemon1.current_hp <= 0 or pokemon2.current_hp <= 0:
+        state.winner = 0 if pokemon1.current_hp > 0 else 1
+
+    return state, events
+
+def run_battle(pokemon1, pokemon2, rng=random, max_turns: int = 1000, roller=None) -> BattleState:
+    state = BattleState(pokemon1, pokemon2)
+    events = []
+    while not state.finished and state.turn <= max_turns:
+        step(state, None, rng, roller, events)
+        events.clear()
+    return state
+
+# Turn handlers take (pokemon, side, rule, severity, events, rng) and return
+# whether the Pokemon can still act; STATUS_HANDLERS picks one per status index.
+def damage_turn(pokemon, side: int, rule: StatusRule, severity: int,
+                events: List[BattleEvent], rng) -> bool:
+    damage = max(1, pokemon.max_hp // (rule.divisor - severity))
+    hp = apply_damage(pokemon, damage)
+    events.append(BattleEvent(EventType.STATUS_DAMAGE, side, damage, rule.name, hp))
+    return True
+
+def skip_chance_turn(pokemon, side: int, rule: StatusRule, severity: int,
+                     events: List[BattleEvent], rng) -> bool:
+    events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=rule.name))
+    if rng.random() < rule.chance:
+        events.append(BattleEvent(EventType.FULLY_PARALYZED, side))
+        return False
+    return True
+
+def skip_turn(pokemon, side: int, rule: StatusRule, severity: int,
+              events: List[BattleEvent], rng) -> bool:
+    events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=rule.name))
+    return False
+
+def thaw_turn(pokemon, side: int, rule: StatusRule, severity: int,
+              events: List[BattleEvent], rng) -> bool:
+    events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=rule.name))
+    if rng.random() < rule.chance:
+        writable_status(pokemon).discard(rule.status)
+        events.append(BattleEvent(EventType.STATUS_CURED, side, detail=rule.name))
+        return True
+    return False
+
+def self_hit_turn(pokemon, side: int, rule: StatusRule, severity: int,
+                  events: List[BattleEvent], rng) -> bool:
+    events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=rule.name))
+    if rng.random() < rule.chance:
+        damage = pokemon.attack // rule.divisor
+        events.append(BattleEvent(EventType.SELF_HIT, side, damage))
+        hp = apply_damage(pokemon, damage)
+        events.append(BattleEvent(EventType.STATUS_DAMAGE, side, damage, rule.name, hp))
+        return False
+    return True
+
+TURN_HANDLERS = {
+    TurnAction.DAMAGE: damage_turn,
+    TurnAction.SKIP_CHANCE: skip_chance_turn,
+    TurnAction.SKIP: skip_turn,
+    TurnAction.THAW: thaw_turn,
+    TurnAction.SELF_HIT: self_hit_turn,
+}
+STATUS_HANDLERS = tuple(TURN_HANDLERS[rule.action] for rule in STATUS_RULES)
+
+def resolve_single_effect(pokemon, side: int, effect: StatusEffect,
+                          events: List[BattleEvent], rng=random) -> bool:
+    index = STATUS_INDEX[effect.effect_type.value]
+    return STATUS_HANDLERS[index](pokemon, side, STATUS_RULES[index], effect.severity, events, rng)
+
+def resolve_status_effects(pokemon, side: int, events: List[BattleEvent], rng=random) -> bool:
+    store = status_store(pokemon)
+    mask = store.mask
+    if not mask:
+        return True
+
+    can_act = True
+    severity = store.severity
+    # The active set is read once up front, so a thaw mid-turn doesn't change what resolves.
+    for index in RULES.mask_indices[mask]:
+        if not STATUS_HANDLERS[index](pokemon, side, STATUS_RULES[index], severity[index], events, rng):
+            can_act = False
+
+    for effect_type in writable_status(pokemon).tick():
+        events.append(BattleEvent(EventType.STATUS_EXPIRED, side, detail=effect_type.value,
+                                  hp=pokemon.current_hp))
+
+    return can_act
+
+def resolve_regular_move(attacker, defender, defender_side: int, move: str,
+                         events: List[BattleEvent], rng=random, side_effects=ARENA_SIDE_EFFECTS):
+    events.append(BattleEvent(EventType.MOVE, 1 - defender_side, detail=move))
+    move_id = MOVES.ids.get(move)
+
+    damage = scale_damage(roll_damage(attacker.attack, rng), TYPE_CHART.move_multiplier(attacker, defender, move_id))
+    hp = apply_damage(defender, damage)
+    events.append(BattleEvent(EventType.DAMAGE, defender_side, damage, move, hp))
+
+    side_effect = None if move_id is None else side_effects[move_id]
+    if side_effect is not None:
+        status_type, turns, chance, _ = side_effect
+        if rng.random() < chance and add_status(defender, status_type, turns):
+            events.append(BattleEvent(EventType.STATUS_APPLIED, defender_side, turns,
+                                      status_type.value, hp))
+
+def resolve_special_move(attacker, defender, defender_side: int, move: Move,
+                         events: List[BattleEvent], rng=random) -> bool:
+    attacker_side = 1 - defender_side
+
+    if remaining_pp(attacker, move) == 0:
+        return False
+
+    if rng.randint(1, 100) > move.accuracy:
+        events.append(BattleEvent(EventType.MISS, attacker_side, detail=move.name))
+        return True
+
+    events.append(BattleEvent(EventType.MOVE, attacker_side, detail=move.name))
+
+    attack = getattr(attacker, 'special_attack', getattr(attacker, 'attack', 50))
+    damage = scale_damage(special_damage(attack, move.power, rng),
+                          TYPE_CHART.move_multiplier(attacker, defender, move.id))
+    hp = apply_damage(defender, damage)
+    events.append(BattleEvent(EventType.DAMAGE, defender_side, damage, move.name, hp))
+
+    status_type, turns, chance, hits_attacker = SPECIAL_SIDE_EFFECTS[move.id]
+    if chance is None or rng.random() < chance:
+        events.append(BattleEvent(EventType.SIDE_EFFECT, attacker_side, detail=move.name))
+        if status_type is not None:
+            target, target_side = (attacker, attacker_side) if hits_attacker else (defender, defender_side)
+            if add_status(target, status_type, turns):
+                events.append(BattleEvent(EventType.STATUS_APPLIED, target_side, turns,
+                                          status_type.value, target.current_hp))
+
+    spend_pp(attacker, move)
+    return True
+
+# The tree just before the rules core was extracted: the interleaved async engine
+# whose headless turns/s the core is measured against.
+BASELINE_REVISION = "6194fb9"
+BASELINE_SCRIPT = """
+import asyncio, contextlib, io, random, sys, time
+from enhanced_battle import EnhancedBattleSystem
+from pacing import VirtualClock
+from pokemon import Pokemon
+
+async def battles(count):
+    battle_system, turns = EnhancedBattleSystem(clock=VirtualClock()), 0
+    for _ in range(count):
+        await battle_system.single_pokemon_battle(Pokemon("Pikachu", "Electric", 100, 55, 40, 90),
+                                                  Pokemon("Charmander", "Fire", 95, 52, 43, 65))
+        turns += battle_system.last_battle_turns
+    return turns
+
+random.seed(int(sys.argv[2]))
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    turns = asyncio.run(battles(int(sys.argv[1])))
+print(turns / (time.perf_counter() - start))
+"""
+
+def benchmark_baseline(battles: int, seed: int, revision: str = BASELINE_REVISION) -> Optional[float]:
+    """Headless turns/s of the engine at ``revision``, run from a ``git archive`` of it.
+
+    Returns None when the checkout has no git history to archive.
+    """
+    import io
+    import os
+    import subprocess
+    import sys
+    import tarfile
+    import tempfile
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        archive = subprocess.run(["git", "-C", root, "archive", revision], capture_output=True,
+                                 check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(directory)
+        result = subprocess.run([sys.executable, "-c", BASELINE_SCRIPT, str(battles), str(seed)],
+                                cwd=directory, capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+def benchmark_rules(battles: int = 2000, seed: int = 7):
+    """Rules-core turns/s against the original interleaved engine and today's async renderer.
+
+    ``speedup`` is against the engine at ``BASELINE_REVISION`` (None without
+    git history); ``renderer_speedup`` is against ``EnhancedBattleSystem``,
+    which now renders ``step()`` and must reach identical outcomes.
+    """
+    import asyncio
+    import contextlib
+    import io
+    import time
+    from pokemon import Pokemon
+    from enhanced_battle import EnhancedBattleSystem
+    from pacing import VirtualClock
+    from rng_streams import RNGStreamFactory
+
+    def matchup():
+        return (Pokemon("Pikachu", "Electric", 100, 55, 40, 90),
+                Pokemon("Charmander", "Fire", 95, 52, 43, 65))
+
+    async def headless_battles():
+        battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=seed)
+        outcomes, turns = [], 0
+        for _ in range(battles):
+            pokemon1, pokemon2 = matchup()
+            winner = await battle_system.single_pokemon_battle(pokemon1, pokemon2)
+            outcomes.append((winner is pokemon1, pokemon1.current_hp, pokemon2.current_hp))
+            turns += battle_system.last_battle_turns
+        return outcomes, turns
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        headless_outcomes, headless_turns = asyncio.run(headless_battles())
+    headless_time = time.perf_counter() - start
+
+    streams = RNGStreamFactory(seed)
+    core_outcomes, core_turns = [], 0
+    start = time.perf_counter()
+    for _ in range(battles):
+        pokemon1, pokemon2 = matchup()
+        state = run_battle(pokemon1, pokemon2, streams.next_stream())
+        core_outcomes.append((state.winner == 0, pokemon1.current_hp, pokemon2.current_hp))
+        core_turns += state.turn
+    core_time = time.perf_counter() - start
+
+    core_rate = core_turns / core_time
+    baseline_rate = benchmark_baseline(battles, seed)
+    return {
+        "baseline_turns_per_second": baseline_rate,
+        "headless_turns_per_second": headless_turns / headless_time,
+        "core_turns_per_second": core_rate,
+        "speedup": core_rate / baseline_rate if baseline_rate else None,
+        "renderer_speedup": core_rate / (headless_turns / headless_time),
+        "identical_outcomes": headless_outcomes == core_outcomes,
+    }
+
+def test_battle_rules():
+    results = benchmark_rules()
+
+    rates = [("🐢", f"Original engine ({BASELINE_REVISION})", results["baseline_turns_per_second"]),
+             ("🖥️ ", "Async renderer over step()", results["headless_turns_per_second"]),
+             ("🚀", "Synchronous rules core", results["core_turns_per_second"])]
+    for icon, label, rate in rates:
+        if rate is not None:
+            print(f"{icon} {label:<27} {rate:8.0f} turns/s")
+    if results["speedup"] is not None:
+        print(f"📈 Over the original engine:   {results['speedup']:8.1f}x (target 100x)")
+    print(f"📈 Over the async renderer:    {results['renderer_speedup']:8.1f}x")
+    print(f"✅ Identical outcomes: {results['identical_outcomes']}")
+
+if __name__ == "__main__":
+    print("🧪 Testing Battle Rules Core")
+    test_battle_rules()
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import sys
+import time
+from typing import Optional
+
+from final_pokemon_game import CompletePokemonGame
+from game_input import StreamInput
+from metrics import peak_rss_kib
+from pacing import resolve_clock
+from rng_streams import RNGStreamFactory
+
+class GameSession:
+    """One TCP connection driving its own CompletePokemonGame."""
+
+    __slots__ = ("server", "reader", "writer", "game", "closing")
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.game = CompletePokemonGame(clock=server.clock, seed=server.streams.next_stream().next64(),
+                                        output=self)
+        self.game.ui.input_timeout = server.idle_timeout
+        self.closing = False
+
+    def write(self, text: str) -> int:
+        if not self.closing:
+            self.writer.write(text.encode("utf-8"))
+            if self.writer.transport.get_write_buffer_size() > self.server.output_limit:
+                self.close()
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+    def close(self):
+        if not self.closing:
+            self.closing = True
+            self.writer.close()
+
+    async def run(self):
+        self.game.ui.attach_input(StreamInput(self.reader), self.server.input_backlog)
+        try:
+            await self.game.start_game()
+        except (EOFError, TimeoutError):
+            pass
+        except Exception as error:
+            self.server.errors += 1
+            self.server.last_error = repr(error)
+        finally:
+            self.close()
+
+class BattleServer:
+    """Hosts many independent game sessions over a TCP line protocol on one event loop."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, clock=None, seed=None,
+                 max_line: int = 256, input_backlog: int = 16, output_limit: int = 64 * 1024,
+                 idle_timeout: Optional[float] = 300.0):
+        self.host = host
+        self.port = port
+        self.clock = resolve_clock(clock)
+        self.streams = RNGStreamFactory(seed)
+        self.max_line = max_line
+        self.input_backlog = input_backlog
+        self.output_limit = output_limit
+        self.idle_timeout = idle_timeout
+        self.sessions = set()
+        self.handlers = set()
+        self.sessions_served = 0
+        self.errors = 0
+        self.last_error = None
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                 limit=self.max_line, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def handle_connection(self, reader, writer):
+        session = GameSession(self, reader, writer)
+        handler = asyncio.current_task()
+        self.sessions.add(session)
+        self.handlers.add(handler)
+        self.sessions_served += 1
+        try:
+            await session.run()
+        finally:
+            self.sessions.discard(session)
+            self.handlers.discard(handler)
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self, timeout: float = 5.0):
+        """Stop accepting connections and end every session by closing its connection.
+
+        Each game sees end of input at its next prompt and finishes on its
+        own; handlers still running after ``timeout`` seconds are cancelled.
+        """
+        self.server.close()
+        for session in list(self.sessions):
+            session.close()
+        if self.handlers:
+            _, pending = await asyncio.wait(list(self.handlers), timeout=timeout)
+            for handler in pending:
+                handler.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.server.wait_closed()
+
+def scripted_reply(text: str, state: dict) -> Optional[str]:
+    if text.endswith("Choose your starter (1-3): "):
+        return "1"
+    if text.endswith("Choose an option (1-5): "):
+        state["menu"] = "3" if state.get("menu") == "1" else "1"
+        return state["menu"]
+    if text.endswith("Choose an action (1-4): "):
+        state["turns"] = state.get("turns", 0) + 1
+        return "1"
+    if text.endswith("Choose a move (0-4): "):
+        return "1"
+    if text.endswith("Press Enter to continue..."):
+        return ""
+    return None
+
+async def scripted_client(host: str, port: int, state: dict, stop: asyncio.Event):
+    reader, writer = await asyncio.open_connection(host, port)
+    tail = ""
+    try:
+        while not stop.is_set():
+            data = await reader.read(4096)
+            if not data:
+                break
+            tail = (tail + data.decode("utf-8", "replace"))[-200:]
+            reply = scripted_reply(tail, state)
+            if reply is not None:
+                tail = ""
+                writer.write(reply.encode() + b"\n")
+    finally:
+        writer.close()
+
+async def benchmark_server(idle: int = 5000, active: int = 500, duration: float = 10.0, clock=None):
+    from pacing import VirtualClock
+
+    server = await BattleServer(clock=clock or VirtualClock(), seed=1).start()
+    baseline_rss = peak_rss_kib()
+
+    idle_connections = []
+    for _ in range(idle):
+        idle_connections.append(await asyncio.open_connection(server.host, server.port))
+    while len(server.sessions) < idle:
+        await asyncio.sleep(0.01)
+    idle_rss = peak_rss_kib()
+
+    stop = asyncio.Event()
+    states = [{} for _ in range(active)]
+    clients = [asyncio.create_task(scripted_client(server.host, server.port, state, stop))
+               for state in states]
+    await asyncio.sleep(duration)
+    turns = sum(state.get("turns", 0) for state in states)
+    stop.set()
+
+    results = {
+        "idle_sessions": idle,
+        "active_sessions": active,
+        "concurrent_sessions": len(server.sessions),
+        "turns_per_second": turns / duration,
+        "rss_per_idle_session_kib": (idle_rss - baseline_rss) / max(1, idle),
+        "peak_rss_mib": peak_rss_kib() / 1024,
+        "errors": server.errors,
+    }
+
+    for task in clients:
+        task.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    for _, writer in idle_connections:
+        writer.close()
+    await server.close()
+    return results
+
+async def test_battle_server(idle: int = 5000, active: int = 500, duration: float = 10.0):
+    results = await benchmark_server(idle, active, duration)
+    print(f"🌐 Concurrent sessions: {results['concurrent_sessions']:,} "
+          f"({results['idle_sessions']:,} idle + {results['active_sessions']:,} battling)")
+    print(f"⚔️  Turns/second across active battles: {results['turns_per_second']:,.0f}")
+    print(f"🧠 RSS per idle session: {results['rss_per_idle_session_kib']:.1f} KiB "
+          f"(client sockets included), peak {results['peak_rss_mib']:.0f} MiB")
+    print(f"❗ Session errors: {results['errors']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pokemon battle server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--benchmark", action="store_true", help="run the load benchmark instead")
+    parser.add_argument("--idle", type=int, default=5000)
+    parser.add_argument("--active", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print("🧪 Benchmarking Battle Server")
+        asyncio.run(test_battle_server(args.idle, args.active, args.duration))
+        return
+
+    async def serve():
+        server = await BattleServer(args.host, args.port, seed=args.seed).start()
+        print(f"🌐 Battle server listening on {server.host}:{server.port}", file=sys.__stdout__)
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
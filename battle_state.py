@@ -0,0 +1,340 @@
+import bisect
+import copy
+import itertools
+import time
+import tracemalloc
+from array import array
+from collections import deque
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from battle_rules import BattleEvent, status_store
+from moves import pp_array
+from pokemon import Pokemon
+from status_effects import StatusStore, StatusType
+from type_chart import TYPE_CHART
+
+class CombatantRecord:
+    """One Pokemon's battle state inside a CowBattleState.
+
+    ``species`` holds the fields that never change during a battle and is
+    shared by every copy. A record may only be written by the state whose
+    ``generation`` it carries; any other state copies it first.
+    """
+
+    __slots__ = ("species", "current_hp", "status", "pp", "generation")
+
+    def __init__(self, species: tuple, current_hp: int, status: StatusStore,
+                 pp: Optional[array], generation: int):
+        self.species = species
+        self.current_hp = current_hp
+        self.status = status
+        self.pp = pp
+        self.generation = generation
+
+    @classmethod
+    def from_pokemon(cls, pokemon, generation: int = 0) -> "CombatantRecord":
+        species = (pokemon.name, pokemon.pokemon_type, pokemon.max_hp, pokemon.attack,
+                   pokemon.defense, pokemon.speed, tuple(pokemon.moves))
+        # Pokemon allocate their status store and PP lazily; don't force either here.
+        if isinstance(pokemon, Pokemon):
+            status, pp = pokemon._status_effects, pokemon._pp
+        else:
+            status, pp = status_store(pokemon), getattr(pokemon, "pp", None)
+        return cls(species, pokemon.current_hp, StatusStore() if status is None else status.copy(),
+                   None if pp is None else array(pp.typecode, pp), generation)
+
+    def copy(self, generation: int) -> "CombatantRecord":
+        return CombatantRecord(self.species, self.current_hp, self.status.copy(),
+                               None if self.pp is None else array(self.pp.typecode, self.pp), generation)
+
+    def write_to(self, pokemon):
+        pokemon.current_hp = self.current_hp
+        pokemon.status_effects = self.status.copy()
+        if self.pp is not None:
+            pp = getattr(pokemon, "pp", None)
+            if pp is not None:
+                pp[:] = self.pp
+
+class BattleSnapshot(NamedTuple):
+    """A frozen battle state; its records are shared, never written."""
+    records: Tuple[CombatantRecord, ...]
+    turn: int
+    winner: Optional[int]
+
+    @property
+    def hp(self) -> Tuple[int, ...]:
+        return tuple(record.current_hp for record in self.records)
+
+class CowBattleState:
+    """A battle state with O(1) snapshots and copy-on-write records.
+
+    Duck-types ``battle_rules.BattleState``: ``sides`` are CombatantViews
+    that read and write this state's records, so ``step()`` runs on it
+    unchanged. ``snapshot()`` hands out the current record tuple and bumps
+    ``generation``, which makes every record read-only to this state; the
+    next write to a Pokemon copies just that record and the small tuple of
+    record pointers. Reading ``status_effects`` or ``pp`` through a view
+    never copies; the rules change them through ``battle_rules.writable_status``
+    and ``moves.writable_pp``, which do.
+    """
+
+    __slots__ = ("records", "turn", "winner", "generation", "sides")
+
+    def __init__(self, records: Sequence[CombatantRecord], turn: int = 1, winner: Optional[int] = None,
+                 generation: int = 0):
+        self.records = tuple(records)
+        self.turn = turn
+        self.winner = winner
+        self.generation = generation
+        self.sides = tuple(CombatantView(self, side) for side in range(len(self.records)))
+
+    @classmethod
+    def from_pokemon(cls, *pokemon, turn: int = 1) -> "CowBattleState":
+        return cls([CombatantRecord.from_pokemon(member) for member in pokemon], turn)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: BattleSnapshot) -> "CowBattleState":
+        # Start past every stamp in the snapshot so none of its records are writable here.
+        return cls(snapshot.records, snapshot.turn, snapshot.winner,
+                   1 + max(record.generation for record in snapshot.records))
+
+    @property
+    def finished(self) -> bool:
+        return self.winner is not None
+
+    def snapshot(self) -> BattleSnapshot:
+        self.generation += 1
+        return BattleSnapshot(self.records, self.turn, self.winner)
+
+    def restore(self, snapshot: BattleSnapshot):
+        self.records = snapshot.records
+        self.turn = snapshot.turn
+        self.winner = snapshot.winner
+        self.generation = 1 + max(self.generation, max(record.generation for record in snapshot.records))
+        self.sides = tuple(CombatantView(self, side) for side in range(len(self.records)))
+
+    def branch(self) -> "CowBattleState":
+        return CowBattleState.from_snapshot(self.snapshot())
+
+    def writable(self, side: int) -> CombatantRecord:
+        record = self.records[side]
+        if record.generation != self.generation:
+            record = record.copy(self.generation)
+            records = self.records
+            self.records = records[:side] + (record,) + records[side + 1:]
+        return record
+
+    def write_back(self, pokemon: Sequence):
+        for record, member in zip(self.records, pokemon):
+            record.write_to(member)
+
+class CombatantView:
+    """One side of a CowBattleState; duck-types the Pokemon class.
+
+    Fields that can't change during a battle are copied onto the view once;
+    HP, status and PP go through the state so writes are copied on write.
+    ``status_effects`` and ``pp`` return the current record's objects for
+    reading; ``writable_status()`` and ``writable_pp()`` copy it first.
+    """
+
+    __slots__ = ("state", "side", "name", "pokemon_type", "typing", "max_hp", "attack", "defense", "speed",
+                 "moves")
+
+    def __init__(self, state: CowBattleState, side: int):
+        self.state = state
+        self.side = side
+        (self.name, self.pokemon_type, self.max_hp, self.attack, self.defense, self.speed,
+         self.moves) = state.records[side].species
+        self.typing = TYPE_CHART.typing(self.pokemon_type)
+
+    @property
+    def current_hp(self) -> int:
+        return self.state.records[self.side].current_hp
+
+    @current_hp.setter
+    def current_hp(self, value: int):
+        if value != self.state.records[self.side].current_hp:
+            self.state.writable(self.side).current_hp = value
+
+    @property
+    def status_effects(self) -> StatusStore:
+        return self.state.records[self.side].status
+
+    def writable_status(self) -> StatusStore:
+        return self.state.writable(self.side).status
+
+    @status_effects.setter
+    def status_effects(self, effects):
+        self.state.writable(self.side).status = (effects if isinstance(effects, StatusStore)
+                                                 else StatusStore(effects))
+
+    @property
+    def pp(self) -> array:
+        record = self.state.records[self.side]
+        # A record without PP has never spent any; don't store a fresh array on a shared record.
+        return pp_array(record.species[6]) if record.pp is None else record.pp
+
+    def writable_pp(self) -> array:
+        record = self.state.writable(self.side)
+        if record.pp is None:
+            record.pp = pp_array(record.species[6])
+        return record.pp
+
+    is_alive = Pokemon.is_alive
+    take_damage = Pokemon.take_damage
+    calculate_damage = Pokemon.calculate_damage
+    use_move_async = Pokemon.use_move_async
+    status_effect_tick = Pokemon.status_effect_tick
+
+class TurnDelta(NamedTuple):
+    """What one turn changed: the records it rewrote, its events, and the RNG state and winner after it."""
+    turn: int
+    changed: Tuple[Tuple[int, CombatantRecord], ...]
+    events: Tuple[BattleEvent, ...]
+    rng_state: Optional[tuple]
+    winner: Optional[int]
+
+class Checkpoint(NamedTuple):
+    snapshot: BattleSnapshot
+    rng_state: Optional[tuple]
+
+class Rewind(NamedTuple):
+    state: CowBattleState
+    rng_state: Optional[tuple]
+    events: Tuple[BattleEvent, ...]
+
+    def rng(self):
+        """A BattleRNG positioned where the battle's stream was, or None if it wasn't recorded."""
+        from rng_streams import BattleRNG
+
+        if self.rng_state is None:
+            return None
+        rng = BattleRNG(0)
+        rng.setstate(self.rng_state)
+        return rng
+
+def rng_state(rng) -> Optional[tuple]:
+    # Only counter-based streams have a state small enough to keep every turn.
+    return rng.getstate() if hasattr(rng, "draws") else None
+
+class BattleTimeline:
+    """A bounded history of one battle for rewinding.
+
+    A full snapshot is kept every ``interval`` turns and each turn in
+    between stores only the records it changed, which copy-on-write makes
+    free to find. At most ``max_checkpoints`` checkpoints are kept; turns
+    older than the oldest one are dropped, so memory is bounded by
+    ``interval * max_checkpoints`` turns of deltas.
+    """
+
+    def __init__(self, state: CowBattleState, rng=None, interval: int = 10, max_checkpoints: int = 16):
+        if interval < 1 or max_checkpoints < 1:
+            raise ValueError("interval and max_checkpoints must be at least 1")
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+        self.checkpoints = deque()
+        self.deltas = deque()
+        self.last = state.snapshot()
+        self.add_checkpoint(self.last, rng_state(rng))
+
+    @property
+    def first_turn(self) -> int:
+        return self.checkpoints[0].snapshot.turn
+
+    @property
+    def last_turn(self) -> int:
+        return self.last.turn
+
+    def add_checkpoint(self, snapshot: BattleSnapshot, state: Optional[tuple]):
+        self.checkpoints.append(Checkpoint(snapshot, state))
+        if len(self.checkpoints) > self.max_checkpoints:
+            self.checkpoints.popleft()
+            first_turn = self.first_turn
+            while self.deltas and self.deltas[0].turn < first_turn:
+                self.deltas.popleft()
+
+    def record(self, state: CowBattleState, events: Sequence[BattleEvent], rng=None):
+        """Store the turn that just ran on ``state``; call once after every ``step()``."""
+        previous = self.last.records
+        turn = self.last.turn
+        snapshot = state.snapshot()
+        changed = tuple((side, record) for side, record in enumerate(snapshot.records)
+                        if record is not previous[side])
+        current_rng = rng_state(rng)
+        self.deltas.append(TurnDelta(turn, changed, tuple(events), current_rng, snapshot.winner))
+        self.last = snapshot
+        if snapshot.turn > turn and (snapshot.turn - 1) % self.interval == 0:
+            self.add_checkpoint(snapshot, current_rng)
+
+    def rewind(self, turn: int) -> Rewind:
+        """The state at the start of ``turn``, the RNG state then, and every event recorded since."""
+        if not self.first_turn <= turn <= self.last_turn:
+            raise ValueError(f"turn {turn} is outside the kept history "
+                             f"({self.first_turn}..{self.last_turn})")
+
+        turns = [checkpoint.snapshot.turn for checkpoint in self.checkpoints]
+        checkpoint = self.checkpoints[bisect.bisect_right(turns, turn) - 1]
+        records = list(checkpoint.snapshot.records)
+        current_rng = checkpoint.rng_state
+        winner = checkpoint.snapshot.winner
+
+        # Deltas are one per turn, so the checkpoint's turn gives its offset directly.
+        start = checkpoint.snapshot.turn - self.deltas[0].turn if self.deltas else 0
+        events = []
+        for delta in itertools.islice(self.deltas, start, None):
+            if delta.turn < turn:
+                for side, record in delta.changed:
+                    records[side] = record
+                current_rng = delta.rng_state
+                winner = delta.winner
+            else:
+                events.extend(delta.events)
+        state = CowBattleState.from_snapshot(BattleSnapshot(tuple(records), turn, winner))
+        return Rewind(state, current_rng, tuple(events))
+
+def benchmark_snapshots(copies: int = 20_000) -> dict:
+    pokemon = (Pokemon("Pikachu", "Electric", 100, 55, 40, 90), Pokemon("Charmander", "Fire", 95, 52, 43, 65))
+    for member in pokemon:
+        status_store(member).add(StatusType.BURN, 3)
+
+    start = time.perf_counter()
+    for _ in range(copies):
+        branch = copy.deepcopy(pokemon)
+        branch[1].current_hp -= 10
+    deepcopy_time = (time.perf_counter() - start) / copies
+
+    state = CowBattleState.from_pokemon(*pokemon)
+    start = time.perf_counter()
+    for _ in range(copies):
+        state.snapshot()
+    snapshot_time = (time.perf_counter() - start) / copies
+
+    start = time.perf_counter()
+    for _ in range(copies):
+        branch = state.branch()
+        branch.sides[1].current_hp -= 10
+    branch_time = (time.perf_counter() - start) / copies
+
+    tracemalloc.start()
+    kept = [copy.deepcopy(pokemon) for _ in range(1_000)]
+    deepcopy_bytes = tracemalloc.get_traced_memory()[0] / len(kept)
+    tracemalloc.stop()
+    del kept
+    tracemalloc.start()
+    kept = [state.snapshot() for _ in range(1_000)]
+    snapshot_bytes = tracemalloc.get_traced_memory()[0] / len(kept)
+    tracemalloc.stop()
+
+    return {"deepcopy_us": deepcopy_time * 1e6, "snapshot_us": snapshot_time * 1e6,
+            "branch_and_write_us": branch_time * 1e6,
+            "deepcopy_bytes": deepcopy_bytes, "snapshot_bytes": snapshot_bytes}
+
+def test_battle_state():
+    results = benchmark_snapshots()
+    print(f"🐢 deepcopy + write: {results['deepcopy_us']:7.2f} us, {results['deepcopy_bytes']:6.0f} bytes")
+    print(f"📸 snapshot:         {results['snapshot_us']:7.2f} us, {results['snapshot_bytes']:6.0f} bytes")
+    print(f"🌿 branch + write:   {results['branch_and_write_us']:7.2f} us")
+
+if __name__ == "__main__":
+    print("🧪 Testing Copy-on-Write Battle State")
+    test_battle_state()
@@ -0,0 +1,347 @@
+import argparse
+import asyncio
+import contextlib
+import gc
+import inspect
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from async_ui import AsyncUI
+from battle_rules import (PARALYSIS_SKIP_CHANCE, BattleEvent, EventType, apply_damage,
+                          resolve_status_effects, status_store)
+from effect_rules import RULES as EFFECT_RULES
+from enhanced_battle import EnhancedBattleSystem
+from load_driver import NullOutput, percentile
+from moves import restore_pp
+from pacing import VirtualClock
+from pokemon import Pokemon
+from rng_streams import BattleRNG
+from special_moves import SpecialMoveSystem
+from species_catalog import CATALOG
+from status_effects import STATUS_ORDER, AdvancedStatusManager, StatusEffect, StatusType
+from team_battle import random_teams, run_team_battle
+
+PERCENTILES = (0.50, 0.90, 0.99)
+DEFAULT_THRESHOLD = 0.10
+
+class Benchmark(NamedTuple):
+    """One benchmark: ``setup(seed)`` returns the operation to time.
+
+    The operation is a plain or ``async`` callable taking no arguments; each
+    sample runs it ``inner`` times so very cheap operations aren't measured
+    against the timer's own overhead.
+    """
+    name: str
+    setup: Callable
+    iterations: int
+    inner: int = 1
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def benchmark(name: str, iterations: int, inner: int = 1):
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, iterations, inner)
+        return setup
+    return register
+
+def pikachu() -> Pokemon:
+    return Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+
+def charmander() -> Pokemon:
+    return Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+
+@benchmark("pokemon_construction", iterations=2_000, inner=100)
+def setup_construction(seed: int):
+    return pikachu
+
+@benchmark("calculate_damage", iterations=2_000, inner=100)
+def setup_damage(seed: int):
+    attacker, defender = pikachu(), charmander()
+    return lambda: attacker.calculate_damage("Thunder Shock", defender)
+
+@benchmark("apply_status_effects", iterations=2_000)
+def setup_status_effects(seed: int):
+    manager = AdvancedStatusManager(clock=VirtualClock(), rng=BattleRNG(seed, 0))
+    pokemon = pikachu()
+
+    async def apply():
+        pokemon.current_hp = pokemon.max_hp
+        pokemon.status_effects = [StatusEffect(StatusType.POISON, 3), StatusEffect(StatusType.PARALYSIS, 2)]
+        await manager.apply_status_effects(pokemon)
+    return apply
+
+@benchmark("use_special_move", iterations=2_000)
+def setup_special_move(seed: int):
+    special_moves = SpecialMoveSystem(clock=VirtualClock(), rng=BattleRNG(seed, 0))
+    attacker = Pokemon("Charizard", "Fire", 150, 80, 60, 100)
+    defender = Pokemon("Blastoise", "Water", 150, 75, 100, 78)
+
+    async def use():
+        defender.current_hp = defender.max_hp
+        defender.status_effects = ()
+        restore_pp(attacker)
+        await special_moves.use_special_move(attacker, defender, "Fire Blast")
+    return use
+
+@benchmark("single_pokemon_battle", iterations=500)
+def setup_single_battle(seed: int):
+    battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=seed)
+    return lambda: battle_system.single_pokemon_battle(pikachu(), charmander())
+
+@benchmark("trainer_battle", iterations=200)
+def setup_trainer_battle(seed: int):
+    battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=seed)
+    first, second = CATALOG.teams[0], CATALOG.teams[-1]
+    return lambda: battle_system.trainer_battle([CATALOG.create(species) for species in first],
+                                                [CATALOG.create(species) for species in second])
+
+@benchmark("team_battle_6v6", iterations=500)
+def setup_team_battle(seed: int):
+    first, second = random_teams(BattleRNG(seed, 1), 2)
+    rng = BattleRNG(seed, 0)
+    return lambda: run_team_battle([Pokemon(*row) for row in first], [Pokemon(*row) for row in second], rng)
+
+@benchmark("async_ui_render", iterations=1_000)
+def setup_ui_render(seed: int):
+    ui = AsyncUI(clock=VirtualClock(), output=NullOutput(), animate=True)
+    pokemon, opponent = pikachu(), charmander()
+
+    async def render():
+        # Alternate the HP so every panel draw has a changed line to redraw.
+        opponent.current_hp = opponent.max_hp if opponent.current_hp != opponent.max_hp else 40
+        ui.renderer.draw_panel(ui.battle_status_lines(pokemon, opponent))
+        await ui.type_message(f"⚡ {pokemon.name} uses Thunder Shock!")
+    return render
+
+async def call(operation, inner: int):
+    if inspect.iscoroutinefunction(operation):
+        for _ in range(inner):
+            await operation()
+    else:
+        for _ in range(inner):
+            result = operation()
+            if inspect.isawaitable(result):
+                await result
+
+async def measure(spec: Benchmark, iterations: Optional[int] = None, seed: int = 0) -> dict:
+    """Throughput, latency percentiles and tracemalloc peak for one benchmark.
+
+    Timing and memory come from separate runs, because tracing allocations
+    slows every allocation down several times over.
+    """
+    iterations = iterations or spec.iterations
+    inner = spec.inner
+    operation = spec.setup(seed)
+    await call(operation, max(1, iterations // 10) * inner)
+
+    samples = []
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        began = time.perf_counter()
+        await call(operation, inner)
+        samples.append((time.perf_counter() - began) / inner)
+    elapsed = time.perf_counter() - start
+
+    operation = spec.setup(seed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        await call(operation, max(1, iterations // 10) * inner)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    result = {"iterations": iterations * inner, "ops_per_second": iterations * inner / elapsed,
+              "mean_us": sum(samples) / len(samples) * 1e6}
+    for fraction in PERCENTILES:
+        result[f"p{round(fraction * 100)}_us"] = percentile(samples, fraction) * 1e6
+    result["peak_kib"] = peak / 1024
+    return result
+
+async def run_suite_async(names=None, iterations: Optional[int] = None, seed: int = 0) -> Dict[str, dict]:
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    # Battles and status messages print; the suite measures the game, not the terminal.
+    with contextlib.redirect_stdout(NullOutput()):
+        for name in names:
+            results[name] = await measure(BENCHMARKS[name], iterations, seed)
+    return results
+
+def run_suite(names=None, iterations: Optional[int] = None, seed: int = 0) -> Dict[str, dict]:
+    return asyncio.run(run_suite_async(names, iterations, seed))
+
+def legacy_resolve_status_effects(pokemon, side: int, events, rng=random) -> bool:
+    """The if/elif status chain ``effect_rules`` replaced, kept as its benchmark baseline."""
+    store = status_store(pokemon)
+    if not store:
+        return True
+
+    can_act = True
+    for effect in list(store):
+        effect_type = effect.effect_type
+        if effect_type == StatusType.POISON or effect_type == StatusType.BURN:
+            damage = max(1, pokemon.max_hp // (16 - effect.severity))
+            hp = apply_damage(pokemon, damage)
+            events.append(BattleEvent(EventType.STATUS_DAMAGE, side, damage, effect_type.value, hp))
+        elif effect_type == StatusType.PARALYSIS:
+            events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=effect_type.value))
+            if rng.random() < PARALYSIS_SKIP_CHANCE:
+                events.append(BattleEvent(EventType.FULLY_PARALYZED, side))
+                can_act = False
+        elif effect_type == StatusType.SLEEP:
+            events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=effect_type.value))
+            can_act = False
+        elif effect_type == StatusType.FREEZE:
+            events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=effect_type.value))
+            if rng.random() < 0.2:
+                status_store(pokemon).discard(effect_type)
+                events.append(BattleEvent(EventType.STATUS_CURED, side, detail=effect_type.value))
+            else:
+                can_act = False
+        elif effect_type == StatusType.CONFUSION:
+            events.append(BattleEvent(EventType.STATUS_ACTIVE, side, detail=effect_type.value))
+            if rng.random() < 0.33:
+                damage = pokemon.attack // 2
+                events.append(BattleEvent(EventType.SELF_HIT, side, damage))
+                hp = apply_damage(pokemon, damage)
+                events.append(BattleEvent(EventType.STATUS_DAMAGE, side, damage, effect_type.value, hp))
+                can_act = False
+
+    for effect_type in store.tick():
+        events.append(BattleEvent(EventType.STATUS_EXPIRED, side, detail=effect_type.value,
+                                  hp=pokemon.current_hp))
+    return can_act
+
+def legacy_recovery_message(pokemon, status: StatusType) -> str:
+    recovery_messages = {
+        StatusType.POISON: f"✨ {pokemon.name} recovered from poison!",
+        StatusType.BURN: f"✨ {pokemon.name} recovered from burn!",
+        StatusType.PARALYSIS: f"⚡ {pokemon.name} is no longer paralyzed!",
+        StatusType.SLEEP: f"😊 {pokemon.name} woke up!",
+        StatusType.FREEZE: f"🔥 {pokemon.name} thawed out!",
+        StatusType.CONFUSION: f"🧠 {pokemon.name} snapped out of confusion!",
+    }
+    return recovery_messages.get(status, f"✨ {pokemon.name} recovered!")
+
+def time_effects(resolve, status: StatusType, rounds: int, seed: int) -> float:
+    pokemon = Pokemon("Snorlax", "Normal", 60_000, 110, 65, 30)
+    store = pokemon.status_effects
+    rng = random.Random(seed)
+    events = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        store.add(status, 1_000_000)
+        resolve(pokemon, 0, events, rng)
+        events.clear()
+        pokemon.current_hp = 60_000
+    return (time.perf_counter() - start) / rounds
+
+def benchmark_effects(rounds: int = 50_000, seed: int = 3) -> dict:
+    """Nanoseconds to resolve one active condition, before and after ``effect_rules``."""
+    results = {}
+    for rule in EFFECT_RULES.statuses:
+        before = time_effects(legacy_resolve_status_effects, rule.status, rounds, seed)
+        after = time_effects(resolve_status_effects, rule.status, rounds, seed)
+        results[rule.name] = {"before_ns": before * 1e9, "after_ns": after * 1e9}
+
+    pokemon = Pokemon("Snorlax", "Normal", 60_000, 110, 65, 30)
+    start = time.perf_counter()
+    for index in range(rounds):
+        legacy_recovery_message(pokemon, STATUS_ORDER[index % len(STATUS_ORDER)])
+    before = time.perf_counter() - start
+    start = time.perf_counter()
+    for index in range(rounds):
+        EFFECT_RULES.statuses[index % len(STATUS_ORDER)].recovered.format(name=pokemon.name)
+    after = time.perf_counter() - start
+    results["recovery message"] = {"before_ns": before / rounds * 1e9, "after_ns": after / rounds * 1e9}
+    return results
+
+class Regression(NamedTuple):
+    benchmark: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+# Whether a bigger number is worse, for each metric compared against a baseline.
+COMPARED_METRICS = {"ops_per_second": False, "p50_us": True, "p99_us": True, "peak_kib": True}
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Every metric more than ``threshold`` worse than the baseline, for benchmarks in both."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            if metric not in result or metric not in reference:
+                continue
+            current, previous = result[metric], reference[metric]
+            if higher_is_worse:
+                regressed = current > previous * (1 + threshold)
+            else:
+                regressed = current < previous * (1 - threshold)
+            if regressed:
+                regressions.append(Regression(name, metric, previous, current))
+    return regressions
+
+def save_baseline(results: Dict[str, dict], path: str):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"python": sys.version.split()[0], "results": results}, handle, indent=2)
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)["results"]
+
+def print_results(results: Dict[str, dict]):
+    print(f"{'benchmark':<22} {'ops/s':>11} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'peak KiB':>9}")
+    for name, result in results.items():
+        print(f"{name:<22} {result['ops_per_second']:>11,.0f} {result['p50_us']:>9.2f} "
+              f"{result['p90_us']:>9.2f} {result['p99_us']:>9.2f} {result['peak_kib']:>9.1f}")
+
+def print_regressions(regressions: List[Regression], threshold: float):
+    if not regressions:
+        print(f"✅ No regressions beyond {threshold:.0%}")
+        return
+    print(f"❌ {len(regressions)} regression(s) beyond {threshold:.0%}:")
+    for regression in regressions:
+        print(f"   {regression.benchmark} {regression.metric}: {regression.baseline:,.2f} → "
+              f"{regression.current:,.2f} ({regression.change:+.0%})")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--iterations", type=int, help="samples per benchmark instead of each one's default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="compare the results against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fraction a metric may get worse before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.names, args.iterations, args.seed)
+    print_results(results)
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.threshold)
+        print_regressions(regressions, args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,40 @@
 import asyncio
+import os
 import unittest
 from pokemon import Pokemon
 from status_effects import AdvancedStatusManager, StatusType, StatusEffect
 from special_moves import SpecialMoveSystem
 from async_ui import AsyncUI
+from enhanced_battle import EnhancedBattleSystem
+from pacing import VirtualClock, ScaledClock
+import battle_rules
+import tournament
+from rng_streams import BattleRNG, RNGStreamFactory
+import battle_replay
+import battle_server
+import renderer
+import game_input
+import load_driver
+import pokemon_pool
+import win_probability
+import battle_ai
+import moves
+import battle_state
+import benchmarks
+import metrics
+import tracing
+import effect_rules
+import species_catalog
+import encounters
+import type_chart
+import damage_tables
+import team_battle
+
+try:
+    import numpy
+    import batch_sim
+except ImportError:
+    numpy = None
 
 class ComprehensiveGameTest(unittest.TestCase):
     """Test suite covering all game systems."""
@@ -33,6 +64,41 @@ class ComprehensiveGameTest(unittest.TestCase):
         self.assertEqual(thunder.power, 110)
         self.assertEqual(thunder.move_type, "Electric")
     
+    def test_move_registry_is_shared_and_pp_is_per_pokemon(self):
+        fire_blast = moves.MOVES["Fire Blast"]
+        self.assertIs(moves.MOVES[fire_blast.id], fire_blast)
+        self.assertIs(SpecialMoveSystem().moves_database, self.special_moves.moves_database)
+        self.assertEqual(battle_rules.SPECIAL_SIDE_EFFECTS[fire_blast.id].status, StatusType.BURN)
+        with self.assertRaises(AttributeError):
+            moves.MOVES.moves = ()
+        
+        charmander = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+        rival = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+        target = Pokemon("Snorlax", "Normal", 500, 50, 60, 30)
+        system = SpecialMoveSystem(VirtualClock(), BattleRNG(1, 0))
+        for _ in range(fire_blast.max_pp):
+            self.assertTrue(asyncio.run(system.use_special_move(charmander, target, "Fire Blast")))
+        self.assertEqual(moves.remaining_pp(charmander, fire_blast), 0)
+        self.assertFalse(asyncio.run(system.use_special_move(charmander, target, "Fire Blast")))
+        self.assertEqual(moves.remaining_pp(rival, fire_blast), fire_blast.max_pp)
+        self.assertIsNone(moves.remaining_pp(charmander, moves.MOVES["Ember"]))
+        
+        import contextlib
+        import io
+        
+        async def menu():
+            ui = AsyncUI(VirtualClock())
+            ui.attach_input(["0"])
+            return await ui.display_move_menu(charmander)
+        
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            asyncio.run(menu())
+        self.assertIn(f"Fire Blast (PP: 0/{fire_blast.max_pp})", output.getvalue())
+        self.assertIn("1. Ember\n", output.getvalue())
+        
+        moves.restore_pp(charmander)
+        self.assertEqual(moves.remaining_pp(charmander, fire_blast), fire_blast.max_pp)
+    
     def test_health_bar_creation(self):
         full_bar = self.ui.create_health_bar(1.0, 10)
         self.assertEqual(len(full_bar), 10)
@@ -49,7 +115,797 @@ class ComprehensiveGameTest(unittest.TestCase):
         
         damage = pikachu.calculate_damage("Thunder Shock", charmander)
         self.assertGreater(damage, 0)
-        self.assertLessEqual(damage, pikachu.attack)
+        self.assertEqual(damage, int((pikachu.attack - charmander.defense // 4) * 1.5))
+    
+    def test_virtual_clock_battle(self):
+        import contextlib
+        import io
+        
+        clock = VirtualClock()
+        battle_system = EnhancedBattleSystem(clock=clock)
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        charmander = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            winner = asyncio.run(battle_system.single_pokemon_battle(pikachu, charmander))
+        
+        self.assertIn(winner, (pikachu, charmander))
+        self.assertGreater(clock.now(), 0)
+        self.assertEqual(clock.now(), clock.elapsed)
+        self.assertGreater(battle_system.last_battle_turns, 0)
+    
+    def test_scaled_clock_rejects_negative_scale(self):
+        with self.assertRaises(ValueError):
+            ScaledClock(-1)
+    
+    def test_rules_core_matches_rendered_battle(self):
+        import contextlib
+        import io
+        
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        charmander = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+        state = battle_rules.run_battle(pikachu, charmander, BattleRNG(11, 0))
+        core_result = (state.winner, pikachu.current_hp, charmander.current_hp)
+        
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        charmander = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+        battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=11)
+        with contextlib.redirect_stdout(io.StringIO()):
+            winner = asyncio.run(battle_system.single_pokemon_battle(pikachu, charmander))
+        rendered_result = (0 if winner is pikachu else 1, pikachu.current_hp, charmander.current_hp)
+        
+        self.assertEqual(core_result, rendered_result)
+    
+    def test_rules_step_emits_events(self):
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        charmander = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+        state = battle_rules.BattleState(pikachu, charmander)
+        
+        state, events = battle_rules.step(state, ("Quick Attack", "Scratch"))
+        
+        kinds = [event.kind for event in events]
+        self.assertEqual(kinds[0], battle_rules.EventType.TURN_START)
+        self.assertIn(battle_rules.EventType.DAMAGE, kinds)
+        self.assertTrue(all(event.detail != "Tackle" for event in events))
+    
+    def test_frozen_pokemon_thaw_is_removed_once(self):
+        import random
+        
+        class AlwaysThaw(random.Random):
+            def random(self):
+                return 0.0
+        
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        pikachu.status_effects = [StatusEffect(StatusType.FREEZE, 1)]
+        events = []
+        
+        can_act = battle_rules.resolve_status_effects(pikachu, 0, events, AlwaysThaw())
+        
+        self.assertTrue(can_act)
+        self.assertEqual(pikachu.status_effects, [])
+    
+    def test_battle_rng_streams_are_reproducible_and_distinct(self):
+        first = [BattleRNG(9, 1).random() for _ in range(2)]
+        stream = BattleRNG(9, 1)
+        replay = [stream.random() for _ in range(50)]
+        prefetched = BattleRNG(9, 1, prefetch=16)
+        unbuffered = BattleRNG(9, 1, prefetch=0)
+        
+        self.assertEqual(first[0], first[1])
+        self.assertEqual(replay, [prefetched.random() for _ in range(50)])
+        self.assertEqual(replay, [unbuffered.random() for _ in range(50)])
+        self.assertNotEqual(replay, [BattleRNG(9, 2).random() for _ in range(50)])
+        
+        jumped = BattleRNG(9, 1)
+        jumped.jump(10)
+        self.assertEqual(jumped.random(), replay[10])
+        
+        factory = RNGStreamFactory(9)
+        self.assertEqual(factory.next_stream().battle_id, 0)
+        self.assertEqual(factory.next_stream().battle_id, 1)
+        
+        with self.assertRaises(ValueError):
+            BattleRNG(9, -1)
+    
+    def test_replay_round_trip_with_turn_seek(self):
+        import contextlib
+        import io
+        import os
+        import tempfile
+        
+        for compress in (False, True):
+            path = os.path.join(tempfile.mkdtemp(), "battle.pkrp")
+            writer = battle_replay.ReplayWriter(path, compress=compress, block_turns=1)
+            battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=4, recorder=writer)
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(battle_system.single_pokemon_battle(
+                    Pokemon("Geodude", "Rock", 90, 60, 70, 20),
+                    Pokemon("Squirtle", "Water", 98, 48, 55, 43)))
+            writer.close()
+            
+            with battle_replay.ReplayReader(path) as reader:
+                battle = reader.battle(0)
+                events = [event for _, event in reader.events(battle)]
+                self.assertEqual(events, battle_system.battle_log)
+                self.assertEqual((battle.seed, battle.battle_id), (4, 0))
+                self.assertEqual(battle.roster[0].name, "Geodude")
+                
+                last_turn = max(turn for turn, _ in reader.events(battle))
+                later = [event for turn, event in reader.events(battle, last_turn)]
+                self.assertEqual(later, events[len(events) - len(later):])
+                self.assertEqual(later[0].kind, battle_rules.EventType.TURN_START)
+                
+                hp = reader.hp_at(battle, last_turn)
+                damage_events = [event for event in events[:len(events) - len(later)]
+                                 if event.kind == battle_rules.EventType.DAMAGE]
+                for event in damage_events:
+                    self.assertEqual(hp[event.side], min(e.hp for e in damage_events if e.side == event.side))
+    
+    def test_tournament_chunks_are_reproducible(self):
+        species = tournament.tournament_species()
+        pairs = tournament.chunk_pairs(len(species), 5)[0]
+        
+        first = tournament.run_chunk(species, pairs, 20, seed=3, chunk_id=0)
+        second = tournament.run_chunk(species, pairs, 20, seed=3, chunk_id=0)
+        split = (tournament.run_chunk(species, pairs[:2], 20, seed=3, chunk_id=4) +
+                 tournament.run_chunk(species, pairs[2:], 20, seed=3, chunk_id=5))
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first, split)
+        self.assertEqual(len(first), 5)
+        self.assertEqual(len({data[0] for data in species}), len(species))
+    
+    def test_exact_tournament_reports_rates_not_wins(self):
+        from win_probability import win_probability
+
+        species = tournament.tournament_species()[:3]
+        results = tournament.run_tournament(battles=50, workers=1, engine="exact", species=species)
+        exact = win_probability(Pokemon(*species[0]), Pokemon(*species[1])).win_probability
+        self.assertIsNone(results["wins"])
+        self.assertEqual(results["win_rate"][0][1], exact)
+        self.assertEqual(results["confidence_95"][0][1], (exact, exact))
+        self.assertNotIn("battles_per_second", results)
+        self.assertIn("pairs_per_second", results)
+
+    def test_wilson_interval_brackets_rate(self):
+        low, high = tournament.wilson_interval(30, 100)
+        self.assertLess(low, 0.3)
+        self.assertGreater(high, 0.3)
+        self.assertEqual(tournament.wilson_interval(0, 0), (0.0, 1.0))
+    
+    def test_battle_server_runs_isolated_sessions(self):
+        async def play(host, port, replies):
+            reader, writer = await asyncio.open_connection(host, port)
+            transcript = ""
+            for prompt, reply in replies:
+                while not transcript.endswith(prompt):
+                    data = await reader.read(4096)
+                    self.assertTrue(data, f"connection closed before {prompt!r}")
+                    transcript += data.decode()
+                writer.write(reply.encode() + b"\n")
+            transcript += (await reader.read()).decode()
+            writer.close()
+            return transcript
+        
+        async def scenario():
+            server = await battle_server.BattleServer(clock=VirtualClock(), seed=2).start()
+            try:
+                transcripts = await asyncio.gather(*(
+                    play(server.host, server.port, [("Choose your starter (1-3): ", starter),
+                                                    ("Choose an option (1-5): ", "5")])
+                    for starter in ("1", "3")))
+            finally:
+                await server.close()
+            return server, transcripts
+        
+        server, (first, second) = asyncio.run(scenario())
+        self.assertEqual(server.errors, 0)
+        self.assertEqual(server.sessions_served, 2)
+        self.assertIn("You chose Pikachu!", first)
+        self.assertIn("You chose Squirtle!", second)
+        self.assertNotIn("You chose Pikachu!", second)
+        self.assertIn("Thanks for playing", first)
+    
+    def test_renderer_redraws_only_changed_panel_lines(self):
+        import io
+        import sys
+        
+        stream = io.StringIO()
+        ui = AsyncUI(VirtualClock(), output=stream, animate=True)
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        rattata = Pokemon("Rattata", "Normal", 80, 45, 35, 72)
+        
+        async def scenario():
+            ui.attach_input(["1", "1"])
+            async with ui.renderer:
+                for _ in range(2):
+                    await ui.display_battle_menu(pikachu, rattata)
+                    rattata.current_hp -= 10
+        
+        stdout = sys.stdout
+        asyncio.run(scenario())
+        self.assertIs(sys.stdout, stdout)
+        first, second = stream.getvalue().split("Choose an action (1-4): ")[:2]
+        self.assertTrue(first.startswith(renderer.CLEAR_SCREEN))
+        self.assertEqual(second.count("\033[2K"), 1)
+        self.assertIn("70/80", second)
+        self.assertNotIn("Pikachu", second)
+        self.assertIs(ui.create_health_bar(0.5), ui.create_health_bar(0.5))
+    
+    def test_type_message_skips_animation_off_terminal(self):
+        stream = renderer.CountingStream()
+        clock = VirtualClock()
+        ui = AsyncUI(clock, output=stream)
+        
+        async def scenario():
+            async with ui.renderer:
+                await ui.type_message("Pikachu used Thunder Shock!", 0.05)
+        
+        asyncio.run(scenario())
+        self.assertFalse(ui.renderer.animate)
+        self.assertEqual(stream.getvalue(), "Pikachu used Thunder Shock!\n")
+        self.assertEqual(stream.writes, 1)
+        self.assertAlmostEqual(clock.now(), 0.05 * len("Pikachu used Thunder Shock!"))
+    
+    def test_scripted_input_drives_game_without_threads(self):
+        import io
+        import threading
+        from final_pokemon_game import CompletePokemonGame
+        
+        stream = io.StringIO()
+        game = CompletePokemonGame(clock=VirtualClock(), seed=3, output=stream)
+        threads = threading.active_count()
+        
+        async def scenario():
+            game.ui.attach_input(game_input.ScriptInput(["2", "4", "", "5"]))
+            await game.start_game()
+            return threading.active_count()
+        
+        self.assertEqual(asyncio.run(scenario()), threads)
+        self.assertIn("You chose Charmander!", stream.getvalue())
+        self.assertIn("Thanks for playing", stream.getvalue())
+    
+    def test_terminal_input_reads_pipe_with_timeout(self):
+        import io
+        import os
+        
+        read_fd, write_fd = os.pipe()
+        ui = AsyncUI(VirtualClock(), output=io.StringIO())
+        
+        async def scenario():
+            ui.attach_input(game_input.TerminalInput(read_fd))
+            os.write(write_fd, b"1\n2\n")
+            answers = [await ui.get_user_input("> "), await ui.get_user_input("> ")]
+            with self.assertRaises(asyncio.TimeoutError):
+                await ui.get_user_input("> ", timeout=0.01)
+            os.close(write_fd)
+            with self.assertRaises(EOFError):
+                await ui.get_user_input("> ")
+            ui.close_input()
+            return answers
+        
+        try:
+            self.assertEqual(asyncio.run(scenario()), ["1", "2"])
+        finally:
+            os.close(read_fd)
+    
+    def test_stream_input_skips_lines_over_the_limit(self):
+        async def scenario():
+            reader = asyncio.StreamReader(limit=16)
+            stream = game_input.StreamInput(reader)
+            reader.feed_data(b"x" * 100 + b"\n1\n" + b"y" * 40)
+            first = await stream.readline()
+            second = asyncio.ensure_future(stream.readline())
+            await asyncio.sleep(0)
+            reader.feed_data(b"y" * 40 + b"\n2\n3")
+            reader.feed_eof()
+            return [first, await second, await stream.readline(), await stream.readline()]
+
+        self.assertEqual(asyncio.run(scenario()), ["1", "2", "3", None])
+
+    def test_load_driver_plays_sessions_to_completion(self):
+        results = asyncio.run(load_driver.run_load(sessions=5, battles=2, seed=7))
+        self.assertEqual(results["errors"], 0, results["last_error"])
+        self.assertGreater(results["turns"], 0)
+        self.assertGreaterEqual(results["p99_turn_ms"], results["p50_turn_ms"])
+        
+        stats = load_driver.LoadStats()
+        output = asyncio.run(load_driver.drive_session(7, 1, stats, capture=True))
+        self.assertEqual((stats.sessions, stats.battles), (1, 1))
+        self.assertIn("Pokemon Center", output.getvalue())
+        self.assertIn("Thanks for playing", output.getvalue())
+    
+    def test_pokemon_is_compact_and_shares_moves(self):
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        raichu = Pokemon("Raichu", "Electric", 110, 85, 50, 110)
+        
+        self.assertFalse(hasattr(pikachu, "__dict__"))
+        self.assertIs(pikachu.moves, raichu.moves)
+        self.assertIsNone(pikachu._status_effects)
+        pikachu.status_effects.append(StatusEffect(StatusType.POISON, 2))
+        self.assertEqual(len(pikachu.status_effects), 1)
+        with self.assertRaises(AttributeError):
+            pikachu.nickname = "Sparky"
+    
+    def test_pokemon_pool_views_battle_like_objects(self):
+        pool = pokemon_pool.PokemonPool()
+        pool.extend([("Pikachu", "Electric", 100, 55, 40, 90), ("Geodude", "Rock", 90, 60, 70, 20)])
+        
+        pooled = battle_rules.run_battle(pool[0], pool[1], BattleRNG(8, 0))
+        objects = battle_rules.run_battle(Pokemon("Pikachu", "Electric", 100, 55, 40, 90),
+                                          Pokemon("Geodude", "Rock", 90, 60, 70, 20), BattleRNG(8, 0))
+        
+        self.assertEqual((pooled.winner, pooled.turn), (objects.winner, objects.turn))
+        self.assertEqual([pokemon.current_hp for pokemon in pool],
+                         [pokemon.current_hp for pokemon in objects.sides])
+        self.assertEqual(pool[0], pool[0])
+        self.assertEqual(pool[1].moves, Pokemon("Geodude", "Rock", 90, 60, 70, 20).moves)
+        self.assertEqual(pool.nbytes(), 2 * 13)
+        pool.heal_all()
+        self.assertEqual(pool[1].current_hp, 90)
+
+    def test_species_catalog_indexes_and_caches(self):
+        import json
+        import os
+        import tempfile
+
+        catalog = species_catalog.CATALOG
+        self.assertEqual(catalog["Geodude"], ("Geodude", "Rock", 90, 60, 70, 20))
+        self.assertEqual(sorted(catalog[species][0] for species in catalog.of_type("Electric")),
+                         ["Pichu", "Pikachu", "Raichu"])
+        self.assertEqual([catalog[species][5] for species in catalog.with_stat("speed", 60, 81)],
+                         [60, 65, 72, 80, 81])
+        self.assertEqual(len(catalog.of_type("Dragon")), 0)
+        self.assertEqual(catalog.create(catalog.group("starter")[0]).name, "Pikachu")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "species.json")
+            cache_path = os.path.join(directory, "species.bin")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(species_catalog.synthetic_species(500), handle)
+            built = species_catalog.load_catalog(path, cache_path)
+            self.assertTrue(os.path.exists(cache_path))
+            cached = species_catalog.load_catalog(path, cache_path)
+            self.assertEqual(list(cached), list(built))
+            self.assertEqual(list(cached.with_stat("attack", 50, 90)), list(built.with_stat("attack", 50, 90)))
+            self.assertEqual(list(cached.group("wild")), list(built.group("wild")))
+
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"species": [["Mew", "Psychic", 100, 100, 100, 100]]}, handle)
+            self.assertEqual(list(species_catalog.load_catalog(path, cache_path)),
+                             [("Mew", "Psychic", 100, 100, 100, 100)])
+
+        with self.assertRaises(KeyError):
+            species_catalog.build_catalog({"species": [], "groups": {"wild": ["Missingno"]}})
+
+    def test_alias_encounter_tables_are_exact_and_rebuild_lazily(self):
+        import random
+
+        weights = [5.0, 1.0, 0.0, 10.0, 4.0]
+        table = encounters.AliasTable(range(len(weights)), weights)
+        mass = [0.0] * len(weights)
+        for column in range(table.size):
+            mass[table.outcome[column]] += table.probability[column] / table.size
+            mass[table.alias[column]] += (1.0 - table.probability[column]) / table.size
+        for outcome, weight in enumerate(weights):
+            self.assertAlmostEqual(mass[outcome], weight / sum(weights))
+
+        single = random.Random(4)
+        expected = [table.sample(single) for _ in range(200)]
+        self.assertEqual(list(table.sample_many(200, random.Random(4))), expected)
+        if numpy is not None:
+            samples = table.sample_array(10_000, numpy.random.default_rng(0))
+            self.assertNotIn(2, samples)
+
+        system = encounters.build_encounters({"zones": {
+            "lake": {"day": {"Magikarp": 1, "Gyarados": 0}},
+            "cave": {"day": {"Geodude": 1}},
+        }})
+        cave = system.table("cave", "day").alias
+        gyarados = species_catalog.CATALOG.index("Gyarados")
+        self.assertNotIn(gyarados, system.sample_many("lake", "day", 200))
+        system.set_weight("lake", "day", "Magikarp", 0)
+        system.set_weight("lake", "day", "Gyarados", 3)
+        self.assertEqual(system.encounter("lake", "day").name, "Gyarados")
+        self.assertIs(system.table("cave", "day").alias, cave)
+        with self.assertRaises(KeyError):
+            system.sample("volcano", "day")
+
+    def test_cow_snapshots_share_records_and_rewind(self):
+        pokemon = (Pokemon("Pikachu", "Electric", 100, 55, 40, 90), Pokemon("Charmander", "Fire", 95, 52, 43, 65))
+        state = battle_state.CowBattleState.from_pokemon(*pokemon)
+        snapshot = state.snapshot()
+        state.sides[1].current_hp -= 10
+        self.assertIs(state.records[0], snapshot.records[0])
+        self.assertIsNot(state.records[1], snapshot.records[1])
+        self.assertEqual(snapshot.hp, (100, 95))
+        self.assertEqual(state.snapshot().hp, (100, 85))
+        branch = state.branch()
+        branch.sides[0].writable_status().add(StatusType.BURN, 3)
+        self.assertTrue(branch.sides[0].status_effects)
+        self.assertFalse(state.sides[0].status_effects)
+
+        # Reading status and PP doesn't copy: a turn with no status change only copies the damaged side.
+        state = battle_state.CowBattleState.from_pokemon(*pokemon)
+        timeline = battle_state.BattleTimeline(state, BattleRNG(7, 0))
+        before = state.records
+        state, events = battle_rules.step(state, ("Tackle", "Tackle"), BattleRNG(7, 0),
+                                          roller=lambda side, move, rng: (20 if side == 0 else 0, False))
+        timeline.record(state, events)
+        self.assertEqual(state.snapshot().hp, (100, 75))
+        self.assertEqual([side for side, record in timeline.deltas[-1].changed], [1])
+        self.assertIs(state.records[0], before[0])
+
+        rng = BattleRNG(7, 0)
+        state = battle_state.CowBattleState.from_pokemon(*(Pokemon(name, kind, 400, 30, 60, speed)
+                                                          for name, kind, speed in (("Pikachu", "Electric", 90),
+                                                                                    ("Geodude", "Rock", 20))))
+        timeline = battle_state.BattleTimeline(state, rng, interval=3, max_checkpoints=2)
+        hp_at_turn, recorded = {}, {}
+        while not state.finished:
+            hp_at_turn[state.turn] = state.snapshot().hp
+            turn = state.turn
+            state, events = battle_rules.step(state, rng=rng)
+            timeline.record(state, events, rng)
+            recorded[turn] = events
+
+        self.assertEqual(len(timeline.checkpoints), 2)
+        self.assertGreater(timeline.first_turn, 1)
+        with self.assertRaises(ValueError):
+            timeline.rewind(1)
+        for turn in range(timeline.first_turn, timeline.last_turn):
+            rewind = timeline.rewind(turn)
+            self.assertEqual(rewind.state.snapshot().hp, hp_at_turn[turn])
+            replayed, events = battle_rules.step(rewind.state, rng=rewind.rng())
+            self.assertEqual(events, recorded[turn])
+            self.assertEqual(replayed.snapshot().hp, hp_at_turn.get(turn + 1, state.snapshot().hp))
+
+    def test_type_chart_multipliers_are_shared_by_damage_paths(self):
+        chart = type_chart.TYPE_CHART
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        squirtle = Pokemon("Squirtle", "Water", 98, 48, 55, 43)
+        gastly = Pokemon("Gastly", "Ghost", 60, 35, 30, 80)
+        onix = Pokemon("Onix", "Rock/Ground", 70, 45, 160, 70)
+        self.assertEqual(chart.typing("Rock/Ground"), chart.typing("Ground/Rock"))
+        self.assertEqual(Pokemon("Clefairy", "Cosmic", 70, 45, 48, 35).typing, type_chart.NEUTRAL)
+        self.assertEqual(chart.typing("Water/Cosmic"), chart.typing("Water"))
+        lapras = Pokemon("Lapras", "Ice/Water", 130, 85, 80, 60)
+        self.assertEqual(chart.typing("Water/Ice"), lapras.typing)
+        ferrothorn = Pokemon("Ferrothorn", "Grass/Steel", 74, 94, 131, 20)
+        self.assertEqual(chart.move_multiplier(pikachu, ferrothorn, moves.MOVES.ids["Thunder Shock"]), 0.75)
+        self.assertEqual(chart.move_multiplier(squirtle, ferrothorn, moves.MOVES.ids["Water Gun"]), 0.75)
+
+        self.assertEqual(chart.move_multiplier(pikachu, squirtle, moves.MOVES.ids["Thunder Shock"]), 3.0)
+        self.assertEqual(chart.move_multiplier(pikachu, squirtle, moves.MOVES.ids["Tackle"]), 1.0)
+        self.assertEqual(chart.move_multiplier(squirtle, onix, moves.MOVES.ids["Water Gun"]), 6.0)
+        self.assertEqual(chart.move_multiplier(pikachu, squirtle, None), 1.0)
+        self.assertEqual(pikachu.calculate_damage("Tackle", gastly), 1)
+        self.assertEqual(pikachu.calculate_damage("Thunder Shock", squirtle),
+                         3 * pikachu.calculate_damage("Tackle", squirtle))
+
+        special_moves = SpecialMoveSystem(clock=VirtualClock(), rng=BattleRNG(3, 0))
+        thunder = moves.SPECIAL_MOVES["Thunder"]
+        immune = special_moves.calculate_special_damage(pikachu, thunder, onix)
+        self.assertEqual(immune, 1)
+
+        # Every engine agrees the Ghost can't be hurt by Normal moves beyond the 1-damage floor.
+        rattata = ("Rattata", "Normal", 98, 48, 55, 43)
+        ghost = ("Gastly", "Ghost", 98, 48, 55, 30)
+        odds = win_probability.win_probability(Pokemon(*ghost), Pokemon(*rattata))
+        self.assertGreater(odds.win_probability, 0.99)
+        if numpy is not None:
+            batch = batch_sim.BatchBattleSimulator(seed=1).simulate(ghost, rattata, 200)
+            self.assertGreater(batch.win_rate(0), 0.95)
+            table = chart.array()
+            for typings in ((1, 2, 3), (chart.typing("Rock/Ground"), 0, 5), (0, 7, 0)):
+                self.assertEqual(table[typings], chart.multiplier(*typings))
+
+        # Interning a typing swaps in a whole new matrix; the old one stays intact for readers holding it.
+        fresh = type_chart.load_chart()
+        old_size, old_multipliers = fresh.matrix
+        dragon_fairy = fresh.typing("Dragon/Fairy")
+        self.assertEqual(len(old_multipliers), old_size * old_size * fresh.move_type_count)
+        self.assertEqual(fresh.size, old_size + 1)
+        self.assertEqual(len(fresh.multipliers), fresh.size * fresh.size * fresh.move_type_count)
+        self.assertEqual(fresh.multiplier(dragon_fairy, dragon_fairy, fresh.type_ids["Dragon"]), 0.0)
+        if numpy is not None:
+            self.assertEqual(fresh.array().shape[0], fresh.size)
+
+    def test_damage_tables_are_exact_and_cached_by_roster(self):
+        import tempfile
+        roster = [("Pikachu", "Electric", 100, 55, 40, 90), ("Squirtle", "Water", 98, 48, 55, 43),
+                  ("Gastly", "Ghost", 60, 35, 30, 80)]
+        with tempfile.TemporaryDirectory() as directory:
+            tables = damage_tables.load_tables(roster, directory)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            cached = damage_tables.load_tables(roster, directory)
+            self.assertEqual(cached.cumulative, tables.cumulative)
+            self.assertEqual(cached.expected, tables.expected)
+            stronger = [("Pikachu", "Electric", 100, 60, 40, 90)] + roster[1:]
+            self.assertNotEqual(damage_tables.load_tables(stronger, directory).digest, tables.digest)
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+        # Thunder Shock rolls 44-66, tripled against Water, and crits for half again.
+        rolls = [roll * 3 for roll in range(44, 67)]
+        expected = sum(damage * (1 - battle_rules.CRITICAL_CHANCE)
+                       + int(damage * 1.5) * battle_rules.CRITICAL_CHANCE for damage in rolls) / len(rolls)
+        self.assertAlmostEqual(tables.expected_damage(0, 1, "Thunder Shock"), expected)
+        distribution = tables.distribution(0, 1, "Thunder Shock")
+        self.assertAlmostEqual(sum(probability for _, _, probability in distribution), 1.0)
+        self.assertEqual(distribution[0], (132, False, (1 - battle_rules.CRITICAL_CHANCE) / 23))
+        self.assertEqual({damage for damage, _, _ in tables.distribution(1, 2, "Tackle")}, {1})
+
+        rng = BattleRNG(4, 0)
+        hits = [tables.sample(0, 1, "Thunder Shock", rng) for _ in range(20_000)]
+        self.assertAlmostEqual(sum(damage for damage, _ in hits) / len(hits), expected, delta=1.0)
+        self.assertAlmostEqual(sum(critical for _, critical in hits) / len(hits),
+                               battle_rules.CRITICAL_CHANCE, delta=0.01)
+
+        state = battle_rules.run_battle(Pokemon(*roster[0]), Pokemon(*roster[1]), rng, roller=tables.roller(0, 1))
+        self.assertEqual(state.winner, 0)
+
+    def test_team_battle_switches_and_replaces_fainted(self):
+        import contextlib
+        import io
+        from final_pokemon_game import CompletePokemonGame
+        
+        rows = [("Pikachu", "Electric", 100, 55, 40, 90), ("Squirtle", "Water", 98, 48, 55, 43),
+                ("Geodude", "Rock", 90, 60, 70, 20)]
+        state = team_battle.TeamBattleState([Pokemon(*row) for row in rows], [Pokemon(*row) for row in rows])
+        state, events = team_battle.step_team(state, (team_battle.Switch(2), "Tackle"), BattleRNG(1, 0))
+        self.assertEqual(events[1], battle_rules.BattleEvent(battle_rules.EventType.SWITCH, 0, 2, "Geodude", 90))
+        self.assertEqual(state.sides[0].pokemon.name, "Geodude")
+        with self.assertRaises(ValueError):
+            team_battle.step_team(state, (team_battle.Switch(2), None))
+        with self.assertRaises(ValueError):
+            team_battle.TeamSide([Pokemon(*rows[0])] * 7)
+        
+        teams = ([Pokemon(*row) for row in rows], [Pokemon(*row) for row in reversed(rows)])
+        state = team_battle.run_team_battle(*teams, BattleRNG(2, 0), team_battle.matchup_policy,
+                                            team_battle.best_matchup)
+        winner, loser = state.sides[state.winner], state.sides[1 - state.winner]
+        self.assertTrue(all(pokemon.current_hp == 0 for pokemon in loser.members))
+        self.assertEqual(winner.remaining, sum(pokemon.current_hp > 0 for pokemon in winner.members))
+        self.assertGreater(winner.remaining, 0)
+        
+        # Speed ties are broken by the stream, so a mirror match doesn't favour side 0.
+        mirror = team_battle.team_win_rate(rows, rows, 400, seed=5)
+        self.assertAlmostEqual(mirror, 0.5, delta=0.1)
+        state = team_battle.TeamBattleState([Pokemon(*rows[0])], [Pokemon(*rows[1])])
+        for pokemon in state.active:
+            pokemon.current_hp = 0
+        self.assertFalse(team_battle.settle_faints(state))
+        self.assertEqual(state.winner, team_battle.DRAW)
+        
+        output = io.StringIO()
+        battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=4)
+        teams = ([Pokemon(*row) for row in rows], [Pokemon(*row) for row in rows[:2]])
+        with contextlib.redirect_stdout(output):
+            winner = asyncio.run(battle_system.trainer_battle(*teams))
+        self.assertTrue(all(pokemon.current_hp == 0 for pokemon in teams[1 - winner]))
+        self.assertIn(f"Trainer {winner + 1} wins the battle!", output.getvalue())
+        self.assertIn("sends out", output.getvalue())
+        
+        stream = io.StringIO()
+        game = CompletePokemonGame(clock=VirtualClock(), seed=3, output=stream)
+        game.player_team = [Pokemon(*rows[0]), Pokemon(*rows[2])]
+        
+        async def scenario():
+            game.ui.attach_input(game_input.ScriptInput(["3", "1"] + ["1", "1"] * 200))
+            await game.multi_pokemon_battle(game.player_team, [Pokemon(*rows[1]), Pokemon(*rows[0])])
+        
+        with contextlib.redirect_stdout(stream):
+            asyncio.run(scenario())
+        self.assertIn("Come back, Pikachu! Go, Geodude!", stream.getvalue())
+        self.assertIsNone(game.team_state)
+        finished = [pokemon.current_hp == 0 for pokemon in game.player_team]
+        self.assertTrue(all(finished) or "You defeated the trainer!" in stream.getvalue())
+
+    def test_benchmark_suite_measures_and_flags_regressions(self):
+        results = benchmarks.run_suite(["calculate_damage", "single_pokemon_battle"], iterations=5)
+        self.assertEqual(list(results), ["calculate_damage", "single_pokemon_battle"])
+        for result in results.values():
+            self.assertGreater(result["ops_per_second"], 0)
+            self.assertLessEqual(result["p50_us"], result["p99_us"])
+            self.assertGreaterEqual(result["peak_kib"], 0)
+        with self.assertRaises(KeyError):
+            benchmarks.run_suite(["no_such_benchmark"])
+
+        baseline = {"calculate_damage": {"ops_per_second": 1000.0, "p50_us": 1.0, "p99_us": 2.0, "peak_kib": 1.0}}
+        current = {"calculate_damage": {"ops_per_second": 850.0, "p50_us": 0.5, "p99_us": 2.1, "peak_kib": 2.0},
+                   "trainer_battle": {"ops_per_second": 1.0}}
+        regressions = benchmarks.compare(current, baseline, threshold=0.10)
+        self.assertEqual([(regression.metric, round(regression.change, 2)) for regression in regressions],
+                         [("ops_per_second", -0.15), ("peak_kib", 1.0)])
+
+    def test_metrics_count_battles_and_export(self):
+        from battle_rules import BattleEvent, EventType
+        
+        recorded = metrics.Metrics()
+        battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=4, metrics=recorded)
+        asyncio.run(battle_system.single_pokemon_battle(Pokemon("Pikachu", "Electric", 100, 55, 40, 90),
+                                                        Pokemon("Charmander", "Fire", 95, 52, 43, 65)))
+        snapshot = recorded.snapshot()
+        self.assertEqual(snapshot["counters"]["battles_total"], {"": 1})
+        self.assertEqual(snapshot["counters"]["turns_total"][""], battle_system.last_battle_turns)
+        self.assertEqual(snapshot["histograms"]["turn_seconds"][""]["count"], battle_system.last_battle_turns)
+        self.assertEqual(set(snapshot["histograms"]["phase_seconds"]), {"rules", "render"})
+        
+        recorded.reset()
+        recorded.count_events([BattleEvent(EventType.MOVE, 0, detail="Tackle"),
+                               BattleEvent(EventType.CRITICAL, 0),
+                               BattleEvent(EventType.STATUS_ACTIVE, 1, detail="confusion"),
+                               BattleEvent(EventType.SELF_HIT, 1, 5),
+                               BattleEvent(EventType.STATUS_DAMAGE, 1, 5, "confusion"),
+                               BattleEvent(EventType.STATUS_DAMAGE, 0, 6, "poison")])
+        recorded.observe("phase_seconds", 0.003, "status")
+        text = recorded.to_prometheus()
+        self.assertIn('pokemon_moves_total{move="Tackle"} 1\n', text)
+        self.assertIn("pokemon_critical_hits_total 1\n", text)
+        self.assertIn('pokemon_status_ticks_total{status="confusion"} 1\n', text)
+        self.assertIn('pokemon_phase_seconds_bucket{phase="status",le="0.0025"} 0\n', text)
+        self.assertIn('pokemon_phase_seconds_bucket{phase="status",le="+Inf"} 1\n', text)
+        self.assertIn('pokemon_phase_seconds_count{phase="status"} 1\n', text)
+        
+        lock = asyncio.Lock()
+        self.assertIs(metrics.NULL_METRICS.display(lock), lock)
+        self.assertIs(EnhancedBattleSystem().metrics, metrics.NULL_METRICS)
+
+    def test_tracer_spans_nest_and_restore_methods(self):
+        from async_ui import AsyncUI
+        from final_pokemon_game import CompletePokemonGame
+        
+        original = CompletePokemonGame.execute_regular_move
+        tracer = tracing.Tracer()
+        result = asyncio.run(tracing.trace_game(tracer, battles=3, seed=0))
+        self.assertIs(CompletePokemonGame.execute_regular_move, original)
+        self.assertEqual(AsyncUI.display.__qualname__, "AsyncUI.display")
+        
+        spans = tracer.spans()
+        self.assertEqual(len(spans), result["spans"])
+        moves = [span for span in spans if span["name"] == "CompletePokemonGame.execute_regular_move"]
+        self.assertTrue(moves)
+        self.assertTrue(all(span["args"]["battle_id"] is not None and span["args"]["turn"] >= 1
+                            for span in moves))
+        self.assertTrue(any(span["name"] == "display_lock" for span in spans))
+        breakdown = tracer.breakdown("CompletePokemonGame.execute_regular_move")
+        self.assertGreater(breakdown["AsyncUI.type_message"], 0)
+        self.assertAlmostEqual(sum(breakdown.values()), sum(span["dur"] for span in moves), places=3)
+        
+        async def failing():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+        
+        async def traced_failure():
+            await tracing.Span(tracer, "failing", "test", failing())
+        
+        with self.assertRaises(ValueError):
+            asyncio.run(traced_failure())
+        self.assertEqual(tracer.spans()[-1]["name"], "failing")
+        self.assertEqual(tracer.trace_events()["displayTimeUnit"], "ms")
+
+    def test_status_store_merges_and_expires_on_schedule(self):
+        from status_effects import StatusStore
+        
+        store = StatusStore([StatusEffect(StatusType.POISON, 3)])
+        self.assertTrue(store.add(StatusType.SLEEP, 1))
+        self.assertFalse(store.add(StatusType.POISON, 2, severity=2))
+        self.assertTrue(store.has(StatusType.POISON))
+        self.assertFalse(store.has(StatusType.BURN))
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store, [StatusEffect(StatusType.POISON, 3, 2), StatusEffect(StatusType.SLEEP, 1)])
+        
+        self.assertEqual(store.tick(), (StatusType.SLEEP,))
+        self.assertEqual(store.next_expiry, 3)
+        self.assertEqual(store.tick(), ())
+        self.assertEqual(store.turns_remaining(StatusType.POISON), 1)
+        self.assertEqual(store.tick(), (StatusType.POISON,))
+        self.assertFalse(store)
+        
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+        pikachu.status_effects = [StatusEffect(StatusType.BURN, 2)]
+        self.assertIsInstance(pikachu.status_effects, StatusStore)
+        events = []
+        battle_rules.tick_status_effects(pikachu, 0, events)
+        battle_rules.tick_status_effects(pikachu, 0, events)
+        self.assertEqual([event.kind for event in events],
+                         [battle_rules.EventType.STATUS_DAMAGE, battle_rules.EventType.STATUS_DAMAGE,
+                          battle_rules.EventType.STATUS_EXPIRED])
+        self.assertEqual(pikachu.current_hp, 100 - 2 * (100 // 16))
+
+    def test_compiled_effect_rules_match_legacy_chain(self):
+        import copy
+        import json
+        import random
+
+        for seed in range(20):
+            results = []
+            for resolve in (benchmarks.legacy_resolve_status_effects, battle_rules.resolve_status_effects):
+                snorlax = Pokemon("Snorlax", "Normal", 500, 110, 65, 30)
+                for status in StatusType:
+                    snorlax.status_effects.add(status, 4, severity=2)
+                rng = random.Random(seed)
+                events = []
+                outcomes = [resolve(snorlax, 1, events, rng) for _ in range(5)]
+                results.append((outcomes, events, snorlax.current_hp))
+            self.assertEqual(results[0], results[1])
+
+        rules = effect_rules.RULES
+        self.assertEqual(rules.by_value["sleep"].announce.format(name="Snorlax"), "🌟 Snorlax was put to sleep!")
+        self.assertEqual(rules.by_value["poison"].hurt.format(name="Snorlax", damage=6),
+                         "💜 Snorlax is hurt by poison! (-6 HP)")
+
+        with open(effect_rules.RULES_PATH, encoding="utf-8") as handle:
+            data = json.load(handle)
+        broken = copy.deepcopy(data)
+        broken["statuses"]["sleep"]["turn"]["action"] = "nap"
+        with self.assertRaises(ValueError):
+            effect_rules.compile_rules(broken)
+        broken = copy.deepcopy(data)
+        broken["move_effects"]["arena"]["moves"]["Splash"] = {"status": "burn", "chance": 1.0}
+        with self.assertRaises(KeyError):
+            effect_rules.compile_rules(broken)
+
+    def test_exact_win_probability_matches_sampled_battles(self):
+        charmander = ("Charmander", "Fire", 95, 52, 43, 65)
+        squirtle = ("Squirtle", "Water", 98, 48, 55, 43)
+        
+        exact = win_probability.win_probability(Pokemon(*charmander), Pokemon(*squirtle))
+        sampled = win_probability.monte_carlo(charmander, squirtle, 4000, seed=9)
+        stderr = (exact.win_probability * exact.loss_probability / 4000) ** 0.5
+        
+        self.assertAlmostEqual(exact.win_probability + exact.loss_probability, 1.0)
+        self.assertLess(abs(exact.win_probability - sampled.win_probability), 4 * stderr)
+        self.assertAlmostEqual(exact.expected_turns, sampled.expected_turns, delta=0.05)
+        
+        magikarp = Pokemon("Magikarp", "Water", 60, 10, 55, 80)
+        gyarados = Pokemon("Gyarados", "Water", 150, 90, 79, 81)
+        odds = win_probability.win_probability(magikarp, gyarados)
+        self.assertEqual(odds.win_probability, 0.0)
+        # Water resists Water, so a low roll sometimes leaves Magikarp standing for a second turn.
+        self.assertGreater(odds.expected_turns, 1.0)
+        self.assertLess(odds.expected_turns, 2.0)
+        
+        # Too weak to roll any damage, but every landed hit still deals 1.
+        weakling = win_probability.win_probability(Pokemon("Weakling", "Normal", 50, 1, 10, 10), gyarados)
+        self.assertEqual(weakling.win_probability, 0.0)
+    
+    def test_battle_ai_finds_knockout_within_budget(self):
+        charmander = Pokemon("Charmander", "Fire", 95, 52, 48, 65)
+        pikachu = Pokemon("Pikachu", "Electric", 100, 55, 50, 90)
+        pikachu.current_hp = 70
+        
+        ai = battle_ai.BattleAI("hard")
+        result = asyncio.run(ai.choose_move_async(charmander, pikachu))
+        self.assertEqual(result.move, "Fire Blast")
+        self.assertGreaterEqual(result.value, battle_ai.WIN)
+        
+        pikachu.current_hp = 100
+        budget = battle_ai.SearchBudget(max_depth=40, max_nodes=2000, time_limit=10.0)
+        result = battle_ai.BattleAI(budget).choose_move(charmander, pikachu)
+        self.assertLess(result.depth, 40)
+        self.assertLess(result.nodes, 2 * 2000 + 256)
+        self.assertGreater(result.nodes_per_second, 0)
+        self.assertGreater(result.hit_rate, 0)
+        self.assertIn(result.move, charmander.moves)
+    
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_batch_simulator_matches_scalar_engine(self):
+        geodude = ("Geodude", "Rock", 90, 60, 70, 20)
+        charmander = ("Charmander", "Fire", 95, 52, 43, 65)
+        
+        result = batch_sim.BatchBattleSimulator(seed=5).simulate(geodude, charmander, 100_000)
+        wins, mean_turns = batch_sim.scalar_win_rate(geodude, charmander, 4000, seed=5)
+        
+        batch_rate = result.win_rate(0)
+        scalar_rate = wins[0] / wins.sum()
+        pooled = (batch_rate + scalar_rate) / 2
+        stderr = (pooled * (1 - pooled) * (1 / 100_000 + 1 / 4000)) ** 0.5
+        
+        self.assertEqual(result.unfinished, 0)
+        self.assertLess(abs(batch_rate - scalar_rate), 4 * stderr)
+        self.assertAlmostEqual(result.mean_turns(), mean_turns, delta=0.05)
 
 async def run_async_integration_tests():
     print("🧪 Running Async Integration Tests...")
@@ -75,25 +931,12 @@ async def run_async_integration_tests():
     
     print("\n✅ All async integration tests passed!")
 
-def run_performance_test():
+async def run_performance_test():
     print("\n⚡ Running Performance Tests...")
     
-    import time
-    
-    start_time = time.time()
-    
-    for i in range(1000):
-        import random
-        base_damage = 50
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-        
-        status_active = random.choice([True, False])
-        
-        turn_result = "completed"
-    
-    end_time = time.time()
-    print(f"✅ 1000 battle calculations completed in {end_time - start_time:.4f} seconds")
-    print("✅ Performance test passed!")
+    results = await benchmarks.run_suite_async(iterations=50)
+    benchmarks.print_results(results)
+    print("✅ Performance benchmarks completed (python benchmarks.py --compare <baseline.json> to check for regressions)")
 
 async def main_test_suite():
     print("🎮 POKEMON GAME COMPREHENSIVE TEST SUITE")
@@ -105,7 +948,7 @@ async def main_test_suite():
     print("\n⚡ Running Async Tests...")
     await run_async_integration_tests()
     
-    run_performance_test()
+    await run_performance_test()
     
     print("\n🎉 ALL TESTS COMPLETED SUCCESSFULLY! 🎉")
     print("=" * 60)
@@ -0,0 +1,270 @@
+import bisect
+import hashlib
+import json
+import os
+import random
+import struct
+import tempfile
+import time
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from battle_rules import (CRITICAL_CHANCE, CRITICAL_MULTIPLIER, DAMAGE_ROLL_HIGH, DAMAGE_ROLL_LOW,
+                          DEFAULT_MOVES, roll_critical, roll_damage)
+from moves import MOVES
+from pokemon import Pokemon
+from species_catalog import column_bytes, read_column
+from type_chart import TYPE_CHART, scale_damage
+
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+MAGIC = b"PKDT"
+VERSION = 1
+# magic, version, flags, roster and ruleset digest, roster size, triple count, outcome count
+CACHE_HEADER = struct.Struct("<4sHH32sIII")
+MAX_MOVES = 4
+
+def ruleset_data() -> dict:
+    """Everything ``resolve_attack`` reads to turn a move into damage."""
+    return {
+        "version": VERSION,
+        "roll": [DAMAGE_ROLL_LOW, DAMAGE_ROLL_HIGH],
+        "critical": [CRITICAL_CHANCE, CRITICAL_MULTIPLIER],
+        "default_moves": list(DEFAULT_MOVES),
+        "move_types": list(TYPE_CHART.move_types),
+        "type_chart": TYPE_CHART.digest,
+    }
+
+def roster_digest(roster: Sequence[tuple]) -> bytes:
+    """A SHA-256 of the roster's species rows, their moves and the damage ruleset."""
+    rows = [list(row) + [list(Pokemon(*row).moves)] for row in roster]
+    text = json.dumps({"roster": rows, "ruleset": ruleset_data()}, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+def hit_outcomes(attacker, defender, move: str) -> List[Tuple[int, bool, float]]:
+    """Every ``(damage, critical, probability)`` ``resolve_attack`` can deal with ``move``, by damage."""
+    low = int(attacker.attack * DAMAGE_ROLL_LOW)
+    high = int(attacker.attack * DAMAGE_ROLL_HIGH)
+    chance = 1.0 / (high - low + 1)
+    multiplier = TYPE_CHART.move_multiplier(attacker, defender, MOVES.ids.get(move))
+
+    outcomes = {}
+    for roll in range(low, high + 1):
+        damage = scale_damage(roll, multiplier)
+        for critical, weight in ((False, 1.0 - CRITICAL_CHANCE), (True, CRITICAL_CHANCE)):
+            hit = (int(damage * CRITICAL_MULTIPLIER) if critical else damage, critical)
+            outcomes[hit] = outcomes.get(hit, 0.0) + chance * weight
+    return [(damage, critical, probability) for (damage, critical), probability in sorted(outcomes.items())]
+
+class DamageTables:
+    """The exact damage distribution of every (attacker, defender, move) in a roster.
+
+    Triple ``(attacker * size + defender) * MAX_MOVES + slot`` owns outcomes
+    ``offsets[triple]`` to ``offsets[triple + 1]`` of the parallel ``damage``,
+    ``critical`` and ``cumulative`` arrays, sorted by damage; each triple's
+    cumulative probabilities run up to exactly 1.0. Sampling a hit
+    is one uniform draw and a bisect of that slice of ``cumulative``; the
+    mean of each triple is kept in ``expected``.
+    """
+
+    __slots__ = ("roster", "moves", "move_slots", "size", "digest", "offsets", "damage", "critical",
+                 "cumulative", "expected")
+
+    def __init__(self, roster: Sequence[tuple], digest: bytes, offsets: array, damage: array,
+                 critical: array, cumulative: array, expected: array):
+        self.roster = tuple(roster)
+        self.moves = tuple(Pokemon(*row).moves[:MAX_MOVES] for row in self.roster)
+        self.move_slots = tuple({move: slot for slot, move in enumerate(moves)} for moves in self.moves)
+        self.size = len(self.roster)
+        self.digest = digest
+        self.offsets = offsets
+        self.damage = damage
+        self.critical = critical
+        self.cumulative = cumulative
+        self.expected = expected
+
+    def triple(self, attacker: int, defender: int, move: str) -> int:
+        return (attacker * self.size + defender) * MAX_MOVES + self.move_slots[attacker][move]
+
+    def distribution(self, attacker: int, defender: int, move: str) -> List[Tuple[int, bool, float]]:
+        """``(damage, critical, probability)`` for each outcome of the hit."""
+        triple = self.triple(attacker, defender, move)
+        start, stop = self.offsets[triple], self.offsets[triple + 1]
+        previous = 0.0
+        result = []
+        for index in range(start, stop):
+            result.append((self.damage[index], bool(self.critical[index]), self.cumulative[index] - previous))
+            previous = self.cumulative[index]
+        return result
+
+    def expected_damage(self, attacker: int, defender: int, move: str) -> float:
+        return self.expected[self.triple(attacker, defender, move)]
+
+    def sample(self, attacker: int, defender: int, move: str, rng=random) -> Tuple[int, bool]:
+        """One ``(damage, critical)`` hit from a single uniform draw."""
+        triple = (attacker * self.size + defender) * MAX_MOVES + self.move_slots[attacker][move]
+        offsets = self.offsets
+        stop = offsets[triple + 1]
+        index = bisect.bisect_right(self.cumulative, rng.random(), offsets[triple], stop)
+        if index == stop:
+            index -= 1
+        return self.damage[index], bool(self.critical[index])
+
+    def roller(self, pokemon1: int, pokemon2: int) -> "TableRoller":
+        return TableRoller(self, pokemon1, pokemon2)
+
+class TableRoller:
+    """Rolls hits for one pairing; pass it to ``run_battle(..., roller=...)``."""
+
+    __slots__ = ("tables", "sides")
+
+    def __init__(self, tables: DamageTables, pokemon1: int, pokemon2: int):
+        self.tables = tables
+        self.sides = (pokemon1, pokemon2)
+
+    def __call__(self, attacker_side: int, move: str, rng=random) -> Tuple[int, bool]:
+        return self.tables.sample(self.sides[attacker_side], self.sides[1 - attacker_side], move, rng)
+
+def build_tables(roster: Sequence[tuple], digest: Optional[bytes] = None) -> DamageTables:
+    pokemon = [Pokemon(*row) for row in roster]
+    size = len(pokemon)
+    offsets = array("I", [0])
+    damage, critical, cumulative = array("I"), array("B"), array("d")
+    expected = array("d", bytes(8 * size * size * MAX_MOVES))
+
+    for attacker_id, attacker in enumerate(pokemon):
+        moves = attacker.moves[:MAX_MOVES]
+        for defender_id, defender in enumerate(pokemon):
+            for slot in range(MAX_MOVES):
+                if slot < len(moves):
+                    total = mean = 0.0
+                    outcomes = hit_outcomes(attacker, defender, moves[slot])
+                    for hit, is_critical, probability in outcomes:
+                        total += probability
+                        mean += hit * probability
+                        damage.append(hit)
+                        critical.append(is_critical)
+                        cumulative.append(total)
+                    # Float sums can land a hair under 1; a draw must never fall past the end.
+                    cumulative[-1] = 1.0
+                    expected[(attacker_id * size + defender_id) * MAX_MOVES + slot] = mean
+                offsets.append(len(damage))
+
+    return DamageTables(roster, digest or roster_digest(roster), offsets, damage, critical, cumulative, expected)
+
+def encode_tables(tables: DamageTables) -> bytes:
+    header = CACHE_HEADER.pack(MAGIC, VERSION, 0, tables.digest, tables.size, len(tables.offsets) - 1,
+                               len(tables.damage))
+    return b"".join([header] + [column_bytes(column) for column in
+                                (tables.offsets, tables.damage, tables.critical, tables.cumulative,
+                                 tables.expected)])
+
+def decode_tables(buffer, roster: Sequence[tuple], digest: bytes) -> Optional[DamageTables]:
+    """Rebuild tables from cache bytes, or None if they belong to another roster, ruleset or version."""
+    if len(buffer) < CACHE_HEADER.size:
+        return None
+    magic, version, _, cached_digest, size, triples, outcomes = CACHE_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION or cached_digest != digest or size != len(roster):
+        return None
+
+    offset = CACHE_HEADER.size
+    offsets, offset = read_column("I", buffer, offset, triples + 1)
+    damage, offset = read_column("I", buffer, offset, outcomes)
+    critical, offset = read_column("B", buffer, offset, outcomes)
+    cumulative, offset = read_column("d", buffer, offset, outcomes)
+    expected, offset = read_column("d", buffer, offset, triples)
+    if offset != len(buffer):
+        return None
+    return DamageTables(roster, digest, offsets, damage, critical, cumulative, expected)
+
+def cache_path_for(digest: bytes, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or CACHE_DIRECTORY, f"damage_tables.{digest.hex()[:16]}.v{VERSION}.bin")
+
+def load_tables(roster: Optional[Sequence[tuple]] = None, cache_directory: Optional[str] = None) -> DamageTables:
+    """The tables for ``roster`` (default: the species catalog), from the disk cache when possible.
+
+    The cache file is named after a hash of the roster and the damage
+    ruleset, so changing a species, a move list, the type chart or the roll
+    constants builds a new file instead of reusing a stale one. A cache that
+    can't be written (read-only checkout) is skipped.
+    """
+    if roster is None:
+        from species_catalog import CATALOG
+        roster = list(CATALOG)
+    roster = [tuple(row) for row in roster]
+    digest = roster_digest(roster)
+    cache_path = cache_path_for(digest, cache_directory)
+    try:
+        with open(cache_path, "rb") as handle:
+            tables = decode_tables(handle.read(), roster, digest)
+        if tables is not None:
+            return tables
+    except (OSError, ValueError, struct.error):
+        pass
+
+    tables = build_tables(roster, digest)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(encode_tables(tables))
+        os.replace(temporary, cache_path)
+    except OSError:
+        pass
+    return tables
+
+def benchmark_tables(hits: int = 200_000, seed: int = 5) -> dict:
+    from species_catalog import CATALOG
+
+    roster = list(CATALOG)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        load_tables(roster, directory)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        tables = load_tables(roster, directory)
+        cached = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    pokemon = [Pokemon(*row) for row in roster]
+    samples = []
+    for _ in range(1_000):
+        attacker, defender = rng.randrange(len(roster)), rng.randrange(len(roster))
+        samples.append((attacker, defender, rng.choice(tables.moves[attacker])))
+
+    start = time.perf_counter()
+    for index in range(hits):
+        attacker, defender, move = samples[index % 1_000]
+        attacking = pokemon[attacker]
+        damage = scale_damage(roll_damage(attacking.attack, rng),
+                              TYPE_CHART.move_multiplier(attacking, pokemon[defender], MOVES.ids.get(move)))
+        roll_critical(damage, rng)
+    rolled = (time.perf_counter() - start) / hits
+
+    sample = tables.sample
+    start = time.perf_counter()
+    for index in range(hits):
+        attacker, defender, move = samples[index % 1_000]
+        sample(attacker, defender, move, rng)
+    sampled = (time.perf_counter() - start) / hits
+
+    return {"species": len(roster), "outcomes": len(tables.damage), "cold_load_ms": cold * 1e3,
+            "cached_load_ms": cached * 1e3, "rolled_ns": rolled * 1e9, "sampled_ns": sampled * 1e9}
+
+def test_damage_tables():
+    tables = load_tables()
+    pairs = [(tables.expected_damage(attacker, defender, move), attacker, defender, move)
+             for attacker in range(tables.size) for defender in range(tables.size) if attacker != defender
+             for move in tables.moves[attacker]]
+    for expected, attacker, defender, move in sorted(pairs, reverse=True)[:3]:
+        print(f"💥 {tables.roster[attacker][0]:>10} {move:<13} → {tables.roster[defender][0]:<10} "
+              f"{expected:6.1f} expected damage")
+
+    results = benchmark_tables()
+    print(f"📦 {results['species']} species, {results['outcomes']:,} outcomes: "
+          f"build {results['cold_load_ms']:.1f} ms, cached load {results['cached_load_ms']:.2f} ms")
+    print(f"🎲 randint + crit roll: {results['rolled_ns']:6.0f} ns/hit")
+    print(f"🔎 table sample:        {results['sampled_ns']:6.0f} ns/hit")
+
+if __name__ == "__main__":
+    print("🧪 Testing Damage Tables")
+    test_damage_tables()
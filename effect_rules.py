@@ -0,0 +1,165 @@
+import json
+import os
+from enum import IntEnum
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from moves import MOVES, MoveEffect
+from status_effects import STATUS_ORDER, StatusType
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "effect_rules.json")
+DEFAULT_SYMBOL = "💥"
+
+class TurnAction(IntEnum):
+    """What a status condition does when its holder tries to act."""
+    DAMAGE = 0
+    SKIP_CHANCE = 1
+    SKIP = 2
+    THAW = 3
+    SELF_HIT = 4
+
+class StatusRule(NamedTuple):
+    """One status condition compiled from the rules file.
+
+    Message fields are templates with everything but the Pokemon's name (and
+    the damage dealt) already filled in, so rendering is one ``format`` call.
+    """
+    status: StatusType
+    name: str
+    action: TurnAction
+    chance: float
+    divisor: int
+    tick_divisor: int
+    applied: str
+    announce: str
+    active: str
+    active_pause: float
+    cured: str
+    damage: str
+    hurt: str
+    recovers: str
+    recovered: str
+
+class EffectRules(NamedTuple):
+    statuses: Tuple[StatusRule, ...]
+    by_value: Dict[str, StatusRule]
+    mask_indices: Tuple[Tuple[int, ...], ...]
+    tick_indices: Tuple[int, ...]
+    blocked: str
+    self_hit: str
+    hp: str
+    move_status_chance: float
+    move_status_turns: int
+    move_status_effects: tuple
+    arena_status_turns: int
+    arena_side_effects: tuple
+    special_side_effects: tuple
+    cinematics: tuple
+    side_effect_lines: tuple
+
+# A chance of None always fires; special moves missing here still roll for nothing.
+NO_SPECIAL_EFFECT = MoveEffect(None, 0, 0.0)
+
+class KeepMissing(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+def prefill(template: str, **values) -> str:
+    """Fill the placeholders known at load time and leave the rest for ``format``."""
+    return template.format_map(KeepMissing(values))
+
+def status_type(name: Optional[str]) -> Optional[StatusType]:
+    if name is None:
+        return None
+    try:
+        return StatusType(name)
+    except ValueError:
+        raise ValueError(f"unknown status {name!r} in effect rules") from None
+
+def compile_status(status: StatusType, spec: dict, messages: dict) -> StatusRule:
+    turn = spec["turn"]
+    try:
+        action = TurnAction[turn["action"].upper()]
+    except KeyError:
+        raise ValueError(f"unknown turn action {turn['action']!r} for {status.value}") from None
+
+    name = status.value
+    symbol = spec.get("symbol", DEFAULT_SYMBOL)
+    applied = spec["applied"]
+    return StatusRule(
+        status=status,
+        name=name,
+        action=action,
+        chance=turn.get("chance", 0.0),
+        divisor=turn.get("divisor", turn.get("attack_divisor", 1)),
+        tick_divisor=spec.get("tick_divisor", 0),
+        applied=applied,
+        announce=prefill(messages["announce"], applied=applied),
+        active=spec.get("active", ""),
+        active_pause=spec.get("active_pause", 0.0),
+        cured=spec.get("cured", ""),
+        damage=prefill(messages["damage"], symbol=symbol, status=name),
+        hurt=prefill(messages["hurt"], symbol=symbol, status=name),
+        recovers=prefill(messages["recovers"], status=name),
+        recovered=spec.get("recovered", prefill(messages["recovers"], status=name)),
+    )
+
+def compile_rules(data: dict) -> EffectRules:
+    messages = data["messages"]
+    specs = data["statuses"]
+    unknown = set(specs) - {status.value for status in STATUS_ORDER}
+    if unknown:
+        raise ValueError(f"unknown status {sorted(unknown)[0]!r} in effect rules")
+    missing = [status.value for status in STATUS_ORDER if status.value not in specs]
+    if missing:
+        raise ValueError(f"effect rules have no entry for {missing[0]!r}")
+
+    statuses = tuple(compile_status(status, specs[status.value], messages) for status in STATUS_ORDER)
+    mask_indices = tuple(tuple(index for index in range(len(STATUS_ORDER)) if mask >> index & 1)
+                         for mask in range(1 << len(STATUS_ORDER)))
+
+    step = data["move_effects"]["step"]
+    arena = data["move_effects"]["arena"]
+    special = data["move_effects"]["special"]
+    arena_turns = arena["turns"]
+
+    return EffectRules(
+        statuses=statuses,
+        by_value={rule.name: rule for rule in statuses},
+        mask_indices=mask_indices,
+        tick_indices=tuple(index for index, rule in enumerate(statuses) if rule.tick_divisor),
+        blocked=messages["blocked"],
+        self_hit=messages["self_hit"],
+        hp=messages["hp"],
+        move_status_chance=step["chance"],
+        move_status_turns=step["turns"],
+        move_status_effects=MOVES.table({move: status_type(name) for move, name in step["moves"].items()}),
+        arena_status_turns=arena_turns,
+        arena_side_effects=MOVES.table({
+            move: MoveEffect(status_type(effect["status"]), effect.get("turns", arena_turns), effect["chance"])
+            for move, effect in arena["moves"].items()}),
+        special_side_effects=MOVES.table({
+            move: MoveEffect(status_type(effect["status"]), effect["turns"], effect["chance"],
+                             effect.get("hits_attacker", False))
+            for move, effect in special.items()}, NO_SPECIAL_EFFECT),
+        cinematics=MOVES.table({move: tuple(effect["cinematic"])
+                                for move, effect in special.items() if "cinematic" in effect}),
+        side_effect_lines=MOVES.table({move: (tuple(effect["lines"]), effect["pause"])
+                                       for move, effect in special.items() if "lines" in effect}),
+    )
+
+def load_rules(path: str = RULES_PATH) -> EffectRules:
+    with open(path, encoding="utf-8") as handle:
+        return compile_rules(json.load(handle))
+
+RULES = load_rules()
+
+def test_effect_rules():
+    from benchmarks import benchmark_effects
+
+    for label, result in benchmark_effects().items():
+        print(f"🧪 {label:>16}: {result['before_ns']:6.0f} ns -> {result['after_ns']:6.0f} ns "
+              f"({result['before_ns'] / result['after_ns']:.1f}x)")
+
+if __name__ == "__main__":
+    print("🧪 Testing Compiled Effect Rules")
+    test_effect_rules()
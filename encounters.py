@@ -0,0 +1,247 @@
+import json
+import os
+import random
+import time
+from array import array
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from pokemon import Pokemon
+from species_catalog import CATALOG, SpeciesCatalog
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ENCOUNTERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "encounters.json")
+TIMES_OF_DAY = ("day", "night")
+
+class AliasTable:
+    """Walker's alias method over a fixed set of weighted outcomes.
+
+    Built with Vose's O(n) construction. A sample is one uniform draw:
+    ``u * n`` picks a column, its fractional part is compared against that
+    column's ``probability`` and either the column's own outcome or its
+    ``alias`` is returned. A spare column duplicating the last one catches
+    ``u * n`` rounding up to ``n`` without a bounds check.
+    """
+
+    __slots__ = ("size", "probability", "outcome", "alias", "_arrays")
+
+    def __init__(self, outcomes: Iterable[int], weights: Iterable[float]):
+        outcomes = list(outcomes)
+        weights = [float(weight) for weight in weights]
+        size = len(outcomes)
+        if size != len(weights):
+            raise ValueError("outcomes and weights differ in length")
+        total = sum(weights)
+        if size == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("alias table needs non-negative weights with a positive total")
+
+        scaled = [weight * size / total for weight in weights]
+        probability = array("d", bytes(8 * (size + 1)))
+        alias = list(range(size))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] += scaled[low] - 1.0
+            (small if scaled[high] < 1.0 else large).append(high)
+        for index in large + small:
+            probability[index] = 1.0
+        probability[size] = 1.0
+
+        self.size = size
+        self.probability = probability
+        self.outcome = array("I", outcomes + outcomes[-1:])
+        self.alias = array("I", [outcomes[index] for index in alias] + outcomes[-1:])
+        self._arrays = None
+
+    def sample(self, rng=random) -> int:
+        point = rng.random() * self.size
+        column = int(point)
+        if point - column < self.probability[column]:
+            return self.outcome[column]
+        return self.alias[column]
+
+    def sample_many(self, count: int, rng=random) -> array:
+        """``count`` samples into an ``array('I')``, drawing from ``rng`` like ``sample``."""
+        size, probability, outcome, alias = self.size, self.probability, self.outcome, self.alias
+        draw = rng.random
+        samples = array("I", bytes(4 * count))
+        for index in range(count):
+            point = draw() * size
+            column = int(point)
+            samples[index] = outcome[column] if point - column < probability[column] else alias[column]
+        return samples
+
+    def sample_array(self, count: int, generator) -> "np.ndarray":
+        """``count`` samples as a NumPy array, drawn from a ``numpy.random.Generator``."""
+        if np is None:
+            raise RuntimeError("sample_array needs numpy installed")
+        if self._arrays is None:
+            self._arrays = (np.frombuffer(self.probability, dtype=np.float64),
+                            np.frombuffer(self.outcome, dtype=np.uint32),
+                            np.frombuffer(self.alias, dtype=np.uint32))
+        probability, outcome, alias = self._arrays
+        points = generator.random(count) * self.size
+        columns = points.astype(np.intp)
+        return np.where(points - columns < probability[columns], outcome[columns], alias[columns])
+
+class EncounterTable:
+    """The species that can appear in one zone at one time of day, with weights.
+
+    Weights can be changed at any time; the alias table is rebuilt once, on
+    the next sample after a change, so a burst of updates costs one O(n)
+    build and other zones' tables are untouched.
+    """
+
+    __slots__ = ("species", "weights", "slots", "_alias")
+
+    def __init__(self, species: Iterable[int], weights: Iterable[float]):
+        self.species = array("I", species)
+        self.weights = array("d", weights)
+        self.slots = {species_id: slot for slot, species_id in enumerate(self.species)}
+        self._alias = None
+
+    @property
+    def alias(self) -> AliasTable:
+        if self._alias is None:
+            self._alias = AliasTable(self.species, self.weights)
+        return self._alias
+
+    def set_weight(self, species_id: int, weight: float):
+        if weight < 0:
+            raise ValueError("encounter weights can't be negative")
+        slot = self.slots.get(species_id)
+        if slot is None:
+            self.slots[species_id] = len(self.species)
+            self.species.append(species_id)
+            self.weights.append(weight)
+        else:
+            self.weights[slot] = weight
+        self._alias = None
+
+    def probability(self, species_id: int) -> float:
+        slot = self.slots.get(species_id)
+        return 0.0 if slot is None else self.weights[slot] / sum(self.weights)
+
+    def sample(self, rng=random) -> int:
+        return self.alias.sample(rng)
+
+    def sample_many(self, count: int, rng=random) -> array:
+        return self.alias.sample_many(count, rng)
+
+    def sample_array(self, count: int, generator) -> "np.ndarray":
+        return self.alias.sample_array(count, generator)
+
+class EncounterSystem:
+    """Wild encounter tables by zone and time of day, sampled in O(1)."""
+
+    def __init__(self, tables: Dict[Tuple[str, str], EncounterTable], catalog: SpeciesCatalog = CATALOG):
+        self.tables = tables
+        self.catalog = catalog
+
+    @property
+    def zones(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(zone for zone, _ in self.tables))
+
+    def table(self, zone: str, time_of_day: str) -> EncounterTable:
+        try:
+            return self.tables[zone, time_of_day]
+        except KeyError:
+            raise KeyError(f"no encounter table for {zone!r} at {time_of_day!r}") from None
+
+    def sample(self, zone: str, time_of_day: str, rng=random) -> int:
+        return self.table(zone, time_of_day).sample(rng)
+
+    def sample_many(self, zone: str, time_of_day: str, count: int, rng=random) -> array:
+        return self.table(zone, time_of_day).sample_many(count, rng)
+
+    def encounter(self, zone: str, time_of_day: str, rng=random) -> Pokemon:
+        return self.catalog.create(self.sample(zone, time_of_day, rng))
+
+    def set_weight(self, zone: str, time_of_day: str, species: Union[int, str], weight: float):
+        species_id = self.catalog.index(species) if isinstance(species, str) else species
+        self.table(zone, time_of_day).set_weight(species_id, weight)
+
+def build_encounters(data: dict, catalog: SpeciesCatalog = CATALOG) -> EncounterSystem:
+    rarity_weights = data.get("rarity_weights", {})
+
+    def weight_of(value) -> float:
+        if isinstance(value, str):
+            if value not in rarity_weights:
+                raise KeyError(f"unknown rarity {value!r}")
+            return rarity_weights[value]
+        return value
+
+    tables = {}
+    for zone, times in data["zones"].items():
+        for time_of_day, entries in times.items():
+            if time_of_day not in TIMES_OF_DAY:
+                raise ValueError(f"unknown time of day {time_of_day!r} in zone {zone!r}")
+            table = EncounterTable([catalog.index(name) for name in entries],
+                                   [weight_of(value) for value in entries.values()])
+            # Compile up front so a bad table fails at load rather than mid-game.
+            table.alias
+            tables[zone, time_of_day] = table
+    return EncounterSystem(tables, catalog)
+
+def load_encounters(path: str = ENCOUNTERS_PATH, catalog: SpeciesCatalog = CATALOG) -> EncounterSystem:
+    with open(path, encoding="utf-8") as handle:
+        return build_encounters(json.load(handle), catalog)
+
+ENCOUNTERS = load_encounters()
+
+def benchmark_encounters(species: int = 1_000, samples: int = 200_000, seed: int = 5) -> dict:
+    weights = [random.Random(seed + index).uniform(0.1, 50.0) for index in range(species)]
+    outcomes = list(range(species))
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    table = AliasTable(outcomes, weights)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(samples // 10):
+        rng.choices(outcomes, weights)
+    choices = (time.perf_counter() - start) / (samples // 10)
+
+    start = time.perf_counter()
+    for _ in range(samples):
+        table.sample(rng)
+    single = (time.perf_counter() - start) / samples
+
+    start = time.perf_counter()
+    table.sample_many(samples, rng)
+    bulk = (time.perf_counter() - start) / samples
+
+    results = {"species": species, "build_ms": build * 1e3, "choices_per_second": 1 / choices,
+               "sample_per_second": 1 / single, "sample_many_per_second": 1 / bulk}
+    if np is not None:
+        generator = np.random.default_rng(seed)
+        start = time.perf_counter()
+        table.sample_array(samples * 10, generator)
+        results["sample_array_per_second"] = samples * 10 / (time.perf_counter() - start)
+    return results
+
+def test_encounters():
+    rng = random.Random(1)
+    for zone in ENCOUNTERS.zones:
+        for time_of_day in TIMES_OF_DAY:
+            names = [CATALOG[species][0] for species in ENCOUNTERS.sample_many(zone, time_of_day, 6, rng)]
+            print(f"🌿 {zone:>6} ({time_of_day:>5}): {', '.join(names)}")
+
+    results = benchmark_encounters()
+    print(f"🎲 {results['species']} species, alias table built in {results['build_ms']:.2f} ms")
+    print(f"🐢 random.choices:     {results['choices_per_second'] / 1e6:6.2f}M samples/s")
+    print(f"🚀 alias sample:       {results['sample_per_second'] / 1e6:6.2f}M samples/s")
+    print(f"📦 alias sample_many:  {results['sample_many_per_second'] / 1e6:6.2f}M samples/s")
+    if "sample_array_per_second" in results:
+        print(f"🧮 alias sample_array: {results['sample_array_per_second'] / 1e6:6.2f}M samples/s")
+
+if __name__ == "__main__":
+    print("🧪 Testing Encounter Sampling")
+    test_encounters()
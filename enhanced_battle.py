@@ -1,142 +1,204 @@
 import asyncio
-import random
 from typing import List, Optional
 from pokemon import Pokemon
+from pacing import resolve_clock
+from renderer import animations_enabled
+from rng_streams import RNGStreamFactory
+from battle_rules import EventType, resolve_attack, step
+from battle_state import BattleTimeline, CowBattleState, Rewind
+from team_battle import DRAW, TeamBattleState, first_alive, step_team
+from effect_rules import RULES
+from metrics import resolve_metrics
+from tracing import set_battle_turn
 
 class EnhancedBattleSystem:
     """Advanced battle mechanics with trainer teams."""
     
-    def __init__(self):
+    def __init__(self, clock=None, rng=None, seed=None, recorder=None, rewind_interval=10,
+                 rewind_checkpoints=16, metrics=None):
+        self.clock = resolve_clock(clock)
+        self.metrics = resolve_metrics(metrics)
+        self.recorder = recorder
+        self.rng = rng
+        self.streams = RNGStreamFactory(seed)
         self.battle_log = []
+        self.last_battle_turns = 0
         self.special_effects_active = True
+        self.rewind_interval = rewind_interval
+        self.rewind_checkpoints = rewind_checkpoints
+        self.timeline = None
     
-    async def trainer_battle(self, trainer1_team: List[Pokemon], trainer2_team: List[Pokemon]):
-        print("🏆 TRAINER BATTLE BEGINS! 🏆")
-        await asyncio.sleep(1.5)
-        
-        trainer1_active = 0
-        trainer2_active = 0
-        
-        while (trainer1_active < len(trainer1_team) and 
-               trainer2_active < len(trainer2_team)):
-            
-            pokemon1 = trainer1_team[trainer1_active]
-            pokemon2 = trainer2_team[trainer2_active]
-            
-            print(f"\n⚔️  {pokemon1.name} vs {pokemon2.name}!")
-            winner = await self.single_pokemon_battle(pokemon1, pokemon2)
-            
-            if winner == pokemon1:
-                trainer2_active += 1
-                if trainer2_active < len(trainer2_team):
-                    next_pokemon = trainer2_team[trainer2_active]
-                    print(f"🔄 Trainer 2 sends out {next_pokemon.name}!")
-                    await asyncio.sleep(1)
-            else:
-                trainer1_active += 1
-                if trainer1_active < len(trainer1_team):
-                    next_pokemon = trainer1_team[trainer1_active]
-                    print(f"🔄 Trainer 1 sends out {next_pokemon.name}!")
-                    await asyncio.sleep(1)
+    async def trainer_battle(self, trainer1_team: List[Pokemon], trainer2_team: List[Pokemon],
+                             policy=None, replace=first_alive):
+        """A full team battle on the team engine; returns the winning side (0, 1 or ``DRAW``).
+        
+        ``policy(state, side, rng)`` picks each side's action every turn, so
+        ``team_battle.matchup_policy`` makes both trainers switch; by default
+        both attack with random moves and only switch when one faints.
+        """
+        metrics = self.metrics
+        metrics.count("battles_total")
+        rng = self.battle_rng()
+        state = TeamBattleState(trainer1_team, trainer2_team)
+        battle_id = getattr(rng, 'battle_id', 0)
+        actions = [None, None]
+        events = []
         
-        if trainer1_active < len(trainer1_team):
-            print("🎉 Trainer 1 wins the battle!")
+        print("🏆 TRAINER BATTLE BEGINS! 🏆")
+        await self.clock.sleep(1.5)
+        sides = list(state.active)
+        hp_display = [pokemon.current_hp for pokemon in sides]
+        self.battle_log = []
+        if self.recorder is not None:
+            # The replay roster is the two leads; SWITCH events carry each replacement's HP.
+            self.recorder.begin_battle(getattr(rng, 'stream_seed', 0), battle_id, sides)
+        print(f"\n⚔️  {sides[0].name} vs {sides[1].name}!")
+        
+        while not state.finished:
+            set_battle_turn(battle_id, state.turn)
+            turn_started = started = metrics.start()
+            if policy is not None:
+                actions[0] = policy(state, 0, rng)
+                actions[1] = policy(state, 1, rng)
+            events.clear()
+            step_team(state, actions, rng, replace=replace, events=events)
+            metrics.stop("rules", started)
+            metrics.count_events(events)
+            self.battle_log.extend(events)
+            if self.recorder is not None:
+                self.recorder.record(events)
+            started = metrics.start()
+            await self.render_events(sides, events, hp_display, state.sides)
+            metrics.stop("render", started)
+            metrics.stop_turn(turn_started)
+        
+        set_battle_turn(None, None)
+        if self.recorder is not None:
+            self.recorder.end_battle()
+        self.last_battle_turns = state.turn
+        if state.winner == DRAW:
+            print("🤝 Both trainers are out of Pokemon. It's a draw!")
         else:
-            print("🎉 Trainer 2 wins the battle!")
+            print(f"🎉 Trainer {state.winner + 1} wins the battle!")
+        return state.winner
     
     async def single_pokemon_battle(self, pokemon1, pokemon2):
-        turn = 1
-        
-        while pokemon1.current_hp > 0 and pokemon2.current_hp > 0:
-            print(f"\n--- Turn {turn} ---")
-            
-            if pokemon1.speed >= pokemon2.speed:
-                first, second = pokemon1, pokemon2
-            else:
-                first, second = pokemon2, pokemon1
-            
-            if first.current_hp > 0:
-                await self.execute_turn(first, second)
-                if second.current_hp <= 0:
-                    break
-            
-            if second.current_hp > 0:
-                await self.execute_turn(second, first)
-            
-            await first.status_effect_tick()
-            await second.status_effect_tick()
-            
-            turn += 1
-            await asyncio.sleep(0.8)
-        
-        winner = pokemon1 if pokemon1.current_hp > 0 else pokemon2
+        metrics = self.metrics
+        metrics.count("battles_total")
+        rng = self.battle_rng()
+        state = CowBattleState.from_pokemon(pokemon1, pokemon2)
+        self.timeline = BattleTimeline(state, rng, self.rewind_interval, self.rewind_checkpoints)
+        hp_display = [pokemon1.current_hp, pokemon2.current_hp]
+        self.battle_log = []
+        if self.recorder is not None:
+            self.recorder.begin_battle(getattr(rng, 'stream_seed', 0), getattr(rng, 'battle_id', 0),
+                                      state.sides)
+        
+        battle_id = getattr(rng, 'battle_id', 0)
+        while not state.finished:
+            set_battle_turn(battle_id, state.turn)
+            turn_started = started = metrics.start()
+            state, events = step(state, rng=rng)
+            self.timeline.record(state, events, rng)
+            metrics.stop("rules", started)
+            metrics.count_events(events)
+            self.battle_log.extend(events)
+            if self.recorder is not None:
+                self.recorder.record(events)
+            started = metrics.start()
+            await self.render_events(state.sides, events, hp_display)
+            metrics.stop("render", started)
+            metrics.stop_turn(turn_started)
+        
+        set_battle_turn(None, None)
+        if self.recorder is not None:
+            self.recorder.end_battle()
+        state.write_back((pokemon1, pokemon2))
+        self.last_battle_turns = state.turn
+        winner = (pokemon1, pokemon2)[state.winner]
         print(f"🏆 {winner.name} wins!")
         return winner
     
-    async def execute_turn(self, attacker, defender):
-        available_moves = getattr(attacker, 'moves', ['Tackle', 'Scratch'])
-        chosen_move = random.choice(available_moves)
-        
-        is_paralyzed = any(effect.effect_type.value == 'paralysis' 
-                          for effect in getattr(attacker, 'status_effects', []))
-        
-        if is_paralyzed and random.random() < 0.25:
-            print(f"⚡ {attacker.name} is paralyzed and can't move!")
-            await asyncio.sleep(1)
-            return
-        
-        await self.use_move_with_effects(attacker, defender, chosen_move)
+    def rewind(self, turn: int) -> Rewind:
+        """The last battle as it stood at the start of ``turn``, to branch from or inspect.
+        
+        Only the most recent ``rewind_interval * rewind_checkpoints`` turns are kept.
+        """
+        if self.timeline is None:
+            raise RuntimeError("no battle has been played yet")
+        return self.timeline.rewind(turn)
+    
+    async def execute_turn(self, attacker, defender, move_name=None):
+        events = []
+        hp_display = [attacker.current_hp, defender.current_hp]
+        resolve_attack(attacker, defender, 0, move_name, events, self.battle_rng())
+        await self.render_events((attacker, defender), events, hp_display)
+    
+    def battle_rng(self):
+        return self.rng if self.rng is not None else self.streams.next_stream()
+    
+    async def render_events(self, sides, events, hp_display, teams=None):
+        """Print and animate ``events``; with ``teams``, ``sides`` is a list kept in step with switches."""
+        for event in events:
+            kind = event.kind
+            pokemon = sides[event.side]
+            
+            if kind == EventType.TURN_START:
+                print(f"\n--- Turn {event.value} ---")
+            elif kind == EventType.MOVE:
+                await self.use_move_with_effects(pokemon, event.detail)
+            elif kind == EventType.FULLY_PARALYZED:
+                print(f"⚡ {pokemon.name} is paralyzed and can't move!")
+                await self.clock.sleep(1)
+            elif kind == EventType.CRITICAL:
+                print("💥 Critical hit!")
+                await self.clock.sleep(0.5)
+            elif kind == EventType.DAMAGE:
+                await self.animated_damage(pokemon, event.value, hp_display[event.side], event.hp)
+                hp_display[event.side] = event.hp
+            elif kind == EventType.STATUS_APPLIED:
+                print(RULES.by_value[event.detail].announce.format(name=pokemon.name))
+                await self.clock.sleep(0.5)
+            elif kind == EventType.STATUS_DAMAGE:
+                await self.clock.sleep(0.2)
+                print(RULES.by_value[event.detail].hurt.format(name=pokemon.name, damage=event.value))
+                hp_display[event.side] = event.hp
+            elif kind == EventType.STATUS_EXPIRED:
+                print(RULES.by_value[event.detail].recovers.format(name=pokemon.name))
+                await self.clock.sleep(0.3)
+            elif kind == EventType.SWITCH:
+                if teams is not None:
+                    sides[event.side] = teams[event.side].members[event.value]
+                hp_display[event.side] = event.hp
+                print(f"🔄 Trainer {event.side + 1} sends out {event.detail}!")
+                await self.clock.sleep(1)
+            elif kind == EventType.TURN_END:
+                await self.clock.sleep(0.8)
     
-    async def use_move_with_effects(self, attacker, defender, move_name):
+    async def use_move_with_effects(self, attacker, move_name):
         print(f"🎯 {attacker.name} uses {move_name}!")
         
         for i in range(3):
             print("⚡" * (i + 1))
-            await asyncio.sleep(0.2)
-        
-        base_damage = getattr(attacker, 'attack', 50)
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-        
-        if random.random() < 0.0625:
-            damage = int(damage * 1.5)
-            print("💥 Critical hit!")
-            await asyncio.sleep(0.5)
-        
-        await self.animated_damage(defender, damage)
-        
-        await self.apply_move_effects(move_name, attacker, defender)
+            await self.clock.sleep(0.2)
     
-    async def animated_damage(self, target, damage):
+    async def animated_damage(self, target, damage, old_hp, new_hp):
         print(f"💢 {target.name} takes {damage} damage!")
         
-        old_hp = target.current_hp
-        target.current_hp = max(0, target.current_hp - damage)
+        if not animations_enabled():
+            print(f"❤️  {target.name}: {new_hp}/{target.max_hp} HP")
+            await self.clock.sleep(1.0)
+            return
         
         steps = 5
-        hp_diff = old_hp - target.current_hp
+        hp_diff = old_hp - new_hp
         for i in range(steps):
             current_display = old_hp - (hp_diff * (i + 1) // steps)
             print(f"❤️  HP: {current_display}/{target.max_hp}", end='\r')
-            await asyncio.sleep(0.1)
-        
-        print(f"❤️  {target.name}: {target.current_hp}/{target.max_hp} HP")
-        await asyncio.sleep(0.5)
-    
-    async def apply_move_effects(self, move_name, attacker, defender):
-        move_effects = {
-            'Poison Sting': 'poison',
-            'Ember': 'burn',
-            'Thunder Wave': 'paralysis',
-            'Sleep Powder': 'sleep',
-        }
+            await self.clock.sleep(0.1)
         
-        if move_name in move_effects and random.random() < 0.3:
-            from status_effects import StatusType, StatusEffect
-            effect_type = getattr(StatusType, move_effects[move_name].upper())
-            effect = StatusEffect(effect_type, 3)
-            defender.status_effects.append(effect)
-            print(f"🌟 {defender.name} was {move_effects[move_name]}ed!")
-            await asyncio.sleep(0.5)
+        print(f"❤️  {target.name}: {new_hp}/{target.max_hp} HP")
+        await self.clock.sleep(0.5)
 
 async def test_enhanced_battle():
     pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
@@ -1,28 +1,70 @@
 import asyncio
-import random
 from typing import List, Optional
 
-from pokemon import Pokemon
 from async_ui import AsyncUI, InteractiveBattleSystem
 from status_effects import AdvancedStatusManager, StatusType, StatusEffect
 from special_moves import SpecialMoveSystem
 from enhanced_battle import EnhancedBattleSystem
+from pacing import resolve_clock
+from rng_streams import RNGStreamFactory
+from battle_ai import BattleAI
+from moves import restore_pp
+from battle_rules import BattleEvent, EventType, resolve_regular_move, turn_order
+from species_catalog import CATALOG
+from encounters import ENCOUNTERS
+from metrics import resolve_metrics
+from tracing import set_battle_turn
+from team_battle import DRAW, TeamBattleState, best_matchup, settle_faints, switch_in
 
 class CompletePokemonGame:
     """Main Pokemon battle game with all systems integrated."""
     
-    def __init__(self):
-        self.ui = AsyncUI()
-        self.status_manager = AdvancedStatusManager()
-        self.special_moves = SpecialMoveSystem()
-        self.battle_system = InteractiveBattleSystem()
+    def __init__(self, clock=None, seed=None, recorder=None, output=None, difficulty="normal",
+                 ai_executor=None, zone="meadow", time_of_day="day", metrics=None):
+        self.clock = resolve_clock(clock)
+        self.recorder = recorder
+        self.metrics = resolve_metrics(metrics)
+        self.streams = RNGStreamFactory(seed)
+        self.rng = self.streams.next_stream()
+        self.ui = AsyncUI(self.clock, output=output, metrics=self.metrics)
+        self.status_manager = AdvancedStatusManager(self.clock, self.rng, self.metrics)
+        self.special_moves = SpecialMoveSystem(self.clock, self.rng)
+        self.battle_system = InteractiveBattleSystem(self.clock, self.rng)
+        self.ai = BattleAI(difficulty, ai_executor)
+        self.encounters = ENCOUNTERS
+        self.encounters.table(zone, time_of_day)  # fail fast on an unknown zone
+        self.zone = zone
+        self.time_of_day = time_of_day
         self.player_team = []
         self.current_opponent = None
         self.in_trainer_battle = False
+        self.team_state = None
+    
+    def begin_battle_stream(self):
+        self.rng = self.streams.next_stream()
+        self.status_manager.rng = self.rng
+        self.special_moves.rng = self.rng
+        self.battle_system.rng = self.rng
+        return self.rng
+    
+    def side_of(self, pokemon) -> int:
+        return 1 if pokemon is self.current_opponent else 0
+    
+    def record_events(self, events):
+        self.metrics.count_events(events)
+        if self.recorder is not None:
+            self.recorder.record(events)
     
     async def start_game(self):
+        try:
+            async with self.ui.renderer:
+                await self.run_game()
+        finally:
+            self.ui.close_input()
+    
+    async def run_game(self):
         await self.ui.type_message("🎮 Welcome to Pokemon Battle Arena! 🎮", 0.05)
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
         
         await self.setup_player_team()
         
@@ -31,11 +73,7 @@ class CompletePokemonGame:
     async def setup_player_team(self):
         await self.ui.type_message("🏆 Choose your starter Pokemon!", 0.05)
         
-        starters = [
-            Pokemon("Pikachu", "Electric", 100, 55, 50, 90),
-            Pokemon("Charmander", "Fire", 95, 52, 48, 65),
-            Pokemon("Squirtle", "Water", 98, 48, 55, 43),
-        ]
+        starters = [CATALOG.create(species) for species in CATALOG.group("starter")]
         
         print("\n" + "="*50)
         for i, pokemon in enumerate(starters, 1):
@@ -57,7 +95,7 @@ class CompletePokemonGame:
             except ValueError:
                 print("❌ Please enter a number!")
         
-        await asyncio.sleep(1.5)
+        await self.clock.sleep(1.5)
     
     async def main_game_loop(self):
         while True:
@@ -93,10 +131,11 @@ class CompletePokemonGame:
     
     async def pokemon_center(self):
         await self.ui.type_message("🏥 Welcome to the Pokemon Center!")
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
         
         healed_any = False
         for pokemon in self.player_team:
+            restore_pp(pokemon)
             if pokemon.current_hp < pokemon.max_hp or pokemon.status_effects:
                 old_hp = pokemon.current_hp
                 pokemon.current_hp = pokemon.max_hp
@@ -107,7 +146,7 @@ class CompletePokemonGame:
                 else:
                     await self.ui.type_message(f"✨ {pokemon.name} was fully healed!")
                 healed_any = True
-                await asyncio.sleep(0.8)
+                await self.clock.sleep(0.8)
         
         if not healed_any:
             await self.ui.type_message("💚 Your Pokemon are already in perfect health!")
@@ -118,15 +157,8 @@ class CompletePokemonGame:
     
     async def wild_pokemon_battle(self):
         self.in_trainer_battle = False
-        wild_pokemon_list = [
-            ("Rattata", "Normal", 80, 45, 35, 72),
-            ("Pidgy", "Flying", 85, 50, 40, 56),
-            ("Caterpie", "Bug", 75, 30, 35, 45),
-            ("Geodude", "Rock", 90, 60, 70, 20),
-        ]
-        
-        wild_data = random.choice(wild_pokemon_list)
-        wild_pokemon = Pokemon(*wild_data)
+        self.begin_battle_stream()
+        wild_pokemon = self.encounters.encounter(self.zone, self.time_of_day, self.rng)
         
         await self.ui.type_message(f"🌿 A wild {wild_pokemon.name} appeared!")
         
@@ -135,14 +167,8 @@ class CompletePokemonGame:
     
     async def trainer_battle(self):
         self.in_trainer_battle = True
-        trainer_teams = [
-            [("Machop", "Fighting", 90, 60, 50, 35), ("Geodude", "Rock", 90, 60, 70, 20)],
-            [("Magikarp", "Water", 60, 10, 55, 80), ("Gyarados", "Water", 150, 90, 79, 81)],
-            [("Pichu", "Electric", 60, 40, 15, 60), ("Raichu", "Electric", 110, 85, 50, 110)],
-        ]
-        
-        enemy_team_data = random.choice(trainer_teams)
-        enemy_team = [Pokemon(*data) for data in enemy_team_data]
+        self.begin_battle_stream()
+        enemy_team = [CATALOG.create(species) for species in self.rng.choice(CATALOG.teams)]
         
         await self.ui.type_message("👨‍🎓 Trainer challenges you to battle!")
         await self.ui.type_message(f"Trainer sends out {enemy_team[0].name}!")
@@ -150,44 +176,78 @@ class CompletePokemonGame:
         await self.multi_pokemon_battle(self.player_team, enemy_team)
     
     async def enhanced_battle(self, player_pokemon, opponent):
+        metrics = self.metrics
+        metrics.count("battles_total")
         battle_active = True
         turn = 1
+        self.current_opponent = opponent
+        team = self.team_state
+        if self.recorder is not None:
+            self.recorder.begin_battle(self.rng.stream_seed, self.rng.battle_id, (player_pokemon, opponent))
         
-        while (battle_active and 
-               player_pokemon.current_hp > 0 and 
-               opponent.current_hp > 0):
+        while battle_active:
+            if player_pokemon.current_hp <= 0 or opponent.current_hp <= 0:
+                if team is None or not await self.replace_fainted(team):
+                    break
+                player_pokemon, opponent = team.active
+                self.current_opponent = opponent
             
+            set_battle_turn(self.rng.battle_id, turn)
+            turn_started = metrics.start()
             await self.ui.display_battle_status(player_pokemon, opponent)
             
             print(f"\n🔄 Turn {turn}")
+            self.record_events([BattleEvent(EventType.TURN_START, 0, turn)])
             
-            player_can_act = await self.status_manager.apply_status_effects(player_pokemon)
-            opponent_can_act = await self.status_manager.apply_status_effects(opponent)
+            player_can_act = await self.status_manager.apply_status_effects(player_pokemon, 0)
+            self.record_events(self.status_manager.last_events)
+            opponent_can_act = await self.status_manager.apply_status_effects(opponent, 1)
+            self.record_events(self.status_manager.last_events)
             
             if player_pokemon.current_hp <= 0 or opponent.current_hp <= 0:
-                break
+                turn += 1
+                metrics.stop_turn(turn_started)
+                continue
             
-            if player_pokemon.speed >= opponent.speed:
+            if turn_order(player_pokemon, opponent)[0] == 0:
                 if player_can_act:
                     action_result = await self.player_enhanced_turn(player_pokemon, opponent)
                     if action_result == "run":
                         battle_active = False
+                        metrics.stop_turn(turn_started)
                         break
+                    if action_result == "switch":
+                        player_pokemon = team.sides[0].pokemon
                 if opponent.current_hp > 0 and opponent_can_act:
                     await self.ai_enhanced_turn(opponent, player_pokemon)
             else:
                 if opponent_can_act:
-                    await self.ai_enhanced_turn(opponent, player_pokemon)
+                    await self.ai_enhanced_turn(opponent, player_pokemon, player_can_act)
                 if player_pokemon.current_hp > 0 and player_can_act:
                     action_result = await self.player_enhanced_turn(player_pokemon, opponent)
                     if action_result == "run":
                         battle_active = False
+                        metrics.stop_turn(turn_started)
                         break
+                    if action_result == "switch":
+                        player_pokemon = team.sides[0].pokemon
             
             turn += 1
-            await asyncio.sleep(1)
+            await self.clock.sleep(1)
+            metrics.stop_turn(turn_started)
         
-        if battle_active:
+        set_battle_turn(None, None)
+        if self.recorder is not None:
+            self.recorder.end_battle()
+        
+        if battle_active and team is not None:
+            if team.winner == 0:
+                await self.ui.type_message(f"🎉 You defeated the trainer! {player_pokemon.name} won!")
+            elif team.winner == DRAW:
+                await self.ui.type_message("🤝 Your last Pokemon and the trainer's fainted together. It's a draw!")
+            else:
+                await self.ui.type_message(f"💀 {player_pokemon.name} fainted! You have no Pokemon left!")
+        elif battle_active:
             if player_pokemon.current_hp > 0:
                 await self.ui.type_message(f"🎉 {player_pokemon.name} won!")
             else:
@@ -201,25 +261,39 @@ class CompletePokemonGame:
             
             if move_choice != "back":
                 if move_choice in self.special_moves.moves_database:
-                    await self.special_moves.use_special_move(player_pokemon, opponent, move_choice)
+                    started = self.metrics.start()
+                    await self.special_moves.use_special_move(player_pokemon, opponent, move_choice,
+                                                              self.side_of(opponent))
+                    self.metrics.stop("special_move", started)
+                    self.record_events(self.special_moves.last_events)
                 else:
                     await self.execute_regular_move(player_pokemon, opponent, move_choice)
             return "attack"
             
         elif action == "2":
             await self.ui.display_message("🎒 No items! Visit Pokemon Center to heal!")
-            await asyncio.sleep(1)
+            await self.clock.sleep(1)
             return "continue"
             
         elif action == "3":
-            await self.ui.display_message("🔄 No other Pokemon available!")
-            await asyncio.sleep(1)
-            return "continue"
+            team = self.team_state
+            if team is None or not team.sides[0].bench():
+                await self.ui.display_message("🔄 No other Pokemon available!")
+                await self.clock.sleep(1)
+                return "continue"
+            member = await self.choose_team_member(team.sides[0], allow_back=True)
+            if member is None:
+                return "continue"
+            events = []
+            switch_in(team, 0, member, events)
+            self.record_events(events)
+            await self.ui.type_message(f"🔄 Come back, {player_pokemon.name}! Go, {team.sides[0].pokemon.name}!")
+            return "switch"
             
         elif action == "4":
             if self.in_trainer_battle:
                 await self.ui.display_message("❌ You cannot run from trainer battles!")
-                await asyncio.sleep(1)
+                await self.clock.sleep(1)
                 return "continue"
             else:
                 await self.ui.type_message("🏃 You ran away from the battle!")
@@ -227,53 +301,39 @@ class CompletePokemonGame:
             
         else:
             await self.ui.display_message("❌ Invalid choice! Please try again.")
-            await asyncio.sleep(1)
+            await self.clock.sleep(1)
             return "continue"
     
-    async def ai_enhanced_turn(self, ai_pokemon, target):
-        await self.ui.display_message(f"🤖 {ai_pokemon.name} is deciding...")
-        await asyncio.sleep(1)
-        
-        moves = ai_pokemon.moves
+    async def ai_enhanced_turn(self, ai_pokemon, target, target_pending=False):
+        await self.ui.display_message(f"🤖 {ai_pokemon.name} is deciding...", 0)
+        started = self.metrics.start()
+        chosen_move = (await self.ai.choose_move_async(ai_pokemon, target, target_pending)).move
+        self.metrics.stop("ai", started)
         
-        if ai_pokemon.current_hp > ai_pokemon.max_hp * 0.5:
-            special_moves = [move for move in moves if move in self.special_moves.moves_database]
-            if special_moves and random.random() < 0.3:
-                chosen_move = random.choice(special_moves)
-                await self.special_moves.use_special_move(ai_pokemon, target, chosen_move)
-                return
+        if chosen_move in self.special_moves.moves_database:
+            started = self.metrics.start()
+            await self.special_moves.use_special_move(ai_pokemon, target, chosen_move,
+                                                      self.side_of(target))
+            self.metrics.stop("special_move", started)
+            self.record_events(self.special_moves.last_events)
+            return
         
-        chosen_move = random.choice(moves)
         await self.execute_regular_move(ai_pokemon, target, chosen_move)
     
     async def execute_regular_move(self, attacker, defender, move_name):
-        await self.ui.type_message(f"⚡ {attacker.name} uses {move_name}!")
+        events = []
+        started = self.metrics.start()
+        resolve_regular_move(attacker, defender, self.side_of(defender), move_name, events, self.rng)
+        self.metrics.stop("damage", started)
+        self.record_events(events)
         
-        base_damage = attacker.attack
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-        
-        defender.current_hp = max(0, defender.current_hp - damage)
-        
-        await self.ui.type_message(f"💥 {defender.name} takes {damage} damage!")
-        
-        await self.apply_move_side_effects(move_name, attacker, defender)
-    
-    async def apply_move_side_effects(self, move_name, attacker, defender):
-        effect_chances = {
-            "Thunder Shock": ("paralysis", 0.1),
-            "Ember": ("burn", 0.1),
-            "Water Gun": ("none", 0),
-            "Thunder Wave": ("paralysis", 0.9),
-        }
-        
-        if move_name in effect_chances:
-            effect, chance = effect_chances[move_name]
-            if effect != "none" and random.random() < chance:
-                self.status_manager.add_status_effect(
-                    defender, 
-                    getattr(StatusType, effect.upper()), 
-                    3
-                )
+        for event in events:
+            if event.kind == EventType.MOVE:
+                await self.ui.type_message(f"⚡ {attacker.name} uses {move_name}!")
+            elif event.kind == EventType.DAMAGE:
+                await self.ui.type_message(f"💥 {defender.name} takes {event.value} damage!")
+            elif event.kind == EventType.STATUS_APPLIED:
+                self.status_manager.announce_status(defender, StatusType(event.detail))
     
     async def show_team_status(self):
         print("\n" + "="*50)
@@ -288,7 +348,61 @@ class CompletePokemonGame:
         await self.ui.get_user_input("\nPress Enter to continue...")
     
     async def multi_pokemon_battle(self, team1, team2):
-        await self.enhanced_battle(team1[0], team2[0])
+        if not any(pokemon.current_hp > 0 for pokemon in team1):
+            await self.ui.type_message("💤 Your Pokemon are too tired to battle! Visit the Pokemon Center.")
+            return
+        self.team_state = TeamBattleState(team1, team2)
+        try:
+            await self.enhanced_battle(*self.team_state.active)
+        finally:
+            self.team_state = None
+    
+    async def replace_fainted(self, team: TeamBattleState) -> bool:
+        """Send in replacements for fainted Pokemon; False once either side has none left."""
+        fainted = [team.sides[side].pokemon for side in (0, 1)]
+        if not settle_faints(team):
+            return False
+        
+        events = []
+        for side, pokemon in enumerate(fainted):
+            if pokemon.current_hp > 0:
+                continue
+            await self.ui.type_message(f"💀 {pokemon.name} fainted!")
+            if side == 0:
+                switch_in(team, 0, await self.choose_team_member(team.sides[0]), events)
+                await self.ui.type_message(f"🔄 Go, {team.sides[0].pokemon.name}!")
+            else:
+                switch_in(team, 1, best_matchup(team, 1), events)
+                await self.ui.type_message(f"Trainer sends out {team.sides[1].pokemon.name}!")
+        self.record_events(events)
+        return True
+    
+    async def choose_team_member(self, team_side, allow_back: bool = False) -> Optional[int]:
+        """Ask which benched Pokemon to send in; None if the player backs out."""
+        bench = team_side.bench()
+        if len(bench) == 1 and not allow_back:
+            return bench[0]
+        
+        print("\n" + "="*40)
+        for number, member in enumerate(bench, 1):
+            pokemon = team_side.members[member]
+            print(f"{number}. {pokemon.name} (HP: {pokemon.current_hp}/{pokemon.max_hp})")
+        if allow_back:
+            print("0. ← Back to main menu")
+        print("="*40)
+        
+        while True:
+            choice = await self.ui.get_user_input(f"Choose a Pokemon ({0 if allow_back else 1}-{len(bench)}): ")
+            try:
+                choice_num = int(choice)
+            except ValueError:
+                print("❌ Please enter a number!")
+                continue
+            if allow_back and choice_num == 0:
+                return None
+            if 1 <= choice_num <= len(bench):
+                return bench[choice_num - 1]
+            print("❌ Invalid choice! Please try again.")
 
 async def main():
     game = CompletePokemonGame()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+from typing import Iterable, Optional
+
+class StreamInput:
+    """Reads prompt answers line by line from an asyncio StreamReader, e.g. a client socket.
+
+    A line longer than the reader's limit is discarded up to its newline and
+    reading carries on with the next one; only a disconnect or EOF ends input.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, encoding: str = "utf-8"):
+        self.reader = reader
+        self.encoding = encoding
+
+    async def readline(self) -> Optional[str]:
+        discarding = False
+        while True:
+            try:
+                line = await self.reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as error:
+                line = b"" if discarding else error.partial
+            except asyncio.LimitOverrunError as error:
+                await self.reader.readexactly(error.consumed)
+                discarding = True
+                continue
+            except ConnectionError:
+                return None
+            else:
+                if discarding:
+                    discarding = False
+                    continue
+            if not line:
+                return None
+            return line.decode(self.encoding, "replace").strip()
+
+    def close(self):
+        pass
+
+class TerminalInput(StreamInput):
+    """Reads a terminal or pipe file descriptor with loop.add_reader instead of a thread.
+
+    Regular files (stdin redirected from a script) cannot be polled, but they
+    never block either, so they are read in one go instead.
+    """
+
+    def __init__(self, fd: Optional[int] = None, max_line: int = 4096):
+        super().__init__(asyncio.StreamReader(limit=max_line), getattr(sys.stdin, "encoding", None) or "utf-8")
+        self.fd = sys.stdin.fileno() if fd is None else fd
+        self.loop = None
+
+    async def readline(self) -> Optional[str]:
+        if self.loop is None:
+            self.start()
+        return await super().readline()
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        try:
+            self.loop.add_reader(self.fd, self.read_ready)
+        except (PermissionError, NotImplementedError):
+            self.loop = False
+            while self.read_ready():
+                pass
+
+    def read_ready(self) -> bool:
+        try:
+            data = os.read(self.fd, 65536)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            data = b""
+        if data:
+            self.reader.feed_data(data)
+            return True
+        self.reader.feed_eof()
+        self.close()
+        return False
+
+    def close(self):
+        if self.loop:
+            self.loop.remove_reader(self.fd)
+            self.loop = False
+
+class ScriptInput:
+    """Replays canned answers, e.g. a scripted load test, without any I/O."""
+
+    drops_type_ahead = False
+
+    def __init__(self, lines: Iterable[str]):
+        self.lines = iter(lines)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScriptInput":
+        with open(path, encoding="utf-8") as handle:
+            return cls([line.rstrip("\n") for line in handle])
+
+    async def readline(self) -> Optional[str]:
+        return next(self.lines, None)
+
+    def close(self):
+        pass
+
+def resolve_input(source=None):
+    if source is None:
+        return TerminalInput()
+    if isinstance(source, asyncio.StreamReader):
+        return StreamInput(source)
+    if isinstance(source, str):
+        return ScriptInput.from_file(source)
+    if isinstance(source, (list, tuple)):
+        return ScriptInput(source)
+    return source
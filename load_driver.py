@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import time
+from typing import List, Optional
+
+from battle_ai import DIFFICULTY_BUDGETS
+from final_pokemon_game import CompletePokemonGame
+from metrics import peak_rss_kib
+from pacing import VirtualClock
+from rng_streams import RNGStreamFactory
+
+DEFAULT_LEVELS = (1, 100, 10_000)
+
+class NullOutput:
+    """Output stream that throws away everything a session prints."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+class LoadStats:
+    def __init__(self):
+        self.turns = 0
+        self.battles = 0
+        self.sessions = 0
+        self.errors = 0
+        self.last_error = None
+        self.latencies = []
+
+class BotInput:
+    """Answers one game's prompts at random: battle, heal, repeat, then quit.
+
+    Each answer is produced only once the game shows a prompt, so a bot never
+    types ahead. The time from choosing a move to the next prompt is recorded
+    as that turn's latency.
+    """
+
+    drops_type_ahead = False
+
+    def __init__(self, ui, rng, battles: int, stats: LoadStats):
+        self.ui = ui
+        self.rng = rng
+        self.battles_left = battles
+        self.stats = stats
+        self.healed = True
+        self.move_sent = None
+
+    async def readline(self) -> Optional[str]:
+        await self.ui.prompted.wait()
+        self.ui.prompted.clear()
+        if self.move_sent is not None:
+            self.stats.latencies.append(time.perf_counter() - self.move_sent)
+            self.move_sent = None
+        return self.answer(self.ui.prompt)
+
+    def answer(self, prompt: str) -> str:
+        if prompt.startswith("Choose your starter"):
+            return self.rng.choice("123")
+        if prompt.startswith("Choose an option"):
+            if not self.healed:
+                self.healed = True
+                return "3"
+            if self.battles_left == 0:
+                return "5"
+            self.battles_left -= 1
+            self.stats.battles += 1
+            self.healed = False
+            return self.rng.choice("12")
+        if prompt.startswith("Choose an action"):
+            return "1"
+        if prompt.startswith("Choose a Pokemon"):
+            return self.rng.choice("123456")
+        if prompt.startswith("Choose a move"):
+            self.stats.turns += 1
+            self.move_sent = time.perf_counter()
+            return self.rng.choice("1234")
+        return ""
+
+    def close(self):
+        pass
+
+async def drive_session(seed: int, battles: int, stats: LoadStats, capture: bool = False,
+                        difficulty: str = "normal"):
+    output = io.StringIO() if capture else NullOutput()
+    game = CompletePokemonGame(clock=VirtualClock(), seed=seed, output=output, difficulty=difficulty)
+    game.ui.attach_input(BotInput(game.ui, game.rng, battles, stats))
+    try:
+        await game.start_game()
+        stats.sessions += 1
+    except Exception as error:
+        stats.errors += 1
+        stats.last_error = repr(error)
+    return output
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def run_load(sessions: int, battles: int = 2, seed: int = 0, capture: bool = False,
+                   difficulty: str = "normal") -> dict:
+    stats = LoadStats()
+    streams = RNGStreamFactory(seed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(drive_session(streams.next_stream().next64(), battles, stats, capture,
+                                         difficulty)
+                           for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": sessions,
+        "battles_per_session": battles,
+        "elapsed_seconds": elapsed,
+        "sessions_per_second": stats.sessions / elapsed,
+        "turns_per_second": stats.turns / elapsed,
+        "turns": stats.turns,
+        "p50_turn_ms": percentile(stats.latencies, 0.50) * 1000,
+        "p99_turn_ms": percentile(stats.latencies, 0.99) * 1000,
+        "mean_turn_ms": statistics.fmean(stats.latencies) * 1000 if stats.latencies else 0.0,
+        "peak_rss_mib": peak_rss_kib() / 1024,
+        "errors": stats.errors,
+        "last_error": stats.last_error,
+    }
+
+def run_levels(levels=DEFAULT_LEVELS, battles: int = 2, seed: int = 0, capture: bool = False,
+               difficulty: str = "normal") -> list:
+    return [asyncio.run(run_load(sessions, battles, seed, capture, difficulty)) for sessions in levels]
+
+def print_results(results: list):
+    print(f"{'sessions':>9} {'sessions/s':>11} {'turns/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'peak MiB':>9} {'errors':>7}")
+    for result in results:
+        print(f"{result['sessions']:>9,} {result['sessions_per_second']:>11,.1f} "
+              f"{result['turns_per_second']:>9,.0f} {result['p50_turn_ms']:>8.2f} "
+              f"{result['p99_turn_ms']:>8.2f} {result['peak_rss_mib']:>9.0f} {result['errors']:>7}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless load driver for CompletePokemonGame")
+    parser.add_argument("--sessions", default=",".join(str(level) for level in DEFAULT_LEVELS),
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--battles", type=int, default=2, help="battles each session plays")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capture", action="store_true", help="keep each session's output in memory")
+    parser.add_argument("--difficulty", choices=tuple(DIFFICULTY_BUDGETS), default="normal",
+                        help="search budget of the opponent AI")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.sessions.split(",")]
+    print(f"🤖 Driving {', '.join(f'{level:,}' for level in levels)} concurrent sessions, "
+          f"{args.battles} battles each")
+    results = run_levels(levels, args.battles, args.seed, args.capture, args.difficulty)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+if __name__ == "__main__":
+    main()
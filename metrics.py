@@ -0,0 +1,272 @@
+import bisect
+import json
+import resource
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from battle_rules import BattleEvent, EventType
+
+# name -> (help text, label name or None)
+COUNTERS = {
+    "battles_total": ("Battles started", None),
+    "turns_total": ("Turns played", None),
+    "moves_total": ("Moves used, by move", "move"),
+    "status_ticks_total": ("Status conditions that acted on their holder, by status", "status"),
+    "critical_hits_total": ("Critical hits landed", None),
+}
+HISTOGRAMS = {
+    "phase_seconds": ("Time spent in each phase of a battle", "phase"),
+    "turn_seconds": ("Wall time of one whole turn", None),
+}
+DEFAULT_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_PREFIX = "pokemon_"
+
+class Histogram:
+    """Observation counts per bucket, plus their count and sum.
+
+    Counts are kept per bucket and only made cumulative on export, so an
+    observation is one bisect and two additions.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield ("+Inf" if bound == float("inf") else repr(bound)), total
+
+    def snapshot(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "buckets": dict(self.cumulative())}
+
+class Metrics:
+    """Counters and timing histograms for the battle loops.
+
+    Phases are timed with a pair of calls rather than a context manager, so
+    the disabled ``NullMetrics`` costs two empty method calls per phase::
+
+        started = metrics.start()
+        ...
+        metrics.stop("status", started)
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, timer=time.perf_counter):
+        self.buckets = tuple(buckets)
+        self.timer = timer
+        self.reset()
+
+    def reset(self):
+        self.counters: Dict[str, Dict[str, int]] = {name: {} for name in COUNTERS}
+        self.histograms: Dict[str, Dict[str, Histogram]] = {name: {} for name in HISTOGRAMS}
+
+    def start(self) -> float:
+        return self.timer()
+
+    def stop(self, phase: str, started: float):
+        self.observe("phase_seconds", self.timer() - started, phase)
+
+    def stop_turn(self, started: float):
+        self.observe("turn_seconds", self.timer() - started)
+
+    def count(self, name: str, label: str = "", amount: int = 1):
+        counter = self.counters[name]
+        counter[label] = counter.get(label, 0) + amount
+
+    def observe(self, name: str, value: float, label: str = ""):
+        series = self.histograms[name]
+        histogram = series.get(label)
+        if histogram is None:
+            histogram = series[label] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def count_events(self, events: Iterable[BattleEvent]):
+        """Count turns, moves, status ticks and crits from a batch of battle events."""
+        counters = self.counters
+        previous = None
+        for event in events:
+            kind = event.kind
+            if kind == EventType.TURN_START:
+                counters["turns_total"][""] = counters["turns_total"].get("", 0) + 1
+            elif kind == EventType.MOVE:
+                self.count("moves_total", event.detail)
+            elif kind == EventType.CRITICAL:
+                counters["critical_hits_total"][""] = counters["critical_hits_total"].get("", 0) + 1
+            elif kind == EventType.STATUS_ACTIVE or (kind == EventType.STATUS_DAMAGE
+                                                     and previous != EventType.SELF_HIT):
+                # Confusion reports its self-hit damage too; that's the same tick.
+                self.count("status_ticks_total", event.detail)
+            previous = kind
+
+    def display(self, lock):
+        return TimedLock(lock, self)
+
+    def snapshot(self) -> dict:
+        """Every series as plain data; unlabelled series are keyed by ``""``."""
+        return {
+            "counters": {name: dict(series) for name, series in self.counters.items()},
+            "histograms": {name: {label: histogram.snapshot() for label, histogram in series.items()}
+                           for name, series in self.histograms.items()},
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """The text exposition format scraped by Prometheus."""
+        lines = []
+        for name, (help_text, label_name) in COUNTERS.items():
+            metric = PROMETHEUS_PREFIX + name
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for label, value in sorted(self.counters[name].items()):
+                lines.append(f"{metric}{label_set(label_name, label)} {value}")
+        for name, (help_text, label_name) in HISTOGRAMS.items():
+            metric = PROMETHEUS_PREFIX + name
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for label, histogram in sorted(self.histograms[name].items()):
+                for bound, total in histogram.cumulative():
+                    lines.append(f"{metric}_bucket{label_set(label_name, label, bound)} {total}")
+                lines.append(f"{metric}_sum{label_set(label_name, label)} {histogram.sum!r}")
+                lines.append(f"{metric}_count{label_set(label_name, label)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def label_set(label_name: Optional[str], label: str, bound: Optional[str] = None) -> str:
+    pairs = []
+    if label_name is not None:
+        escaped = label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{label_name}="{escaped}"')
+    if bound is not None:
+        pairs.append(f'le="{bound}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class TimedLock:
+    """Wraps an ``asyncio.Lock``: records the wait as ``display_lock`` and the hold as ``render``."""
+
+    __slots__ = ("lock", "metrics", "acquired")
+
+    def __init__(self, lock, metrics: Metrics):
+        self.lock = lock
+        self.metrics = metrics
+        self.acquired = 0.0
+
+    async def __aenter__(self):
+        started = self.metrics.start()
+        await self.lock.acquire()
+        self.metrics.stop("display_lock", started)
+        self.acquired = self.metrics.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.lock.release()
+        self.metrics.stop("render", self.acquired)
+
+class NullMetrics:
+    """Metrics switched off: every call is an empty method."""
+
+    enabled = False
+
+    def start(self) -> float:
+        return 0.0
+
+    def stop(self, phase: str, started: float):
+        pass
+
+    def stop_turn(self, started: float):
+        pass
+
+    def count(self, name: str, label: str = "", amount: int = 1):
+        pass
+
+    def observe(self, name: str, value: float, label: str = ""):
+        pass
+
+    def count_events(self, events):
+        pass
+
+    def display(self, lock):
+        return lock
+
+NULL_METRICS = NullMetrics()
+
+def peak_rss_kib() -> int:
+    """This process's peak resident set size, in KiB on Linux."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def resolve_metrics(metrics=None):
+    return metrics if metrics is not None else NULL_METRICS
+
+def benchmark_metrics(battles: int = 300, calls: int = 200_000, seed: int = 3) -> dict:
+    """Turn time with metrics off and on, and what the disabled calls cost per turn."""
+    import asyncio
+    import contextlib
+    from enhanced_battle import EnhancedBattleSystem
+    from load_driver import NullOutput
+    from pacing import VirtualClock
+    from pokemon import Pokemon
+
+    class CountingMetrics(NullMetrics):
+        def __init__(self):
+            self.calls = 0
+
+        def start(self) -> float:
+            self.calls += 1
+            return 0.0
+
+        def stop(self, phase: str, started: float):
+            self.calls += 1
+
+        def stop_turn(self, started: float):
+            self.calls += 1
+
+        def count_events(self, events):
+            self.calls += 1
+
+    async def play(metrics) -> Tuple[float, int]:
+        battle_system = EnhancedBattleSystem(clock=VirtualClock(), seed=seed, metrics=metrics)
+        turns = 0
+        start = time.perf_counter()
+        for _ in range(battles):
+            await battle_system.single_pokemon_battle(Pokemon("Pikachu", "Electric", 100, 55, 40, 90),
+                                                      Pokemon("Charmander", "Fire", 95, 52, 43, 65))
+            turns += battle_system.last_battle_turns
+        return (time.perf_counter() - start) / turns, turns
+
+    with contextlib.redirect_stdout(NullOutput()):
+        counting = CountingMetrics()
+        _, turns = asyncio.run(play(counting))
+        disabled, _ = asyncio.run(play(None))
+        enabled, _ = asyncio.run(play(Metrics()))
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        NULL_METRICS.stop("status", NULL_METRICS.start())
+    call_cost = (time.perf_counter() - start) / (2 * calls)
+
+    calls_per_turn = counting.calls / turns
+    return {"disabled_turn_us": disabled * 1e6, "enabled_turn_us": enabled * 1e6,
+            "calls_per_turn": calls_per_turn, "null_call_ns": call_cost * 1e9,
+            "disabled_overhead": calls_per_turn * call_cost / disabled}
+
+def test_metrics():
+    results = benchmark_metrics()
+    print(f"🐢 metrics off: {results['disabled_turn_us']:7.1f} us/turn")
+    print(f"📈 metrics on:  {results['enabled_turn_us']:7.1f} us/turn")
+    print(f"🔕 {results['calls_per_turn']:.1f} no-op calls/turn at {results['null_call_ns']:.0f} ns each: "
+          f"{results['disabled_overhead']:.3%} of a turn")
+
+if __name__ == "__main__":
+    print("🧪 Testing Battle Metrics")
+    test_metrics()
@@ -0,0 +1,140 @@
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+from status_effects import StatusType
+
+UNLIMITED_PP = 0
+
+class Move(NamedTuple):
+    id: int
+    name: str
+    move_type: str
+    power: int = 0
+    accuracy: int = 100
+    max_pp: int = UNLIMITED_PP
+
+    @property
+    def special(self) -> bool:
+        """Special moves hit with their own power; regular moves roll the attacker's attack stat."""
+        return self.power > 0
+
+class MoveEffect(NamedTuple):
+    status: Optional[StatusType]
+    turns: int
+    chance: Optional[float]
+    hits_attacker: bool = False
+
+# name, type, power, accuracy, PP
+MOVE_DATA = (
+    ("Tackle", "Normal"),
+    ("Scratch", "Normal"),
+    ("Quick Attack", "Normal"),
+    ("Body Slam", "Normal"),
+    ("Rest", "Normal"),
+    ("Thunder Shock", "Electric"),
+    ("Thunder Wave", "Electric"),
+    ("Spark", "Electric"),
+    ("Ember", "Fire"),
+    ("Flame Wheel", "Fire"),
+    ("Water Gun", "Water"),
+    ("Bubble Beam", "Water"),
+    ("Surf", "Water"),
+    ("Vine Whip", "Grass"),
+    ("Razor Leaf", "Grass"),
+    ("Solar Beam", "Grass"),
+    ("Sleep Powder", "Grass"),
+    ("Poison Sting", "Poison"),
+    ("Thunder", "Electric", 110, 100, 5),
+    ("Blizzard", "Ice", 110, 100, 5),
+    ("Fire Blast", "Fire", 110, 100, 5),
+    ("Psychic", "Psychic", 90, 100, 5),
+    ("Earthquake", "Ground", 100, 100, 5),
+    ("Hyper Beam", "Normal", 150, 100, 5),
+)
+
+class MoveRegistry:
+    """Every move in the game, numbered once per process and never changed.
+
+    Moves are looked up by name or by their integer ``id``. Per-move data
+    that used to live in dicts keyed by name is built with ``table()`` as a
+    tuple indexed by id, so battles share one copy and allocate nothing.
+    """
+
+    __slots__ = ("moves", "ids")
+
+    def __init__(self, data):
+        moves = tuple(Move(index, *row) for index, row in enumerate(data))
+        object.__setattr__(self, "moves", moves)
+        object.__setattr__(self, "ids", MappingProxyType({move.name: move.id for move in moves}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("the move registry is read-only")
+
+    def __getitem__(self, key: Union[int, str]) -> Move:
+        if isinstance(key, str):
+            return self.moves[self.ids[key]]
+        return self.moves[key]
+
+    def get(self, name: str) -> Optional[Move]:
+        move_id = self.ids.get(name)
+        return None if move_id is None else self.moves[move_id]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def __iter__(self) -> Iterator[Move]:
+        return iter(self.moves)
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def table(self, entries: Dict[str, object], default=None) -> tuple:
+        for name in entries:
+            if name not in self.ids:
+                raise KeyError(f"unknown move {name!r}")
+        return tuple(entries.get(move.name, default) for move in self.moves)
+
+MOVES = MoveRegistry(MOVE_DATA)
+SPECIAL_MOVES = MappingProxyType({move.name: move for move in MOVES if move.special})
+
+def pp_array(moves) -> array:
+    """A fresh PP counter per move slot; 0 for moves without a PP limit."""
+    return array("B", (MOVES[name].max_pp if name in MOVES.ids else UNLIMITED_PP for name in moves))
+
+def pp_slot(pokemon, move: Move) -> Optional[int]:
+    if move.max_pp == UNLIMITED_PP:
+        return None
+    try:
+        return pokemon.moves.index(move.name)
+    except (AttributeError, ValueError):
+        return None
+
+def remaining_pp(pokemon, move: Move) -> Optional[int]:
+    """PP ``pokemon`` has left for ``move``, or None if it is not limited for this Pokemon.
+
+    Only moves in the Pokemon's own move list are counted, so duck-typed
+    Pokemon without a ``pp`` array can still use any move.
+    """
+    slot = pp_slot(pokemon, move)
+    pp = getattr(pokemon, "pp", None)
+    if slot is None or pp is None:
+        return None
+    return pp[slot]
+
+def writable_pp(pokemon) -> Optional[array]:
+    """``pokemon``'s PP array for writing; copy-on-write views copy their record first."""
+    writable = getattr(pokemon, "writable_pp", None)
+    if writable is not None:
+        return writable()
+    return getattr(pokemon, "pp", None)
+
+def spend_pp(pokemon, move: Move):
+    slot = pp_slot(pokemon, move)
+    if slot is not None and remaining_pp(pokemon, move):
+        writable_pp(pokemon)[slot] -= 1
+
+def restore_pp(pokemon):
+    pp = writable_pp(pokemon)
+    if pp is not None:
+        pp[:] = pp_array(pokemon.moves)
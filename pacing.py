@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+class RealTimeClock:
+    """Pacing clock that sleeps for the requested wall-clock time."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    async def sleep(self, seconds: float):
+        self.elapsed += seconds
+        await asyncio.sleep(seconds)
+
+    def now(self) -> float:
+        return time.monotonic()
+
+class ScaledClock(RealTimeClock):
+    """Pacing clock that stretches or shrinks every pause by a fixed factor."""
+
+    def __init__(self, scale: float):
+        super().__init__()
+        if scale < 0:
+            raise ValueError("scale must be non-negative")
+        self.scale = scale
+
+    async def sleep(self, seconds: float):
+        self.elapsed += seconds
+        await asyncio.sleep(seconds * self.scale)
+
+class VirtualClock(RealTimeClock):
+    """Pacing clock that advances simulated time instantly."""
+
+    def __init__(self, start: float = 0.0):
+        super().__init__()
+        self.current = start
+
+    async def sleep(self, seconds: float):
+        self.elapsed += seconds
+        self.current += seconds
+        await asyncio.sleep(0)
+
+    def now(self) -> float:
+        return self.current
+
+REAL_TIME = RealTimeClock()
+
+def resolve_clock(clock=None):
+    return clock if clock is not None else REAL_TIME
+
+def make_clock(mode: str = "real", scale: float = 1.0):
+    if mode == "real":
+        return RealTimeClock()
+    if mode == "scaled":
+        return ScaledClock(scale)
+    if mode == "virtual":
+        return VirtualClock()
+    raise ValueError(f"Unknown clock mode: {mode}")
+
+async def benchmark_pacing(modes=None, battles: int = 1):
+    import contextlib
+    import io
+    from pokemon import Pokemon
+    from enhanced_battle import EnhancedBattleSystem
+
+    if modes is None:
+        modes = [("virtual", 1.0), ("scaled", 0.001), ("scaled", 0.01)]
+
+    results = {}
+    for mode, scale in modes:
+        clock = make_clock(mode, scale)
+        battle_system = EnhancedBattleSystem(clock=clock)
+        turns = 0
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(battles):
+                pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
+                charmander = Pokemon("Charmander", "Fire", 95, 52, 43, 65)
+                await battle_system.single_pokemon_battle(pikachu, charmander)
+                turns += battle_system.last_battle_turns
+        wall = time.perf_counter() - start
+
+        label = mode if mode != "scaled" else f"scaled x{scale}"
+        results[label] = {
+            "turns": turns,
+            "wall_seconds": wall,
+            "simulated_seconds": clock.elapsed,
+            "turns_per_second": turns / wall if wall > 0 else float("inf"),
+        }
+    return results
+
+async def test_pacing():
+    results = await benchmark_pacing(battles=20)
+
+    for label, result in results.items():
+        print(f"⏱️  {label:>12}: {result['turns_per_second']:10.1f} turns/s "
+              f"({result['turns']} turns, {result['simulated_seconds']:.1f}s simulated "
+              f"in {result['wall_seconds']:.3f}s)")
+
+if __name__ == "__main__":
+    print("🧪 Benchmarking Pacing Clocks")
+    asyncio.run(test_pacing())
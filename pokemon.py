@@ -1,28 +1,65 @@
 import asyncio
 
+from pacing import resolve_clock
+from moves import MOVES, pp_array
+from status_effects import StatusStore
+from type_chart import TYPE_CHART, scale_damage
+
+TYPE_MOVES = {
+    "Electric": ("Thunder Shock", "Quick Attack", "Thunder Wave", "Spark"),
+    "Fire": ("Ember", "Scratch", "Fire Blast", "Flame Wheel"),
+    "Water": ("Water Gun", "Tackle", "Bubble Beam", "Surf"),
+    "Grass": ("Vine Whip", "Tackle", "Razor Leaf", "Solar Beam"),
+    "Normal": ("Tackle", "Scratch", "Quick Attack", "Body Slam"),
+}
+DEFAULT_TYPE_MOVES = ("Tackle", "Scratch", "Quick Attack", "Rest")
+
 class Pokemon:
-    """Individual Pokemon with stats and battle moves."""
+    """Individual Pokemon with stats and battle moves.
+    
+    Move lists are immutable tuples shared by every Pokemon of a type, and the
+    ``StatusStore`` behind ``status_effects`` is only allocated the first time
+    it is used. Assigning a list of ``StatusEffect`` converts it to a store.
+    PP is a byte per move slot, also allocated on first use. ``typing`` is the
+    type chart's id for ``pokemon_type``, interned once here.
+    """
+    
+    __slots__ = ("name", "pokemon_type", "typing", "max_hp", "current_hp", "attack", "defense", "speed",
+                 "moves", "_status_effects", "_pp")
     
     def __init__(self, name, pokemon_type, hp, attack, defense, speed):
         self.name = name
         self.pokemon_type = pokemon_type
+        self.typing = TYPE_CHART.typing(pokemon_type)
         self.max_hp = hp
         self.current_hp = hp
         self.attack = attack
         self.defense = defense
         self.speed = speed
-        self.status_effects = []
-        self.moves = self.get_type_moves(pokemon_type)
+        self._status_effects = None
+        self._pp = None
+        self.moves = TYPE_MOVES.get(pokemon_type, DEFAULT_TYPE_MOVES)
+    
+    @property
+    def status_effects(self):
+        effects = self._status_effects
+        if effects is None:
+            effects = self._status_effects = StatusStore()
+        return effects
+    
+    @status_effects.setter
+    def status_effects(self, effects):
+        self._status_effects = effects if isinstance(effects, StatusStore) else StatusStore(effects)
+    
+    @property
+    def pp(self):
+        pp = self._pp
+        if pp is None:
+            pp = self._pp = pp_array(self.moves)
+        return pp
     
     def get_type_moves(self, ptype):
-        type_moves = {
-            "Electric": ["Thunder Shock", "Quick Attack", "Thunder Wave", "Spark"],
-            "Fire": ["Ember", "Scratch", "Fire Blast", "Flame Wheel"],
-            "Water": ["Water Gun", "Tackle", "Bubble Beam", "Surf"],
-            "Grass": ["Vine Whip", "Tackle", "Razor Leaf", "Solar Beam"],
-            "Normal": ["Tackle", "Scratch", "Quick Attack", "Body Slam"],
-        }
-        return type_moves.get(ptype, ["Tackle", "Scratch", "Quick Attack", "Rest"])
+        return TYPE_MOVES.get(ptype, DEFAULT_TYPE_MOVES)
     
     def is_alive(self):
         return self.current_hp > 0
@@ -31,50 +68,37 @@ class Pokemon:
         self.current_hp = max(0, self.current_hp - damage)
     
     def calculate_damage(self, move_name, target):
-        base_damage = self.attack
-        return max(10, base_damage - (target.defense // 4))
+        base_damage = max(10, self.attack - (target.defense // 4))
+        return scale_damage(base_damage, TYPE_CHART.move_multiplier(self, target, MOVES.ids.get(move_name)))
     
-    async def use_move_async(self, move_name, target):
+    async def use_move_async(self, move_name, target, clock=None):
+        clock = resolve_clock(clock)
         print(f"{self.name} is preparing {move_name}...")
-        await asyncio.sleep(0.5)
+        await clock.sleep(0.5)
         
         damage = self.calculate_damage(move_name, target)
         
         print(f"💫 {move_name} hits {target.name}!")
-        await asyncio.sleep(0.3)
+        await clock.sleep(0.3)
         
         target.take_damage(damage)
         return damage
 
-    async def status_effect_tick(self):
-        effects_to_remove = []
+    async def status_effect_tick(self, clock=None):
+        from battle_rules import EventType, tick_status_effects
+        from effect_rules import RULES
         
-        for effect in self.status_effects:
-            await asyncio.sleep(0.2)
-            
-            if hasattr(effect, 'effect_type'):
-                effect_name = effect.effect_type.value
-            else:
-                continue
-                
-            if effect_name == "poison":
-                damage = self.max_hp // 16
-                print(f"💜 {self.name} is hurt by poison! (-{damage} HP)")
-                self.current_hp = max(0, self.current_hp - damage)
-                
-            elif effect_name == "burn":
-                damage = self.max_hp // 16
-                print(f"🔥 {self.name} is hurt by burn! (-{damage} HP)")
-                self.current_hp = max(0, self.current_hp - damage)
-            
-            effect.turns_remaining -= 1
-            if effect.turns_remaining <= 0:
-                effects_to_remove.append(effect)
+        clock = resolve_clock(clock)
+        events = []
+        tick_status_effects(self, 0, events)
         
-        for effect in effects_to_remove:
-            self.status_effects.remove(effect)
-            print(f"✨ {self.name} recovers from {effect.effect_type.value}!")
-            await asyncio.sleep(0.3)
+        for event in events:
+            if event.kind == EventType.STATUS_DAMAGE:
+                await clock.sleep(0.2)
+                print(RULES.by_value[event.detail].hurt.format(name=self.name, damage=event.value))
+            elif event.kind == EventType.STATUS_EXPIRED:
+                print(RULES.by_value[event.detail].recovers.format(name=self.name))
+                await clock.sleep(0.3)
 
 if __name__ == "__main__":
     pikachu = Pokemon("Pikachu", "Electric", 100, 55, 40, 90)
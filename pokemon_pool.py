@@ -0,0 +1,230 @@
+import time
+import tracemalloc
+from array import array
+from typing import Iterable, Iterator
+
+from moves import pp_array
+from pokemon import DEFAULT_TYPE_MOVES, TYPE_MOVES, Pokemon
+from status_effects import StatusStore
+from type_chart import TYPE_CHART
+
+class PokemonPool:
+    """Stores many Pokemon as parallel typed arrays instead of objects.
+
+    Names and types are interned into small tables, stats live in unsigned
+    16-bit arrays, and status stores and PP counters are kept in sparse dicts
+    for the few Pokemon that have used them. ``pool[i]`` hands out a ``PokemonView`` that reads
+    and writes the arrays, so the rules engine can battle pooled Pokemon
+    directly. Views are created on demand; keep the one you were given when
+    identity matters.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.name_ids = {}
+        self.types = []
+        self.type_ids = {}
+        self.typings = []
+        self.name_id = array("H")
+        self.type_id = array("B")
+        self.max_hp = array("H")
+        self.current_hp = array("H")
+        self.attack = array("H")
+        self.defense = array("H")
+        self.speed = array("H")
+        self.status = {}
+        self.pp = {}
+
+    def intern(self, value: str, table: list, ids: dict) -> int:
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(table)
+            table.append(value)
+        return index
+
+    def add(self, name, pokemon_type, hp, attack, defense, speed) -> "PokemonView":
+        index = len(self.max_hp)
+        self.name_id.append(self.intern(name, self.names, self.name_ids))
+        if pokemon_type not in self.type_ids:
+            # The type chart's id for each interned type, so views don't look it up per hit.
+            self.typings.append(TYPE_CHART.typing(pokemon_type))
+        self.type_id.append(self.intern(pokemon_type, self.types, self.type_ids))
+        self.max_hp.append(hp)
+        self.current_hp.append(hp)
+        self.attack.append(attack)
+        self.defense.append(defense)
+        self.speed.append(speed)
+        return PokemonView(self, index)
+
+    def extend(self, species: Iterable[tuple]):
+        for data in species:
+            self.add(*data)
+
+    def heal_all(self):
+        self.current_hp[:] = self.max_hp
+        self.status.clear()
+        self.pp.clear()
+
+    def __len__(self) -> int:
+        return len(self.max_hp)
+
+    def __getitem__(self, index: int) -> "PokemonView":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pokemon index out of range")
+        return PokemonView(self, index)
+
+    def __iter__(self) -> Iterator["PokemonView"]:
+        return (PokemonView(self, index) for index in range(len(self)))
+
+    def nbytes(self) -> int:
+        arrays = (self.name_id, self.type_id, self.max_hp, self.current_hp,
+                  self.attack, self.defense, self.speed)
+        return sum(column.itemsize * len(column) for column in arrays)
+
+class PokemonView:
+    """One Pokemon stored in a PokemonPool; duck-types the Pokemon class."""
+
+    __slots__ = ("pool", "index")
+
+    def __init__(self, pool: PokemonPool, index: int):
+        self.pool = pool
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self.pool.names[self.pool.name_id[self.index]]
+
+    @property
+    def pokemon_type(self) -> str:
+        return self.pool.types[self.pool.type_id[self.index]]
+
+    @property
+    def typing(self) -> int:
+        return self.pool.typings[self.pool.type_id[self.index]]
+
+    @property
+    def moves(self) -> tuple:
+        return TYPE_MOVES.get(self.pokemon_type, DEFAULT_TYPE_MOVES)
+
+    @property
+    def max_hp(self) -> int:
+        return self.pool.max_hp[self.index]
+
+    @property
+    def current_hp(self) -> int:
+        return self.pool.current_hp[self.index]
+
+    @current_hp.setter
+    def current_hp(self, value: int):
+        self.pool.current_hp[self.index] = value
+
+    @property
+    def attack(self) -> int:
+        return self.pool.attack[self.index]
+
+    @property
+    def defense(self) -> int:
+        return self.pool.defense[self.index]
+
+    @property
+    def speed(self) -> int:
+        return self.pool.speed[self.index]
+
+    @property
+    def status_effects(self) -> StatusStore:
+        effects = self.pool.status.get(self.index)
+        if effects is None:
+            effects = self.pool.status[self.index] = StatusStore()
+        return effects
+
+    @status_effects.setter
+    def status_effects(self, effects):
+        self.pool.status[self.index] = effects if isinstance(effects, StatusStore) else StatusStore(effects)
+
+    @property
+    def pp(self):
+        pp = self.pool.pp.get(self.index)
+        if pp is None:
+            pp = self.pool.pp[self.index] = pp_array(self.moves)
+        return pp
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PokemonView) and other.pool is self.pool and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.pool), self.index))
+
+    is_alive = Pokemon.is_alive
+    take_damage = Pokemon.take_damage
+    calculate_damage = Pokemon.calculate_damage
+    use_move_async = Pokemon.use_move_async
+    status_effect_tick = Pokemon.status_effect_tick
+
+class LegacyPokemon:
+    """The pre-__slots__ Pokemon layout, kept only as a benchmark baseline."""
+
+    def __init__(self, name, pokemon_type, hp, attack, defense, speed):
+        self.name = name
+        self.pokemon_type = pokemon_type
+        self.max_hp = hp
+        self.current_hp = hp
+        self.attack = attack
+        self.defense = defense
+        self.speed = speed
+        self.status_effects = []
+        self.moves = self.get_type_moves(pokemon_type)
+
+    def get_type_moves(self, ptype):
+        type_moves = {
+            "Electric": ["Thunder Shock", "Quick Attack", "Thunder Wave", "Spark"],
+            "Fire": ["Ember", "Scratch", "Fire Blast", "Flame Wheel"],
+            "Water": ["Water Gun", "Tackle", "Bubble Beam", "Surf"],
+            "Grass": ["Vine Whip", "Tackle", "Razor Leaf", "Solar Beam"],
+            "Normal": ["Tackle", "Scratch", "Quick Attack", "Body Slam"],
+        }
+        return type_moves.get(ptype, ["Tackle", "Scratch", "Quick Attack", "Rest"])
+
+BENCHMARK_SPECIES = (
+    ("Pikachu", "Electric", 100, 55, 40, 90),
+    ("Charmander", "Fire", 95, 52, 43, 65),
+    ("Squirtle", "Water", 98, 48, 55, 43),
+    ("Rattata", "Normal", 80, 45, 35, 72),
+)
+
+def measure(build, count: int) -> dict:
+    species = [BENCHMARK_SPECIES[index % len(BENCHMARK_SPECIES)] for index in range(count)]
+
+    start = time.perf_counter()
+    build(species)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    kept = build(species)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    return {"bytes_per_pokemon": current / count, "constructions_per_second": count / elapsed}
+
+def pooled(species):
+    pool = PokemonPool()
+    pool.extend(species)
+    return pool
+
+def benchmark_pokemon(count: int = 200_000) -> dict:
+    return {
+        "legacy": measure(lambda species: [LegacyPokemon(*data) for data in species], count),
+        "slots": measure(lambda species: [Pokemon(*data) for data in species], count),
+        "pool": measure(pooled, count),
+    }
+
+def test_pokemon_pool():
+    for label, result in benchmark_pokemon().items():
+        print(f"🧬 {label:>6}: {result['bytes_per_pokemon']:7.1f} bytes/Pokemon, "
+              f"{result['constructions_per_second'] / 1e6:5.2f}M constructions/s")
+
+if __name__ == "__main__":
+    print("🧪 Testing Pokemon Memory Layouts")
+    test_pokemon_pool()
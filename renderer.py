@@ -0,0 +1,276 @@
+import asyncio
+import contextlib
+import contextvars
+import io
+import shutil
+import sys
+import time
+from typing import Callable, List, Optional
+
+CLEAR_SCREEN = "\033[2J\033[H"
+
+current_renderer = contextvars.ContextVar("current_renderer", default=None)
+
+def animations_enabled(stream=None) -> bool:
+    stream = stream if stream is not None else sys.stdout
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+class RoutedStdout(io.TextIOBase):
+    """Stand-in for sys.stdout that sends print() to the renderer of the running task."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.users = 0
+
+    @property
+    def encoding(self):
+        return getattr(self.fallback, "encoding", "utf-8")
+
+    def write(self, text: str) -> int:
+        renderer = current_renderer.get()
+        if renderer is None:
+            return self.fallback.write(text)
+        return renderer.write(text)
+
+    def flush(self):
+        renderer = current_renderer.get()
+        if renderer is None:
+            self.fallback.flush()
+        else:
+            renderer.flush()
+
+    def isatty(self) -> bool:
+        renderer = current_renderer.get()
+        if renderer is None:
+            return animations_enabled(self.fallback)
+        return renderer.isatty()
+
+def install_routed_stdout() -> Callable[[], None]:
+    """Route ``sys.stdout`` through a ``RoutedStdout`` and return a function that undoes it.
+
+    Installs nest: the stream it replaced comes back once every caller has
+    restored, unless something else has replaced ``sys.stdout`` since.
+    """
+    if not isinstance(sys.stdout, RoutedStdout):
+        sys.stdout = RoutedStdout(sys.stdout)
+    routed = sys.stdout
+    routed.users += 1
+    restored = False
+
+    def restore():
+        nonlocal restored
+        if restored:
+            return
+        restored = True
+        routed.users -= 1
+        if not routed.users and sys.stdout is routed:
+            sys.stdout = routed.fallback
+    return restore
+
+class FrameRenderer:
+    """Coalesces a game's terminal output into frames written by one task.
+
+    While attached (``async with renderer:``), every ``print()`` made by the
+    attaching task and its children is buffered instead of written. The render
+    task writes the buffer as one frame at most ``refresh_rate`` times a second,
+    or straight away when someone flushes (a prompt waiting for input). Frames
+    for a terminal are written from a worker thread, so the event loop never
+    blocks on it. ``draw_panel`` redraws only the lines of a fixed panel that
+    changed since the previous frame. ``sys.stdout`` is put back when the
+    last attached renderer closes.
+    """
+
+    def __init__(self, stream=None, refresh_rate: float = 30.0, max_pending: int = 64 * 1024,
+                 animate: Optional[bool] = None):
+        self.stream = stream
+        self.frame_interval = 1.0 / refresh_rate if refresh_rate else 0.0
+        self.max_pending = max_pending
+        self.animate_setting = animate
+        self.pending = []
+        self.pending_size = 0
+        self.panel = None
+        self.rows_since_panel = 0
+        self.frames = 0
+        self.threaded = False
+        self.closing = False
+        self.task = None
+        self.token = None
+        self.restore_stdout = None
+        self.dirty = asyncio.Event()
+        self.present_requested = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.drained.set()
+
+    @property
+    def active(self) -> bool:
+        return self.task is not None
+
+    @property
+    def output(self):
+        return self.stream if self.stream is not None else sys.stdout
+
+    @property
+    def animate(self) -> bool:
+        if self.animate_setting is not None:
+            return self.animate_setting
+        return self.isatty()
+
+    def isatty(self) -> bool:
+        return animations_enabled(self.output)
+
+    async def __aenter__(self):
+        self.attach()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def attach(self):
+        if self.stream is None:
+            routed = sys.stdout
+            if isinstance(routed, RoutedStdout):
+                routed = current_renderer.get() or routed.fallback
+            self.stream = routed
+        self.restore_stdout = install_routed_stdout()
+        self.threaded = self.animate and hasattr(self.stream, "fileno")
+        self.closing = False
+        self.token = current_renderer.set(self)
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def write(self, text: str) -> int:
+        self.rows_since_panel += text.count("\n")
+        if self.task is None:
+            return self.output.write(text)
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size > self.max_pending:
+            self.drained.clear()
+        self.dirty.set()
+        return len(text)
+
+    def flush(self):
+        if self.task is None:
+            self.output.flush()
+        else:
+            self.present_requested.set()
+
+    async def drain(self):
+        while self.task is not None and not self.drained.is_set():
+            self.present_requested.set()
+            await self.drained.wait()
+
+    def write_frame(self, frame: str):
+        self.stream.write(frame)
+        self.stream.flush()
+
+    async def run(self):
+        while True:
+            await self.dirty.wait()
+            self.dirty.clear()
+            self.present_requested.clear()
+
+            frame = "".join(self.pending)
+            self.pending.clear()
+            self.pending_size = 0
+            if frame:
+                if self.threaded:
+                    await asyncio.to_thread(self.write_frame, frame)
+                else:
+                    self.write_frame(frame)
+                self.frames += 1
+            if self.pending_size <= self.max_pending:
+                self.drained.set()
+
+            if self.closing:
+                if not self.pending:
+                    return
+                continue
+            if self.frame_interval:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.present_requested.wait(), self.frame_interval)
+
+    async def close(self):
+        if self.task is None:
+            return
+        self.closing = True
+        self.dirty.set()
+        self.present_requested.set()
+        try:
+            await self.task
+        finally:
+            self.task = None
+            self.drained.set()
+            current_renderer.reset(self.token)
+            self.restore_stdout()
+            self.restore_stdout = None
+
+    def invalidate_panel(self):
+        self.panel = None
+
+    def clear_screen(self):
+        if self.animate:
+            self.write(CLEAR_SCREEN)
+        self.invalidate_panel()
+
+    def echoed_line(self):
+        self.rows_since_panel += 1
+
+    def draw_panel(self, lines: List[str]):
+        if not self.animate:
+            self.write("\n".join(lines) + "\n")
+            return
+
+        previous = self.panel
+        rows = shutil.get_terminal_size().lines
+        if previous is None or len(previous) + self.rows_since_panel >= rows:
+            output = CLEAR_SCREEN + "".join(line + "\n" for line in lines)
+        else:
+            changed = [f"\033[{row};1H\033[2K{line}" for row, line in enumerate(lines, 1)
+                       if row > len(previous) or previous[row - 1] != line]
+            output = "".join(changed) + f"\033[{len(lines) + 1};1H\033[J"
+        self.write(output)
+        self.panel = list(lines)
+        self.rows_since_panel = 0
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+async def benchmark_rendering(messages: int = 100, refresh_rate: float = 30.0):
+    from async_ui import AsyncUI
+    from pacing import ScaledClock
+
+    results = {}
+    for label, attached in (("per-character", False), ("framed", True)):
+        stream = CountingStream()
+        ui = AsyncUI(ScaledClock(0.01), output=stream, refresh_rate=refresh_rate, animate=True)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(stream):
+            async with contextlib.AsyncExitStack() as stack:
+                if attached:
+                    await stack.enter_async_context(ui.renderer)
+                for index in range(messages):
+                    await ui.type_message(f"⚡ Pikachu uses Thunder Shock! ({index})")
+        results[label] = {
+            "writes_per_message": stream.writes / messages,
+            "seconds": time.perf_counter() - start,
+        }
+    return results
+
+def test_renderer():
+    results = asyncio.run(benchmark_rendering())
+    for label, result in results.items():
+        print(f"🖥️  {label:>13}: {result['writes_per_message']:6.1f} writes/message "
+              f"in {result['seconds']:.2f}s")
+
+if __name__ == "__main__":
+    print("🧪 Testing Frame Renderer")
+    test_renderer()
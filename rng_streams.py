@@ -0,0 +1,222 @@
+import hashlib
+import os
+import random
+import time
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+STREAM_BITS = 32
+MAX_STREAMS = 1 << 32
+DRAWS_PER_STREAM = 1 << STREAM_BITS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def mix64(z: int) -> int:
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+FLOAT_SCALE = 1.0 / (1 << 53)
+# Blocks start small so a short battle doesn't pay for draws it never makes,
+# then double up to the stream's ``prefetch``.
+FIRST_BLOCK = 64
+DEFAULT_PREFETCH = 1024
+
+if np is not None:
+    NP_GAMMA = np.uint64(GOLDEN_GAMMA)
+    NP_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+    NP_MIX2 = np.uint64(0x94D049BB133111EB)
+    NP_SHIFTS = tuple(np.uint64(shift) for shift in (30, 27, 31, 11))
+
+def mix64_block(key: int, first_counter: int, count: int):
+    if np is None:
+        values = [mix64((key + counter * GOLDEN_GAMMA) & MASK64)
+                  for counter in range(first_counter, first_counter + count)]
+        return values, [(value >> 11) * FLOAT_SCALE for value in values]
+
+    shift30, shift27, shift31, shift11 = NP_SHIFTS
+    z = np.arange(first_counter, first_counter + count, dtype=np.uint64)
+    z *= NP_GAMMA
+    z += np.uint64(key)
+    z ^= z >> shift30
+    z *= NP_MIX1
+    z ^= z >> shift27
+    z *= NP_MIX2
+    z ^= z >> shift31
+    floats = (z >> shift11).astype(np.float64)
+    floats *= FLOAT_SCALE
+    return z.tolist(), floats.tolist()
+
+class BattleRNG(random.Random):
+    """Counter-based random stream owned by one battle.
+
+    Output ``n`` of the stream is ``mix64(key + (battle_id << 32 | n) * gamma)``,
+    so every (seed, battle_id) pair owns a disjoint block of 2**32 counters and
+    can be reproduced or jumped ahead in O(1). Values are drawn in blocks
+    that grow from ``FIRST_BLOCK`` up to ``prefetch`` (vectorised when NumPy
+    is installed) to cut the per-call overhead; ``prefetch=0`` mixes one
+    value per call. The sequence is identical either way. Even prefetched, a
+    draw costs a Python call, so it is a few times slower than
+    ``random.Random``'s C generator.
+    """
+
+    def __init__(self, seed=None, battle_id: int = 0, prefetch: int = DEFAULT_PREFETCH):
+        if not 0 <= battle_id < MAX_STREAMS:
+            raise ValueError(f"battle_id must be in [0, {MAX_STREAMS})")
+        self.battle_id = battle_id
+        self.prefetch = prefetch
+        super().__init__(seed)
+
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        self.stream_seed = a
+        if not isinstance(a, int):
+            a = int.from_bytes(hashlib.blake2b(str(a).encode(), digest_size=8).digest(), "little")
+        self._key = mix64(a & MASK64)
+        self._counter = self.battle_id << STREAM_BITS
+        self._clear_block()
+        self.gauss_next = None
+
+    def _clear_block(self):
+        self._block = []
+        self._floats = []
+        self._block_length = 0
+        self._block_index = 0
+        self._next_block = min(FIRST_BLOCK, self.prefetch)
+
+    def _refill(self):
+        size = self._next_block
+        self._block, self._floats = mix64_block(self._key, self._counter, size)
+        self._block_length = size
+        self._block_index = 0
+        self._counter += size
+        self._next_block = min(size * 2, self.prefetch)
+
+    def next64(self) -> int:
+        if self.prefetch:
+            if self._block_index >= self._block_length:
+                self._refill()
+            value = self._block[self._block_index]
+            self._block_index += 1
+            return value
+
+        value = mix64((self._key + self._counter * GOLDEN_GAMMA) & MASK64)
+        self._counter += 1
+        return value
+
+    @property
+    def draws(self) -> int:
+        consumed = self._counter - (self.battle_id << STREAM_BITS)
+        return consumed - (self._block_length - self._block_index)
+
+    def random(self) -> float:
+        index = self._block_index
+        if index < self._block_length:
+            self._block_index = index + 1
+            return self._floats[index]
+        if self.prefetch:
+            self._refill()
+            self._block_index = 1
+            return self._floats[0]
+        return (self.next64() >> 11) * FLOAT_SCALE
+
+    def _randbelow(self, n: int) -> int:
+        # Draws exactly what random.Random's getrandbits-based version would,
+        # without its per-draw method calls; choice and randint land here.
+        k = n.bit_length()
+        if k > 64:
+            r = self.getrandbits(k)
+            while r >= n:
+                r = self.getrandbits(k)
+            return r
+        shift = 64 - k
+        while True:
+            index = self._block_index
+            if index < self._block_length:
+                self._block_index = index + 1
+                r = self._block[index] >> shift
+            else:
+                r = self.next64() >> shift
+            if r < n:
+                return r
+
+    def choice(self, seq):
+        if not len(seq):
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self._randbelow(len(seq))]
+
+    def randint(self, a: int, b: int) -> int:
+        if b < a:
+            raise ValueError(f"empty range for randint({a}, {b})")
+        return a + self._randbelow(b - a + 1)
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 64:
+            return self.next64() >> (64 - k)
+        bits, filled = 0, 0
+        while filled < k:
+            bits |= self.next64() << filled
+            filled += 64
+        return bits & ((1 << k) - 1)
+
+    def jump(self, draws: int):
+        position = self.draws + draws
+        if not 0 <= position < DRAWS_PER_STREAM:
+            raise ValueError("jump would leave this battle's stream")
+        self._counter = (self.battle_id << STREAM_BITS) + position
+        self._clear_block()
+
+    def getstate(self):
+        return (self.stream_seed, self.battle_id, self.draws, self.prefetch)
+
+    def setstate(self, state):
+        seed, battle_id, draws, prefetch = state
+        self.battle_id = battle_id
+        self.prefetch = prefetch
+        self.seed(seed)
+        self.jump(draws)
+
+class RNGStreamFactory:
+    """Hands out one reproducible BattleRNG per battle for a given seed."""
+
+    def __init__(self, seed=None, prefetch: int = DEFAULT_PREFETCH):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self.seed = seed
+        self.prefetch = prefetch
+        self.next_battle_id = 0
+
+    def stream(self, battle_id: int) -> BattleRNG:
+        return BattleRNG(self.seed, battle_id, self.prefetch)
+
+    def next_stream(self) -> BattleRNG:
+        rng = self.stream(self.next_battle_id)
+        self.next_battle_id += 1
+        return rng
+
+def resolve_rng(rng=None):
+    return rng if rng is not None else BattleRNG()
+
+def test_rng_streams():
+    draws = 200_000
+
+    for label, rng in (("Mersenne Twister", random.Random(1)),
+                       ("BattleRNG prefetch=0", BattleRNG(1, 0, prefetch=0)),
+                       ("BattleRNG", BattleRNG(1, 0))):
+        start = time.perf_counter()
+        for _ in range(draws):
+            rng.random()
+        elapsed = time.perf_counter() - start
+        print(f"🎲 {label:>24}: {draws / elapsed / 1e6:6.2f}M draws/s")
+
+    original, replay = BattleRNG(42, 7, prefetch=0), BattleRNG(42, 7)
+    matches = [original.randint(1, 100) for _ in range(100)] == [replay.randint(1, 100) for _ in range(100)]
+    print(f"🔁 Replay matches: {matches}")
+
+if __name__ == "__main__":
+    print("🧪 Testing Battle RNG Streams")
+    test_rng_streams()
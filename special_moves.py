@@ -1,133 +1,84 @@
 import asyncio
-import random
-from typing import Dict, Callable, Any
 
-class SpecialMove:
-    def __init__(self, name: str, power: int, move_type: str, effect_function: Callable):
-        self.name = name
-        self.power = power
-        self.move_type = move_type
-        self.effect_function = effect_function
-        self.pp = 5
-        self.accuracy = 100
+from effect_rules import RULES
+from moves import SPECIAL_MOVES, Move, remaining_pp
+from pacing import resolve_clock
+from rng_streams import resolve_rng
+from type_chart import TYPE_CHART, scale_damage
+
+# Both tables are indexed by move id and compiled from effect_rules.json.
+CINEMATICS = RULES.cinematics
+
+# (lines, pause) shown when a move's side effect fires; {attacker}/{defender} are names.
+SIDE_EFFECT_LINES = RULES.side_effect_lines
 
 class SpecialMoveSystem:
-    """Handles powerful special moves and their cinematic effects."""
+    """Handles powerful special moves and their cinematic effects.
     
-    def __init__(self):
-        self.moves_database = self.create_moves_database()
+    Moves come from the process-wide ``moves.MOVES`` registry and their
+    cinematics and side-effect lines from tables indexed by move id, so a
+    system only holds its clock and RNG. PP is counted on each Pokemon.
+    """
     
-    def create_moves_database(self) -> Dict[str, SpecialMove]:
-        return {
-            "Thunder": SpecialMove("Thunder", 110, "Electric", self.thunder_effect),
-            "Blizzard": SpecialMove("Blizzard", 110, "Ice", self.blizzard_effect),
-            "Fire Blast": SpecialMove("Fire Blast", 110, "Fire", self.fire_blast_effect),
-            "Psychic": SpecialMove("Psychic", 90, "Psychic", self.psychic_effect),
-            "Earthquake": SpecialMove("Earthquake", 100, "Ground", self.earthquake_effect),
-            "Hyper Beam": SpecialMove("Hyper Beam", 150, "Normal", self.hyper_beam_effect),
-        }
+    moves_database = SPECIAL_MOVES
     
-    async def use_special_move(self, attacker, defender, move_name: str) -> bool:
-        if move_name not in self.moves_database:
-            return False
+    def __init__(self, clock=None, rng=None):
+        self.clock = resolve_clock(clock)
+        self.rng = resolve_rng(rng)
+        self.last_events = []
+    
+    async def use_special_move(self, attacker, defender, move_name: str, defender_side: int = 1) -> bool:
+        from battle_rules import EventType, resolve_special_move
         
-        move = self.moves_database[move_name]
+        move = SPECIAL_MOVES.get(move_name)
+        if move is None:
+            return False
         
-        if move.pp <= 0:
+        if remaining_pp(attacker, move) == 0:
             print(f"❌ {move_name} has no PP left!")
             return False
         
-        if random.randint(1, 100) > move.accuracy:
-            print(f"💨 {attacker.name}'s {move_name} missed!")
-            await asyncio.sleep(1)
-            return True
-        
-        await self.move_cinematic(move_name)
+        events = []
+        resolve_special_move(attacker, defender, defender_side, move, events, self.rng)
+        self.last_events = events
         
-        damage = self.calculate_special_damage(attacker, move)
-        defender.current_hp = max(0, defender.current_hp - damage)
-        
-        print(f"💥 {defender.name} takes {damage} damage!")
-        await asyncio.sleep(0.8)
-        
-        await move.effect_function(attacker, defender)
-        
-        move.pp -= 1
+        for event in events:
+            if event.kind == EventType.MISS:
+                print(f"💨 {attacker.name}'s {move_name} missed!")
+                await self.clock.sleep(1)
+            elif event.kind == EventType.MOVE:
+                await self.move_cinematic(move)
+            elif event.kind == EventType.DAMAGE:
+                print(f"💥 {defender.name} takes {event.value} damage!")
+                await self.clock.sleep(0.8)
+            elif event.kind == EventType.SIDE_EFFECT:
+                await self.side_effect(move, attacker, defender)
         
         return True
     
-    async def move_cinematic(self, move_name: str):
-        cinematics = {
-            "Thunder": ["⚡⚡⚡", "🌩️ THUNDER! 🌩️", "⚡⚡⚡"],
-            "Blizzard": ["❄️❄️❄️", "🌨️ BLIZZARD! 🌨️", "❄️❄️❄️"],
-            "Fire Blast": ["🔥🔥🔥", "💥 FIRE BLAST! 💥", "🔥🔥🔥"],
-            "Psychic": ["🔮🔮🔮", "🧠 PSYCHIC! 🧠", "🔮🔮🔮"],
-            "Earthquake": ["🌍🌍🌍", "⛰️ EARTHQUAKE! ⛰️", "🌍🌍🌍"],
-            "Hyper Beam": ["✨✨✨", "💫 HYPER BEAM! 💫", "✨✨✨"],
-        }
-        
-        frames = cinematics.get(move_name, ["💥", f"{move_name}!", "💥"])
+    async def move_cinematic(self, move: Move):
+        frames = CINEMATICS[move.id] or ("💥", f"{move.name}!", "💥")
         
         for frame in frames:
             print(frame)
-            await asyncio.sleep(0.6)
+            await self.clock.sleep(0.6)
     
-    def calculate_special_damage(self, attacker, move: SpecialMove) -> int:
-        base_attack = getattr(attacker, 'special_attack', getattr(attacker, 'attack', 50))
-        
-        damage = (move.power * base_attack) // 50
-        
-        damage = random.randint(int(damage * 0.85), int(damage * 1.15))
-        
-        return max(1, damage)
-    
-    async def thunder_effect(self, attacker, defender):
-        if random.random() < 0.3:
-            print("⚡ Static electricity fills the air!")
-            from status_effects import StatusType, StatusEffect
-            effect = StatusEffect(StatusType.PARALYSIS, 3)
-            defender.status_effects.append(effect)
-            print(f"🌟 {defender.name} was paralyzed!")
-            await asyncio.sleep(0.5)
-    
-    async def blizzard_effect(self, attacker, defender):
-        if random.random() < 0.1:
-            print("🧊 The cold is overwhelming!")
-            from status_effects import StatusType, StatusEffect
-            effect = StatusEffect(StatusType.FREEZE, 2)
-            defender.status_effects.append(effect)
-            print(f"🌟 {defender.name} was frozen!")
-            await asyncio.sleep(0.5)
+    async def side_effect(self, move: Move, attacker, defender):
+        effect = SIDE_EFFECT_LINES[move.id]
+        if effect is None:
+            return
+        lines, pause = effect
+        for line in lines:
+            print(line.format(attacker=attacker.name, defender=defender.name))
+        await self.clock.sleep(pause)
     
-    async def fire_blast_effect(self, attacker, defender):
-        if random.random() < 0.3:
-            print("🔥 Intense flames linger!")
-            from status_effects import StatusType, StatusEffect
-            effect = StatusEffect(StatusType.BURN, 3)
-            defender.status_effects.append(effect)
-            print(f"🌟 {defender.name} was burned!")
-            await asyncio.sleep(0.5)
-    
-    async def psychic_effect(self, attacker, defender):
-        if random.random() < 0.1:
-            print("🌀 Mind-bending energy swirls around!")
-            from status_effects import StatusType, StatusEffect
-            effect = StatusEffect(StatusType.CONFUSION, 2)
-            defender.status_effects.append(effect)
-            print(f"🌟 {defender.name} was confused!")
-            await asyncio.sleep(0.5)
-    
-    async def earthquake_effect(self, attacker, defender):
-        print("🌍 The ground shakes violently!")
-        await asyncio.sleep(0.8)
-    
-    async def hyper_beam_effect(self, attacker, defender):
-        print("💫 Incredible power was unleashed!")
-        print(f"⚡ {attacker.name} must recharge!")
-        from status_effects import StatusType, StatusEffect
-        effect = StatusEffect(StatusType.SLEEP, 1)
-        attacker.status_effects.append(effect)
-        await asyncio.sleep(1)
+    def calculate_special_damage(self, attacker, move: Move, defender=None) -> int:
+        """Damage ``move`` rolls, with STAB and, given a ``defender``, its type matchup."""
+        from battle_rules import special_damage
+        
+        base_attack = getattr(attacker, 'special_attack', getattr(attacker, 'attack', 50))
+        return scale_damage(special_damage(base_attack, move.power, self.rng),
+                            TYPE_CHART.move_multiplier(attacker, defender, move.id))
 
 async def test_special_moves():
     from pokemon import Pokemon
@@ -0,0 +1,319 @@
+import bisect
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from typing import Iterator, Optional, Tuple, Union
+
+from battle_replay import COUNT, pack_string, unpack_string
+from pokemon import Pokemon
+
+SPECIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "species.json")
+
+MAGIC = b"PKSC"
+VERSION = 1
+# magic, version, flags, source mtime (ns), source size, species count
+CACHE_HEADER = struct.Struct("<4sHHqQI")
+
+STATS = ("hp", "attack", "defense", "speed")
+
+class SpeciesCatalog:
+    """Every species as parallel typed columns with prebuilt secondary indexes.
+
+    Species are numbered in file order. Stats live in unsigned 16-bit arrays
+    and types are interned like ``PokemonPool`` does. ``type_order`` lists
+    species ids grouped by type with ``type_offsets`` marking where each type
+    starts, and ``stat_order[stat]`` lists ids sorted by that stat with the
+    matching values in ``stat_values[stat]``, so ``of_type`` is a slice and
+    ``with_stat`` is two bisects. Query results are read-only memoryviews of
+    species ids; ``catalog[i]`` gives the ``Pokemon(*row)`` tuple.
+    """
+
+    __slots__ = ("names", "types", "name_ids", "type_ids", "type_id", "columns",
+                 "type_order", "type_offsets", "stat_order", "stat_values", "groups", "teams")
+
+    def __init__(self, names, types, type_id, columns, type_order, type_offsets,
+                 stat_order, stat_values, groups, teams):
+        self.names = tuple(names)
+        self.types = tuple(types)
+        self.name_ids = {name: index for index, name in enumerate(self.names)}
+        self.type_ids = {pokemon_type: index for index, pokemon_type in enumerate(self.types)}
+        self.type_id = type_id
+        self.columns = columns
+        self.type_order = type_order
+        self.type_offsets = type_offsets
+        self.stat_order = stat_order
+        self.stat_values = stat_values
+        self.groups = groups
+        self.teams = teams
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.name_ids
+
+    def index(self, name: str) -> int:
+        try:
+            return self.name_ids[name]
+        except KeyError:
+            raise KeyError(f"unknown species {name!r}") from None
+
+    def __getitem__(self, key: Union[int, str]) -> tuple:
+        index = self.index(key) if isinstance(key, str) else key
+        columns = self.columns
+        return (self.names[index], self.types[self.type_id[index]], columns["hp"][index],
+                columns["attack"][index], columns["defense"][index], columns["speed"][index])
+
+    def __iter__(self) -> Iterator[tuple]:
+        return (self[index] for index in range(len(self)))
+
+    def create(self, key: Union[int, str]) -> Pokemon:
+        return Pokemon(*self[key])
+
+    def of_type(self, pokemon_type: str) -> memoryview:
+        type_index = self.type_ids.get(pokemon_type)
+        if type_index is None:
+            return memoryview(array("I"))
+        offsets = self.type_offsets
+        return memoryview(self.type_order)[offsets[type_index]:offsets[type_index + 1]]
+
+    def with_stat(self, stat: str, low: int, high: int) -> memoryview:
+        """Ids of species with ``low <= stat <= high``, ascending by that stat."""
+        values = self.stat_values[stat]
+        start = bisect.bisect_left(values, low)
+        end = bisect.bisect_right(values, high, start)
+        return memoryview(self.stat_order[stat])[start:end]
+
+    def group(self, name: str) -> memoryview:
+        return memoryview(self.groups[name])
+
+def id_array(ids) -> array:
+    return array("I", ids)
+
+def build_catalog(data: dict) -> SpeciesCatalog:
+    """Index the parsed contents of a species file."""
+    names, name_ids, types, type_ids = [], {}, [], {}
+    type_id = array("B")
+    columns = {stat: array("H") for stat in STATS}
+    for name, pokemon_type, *stats in data["species"]:
+        if name in name_ids:
+            raise ValueError(f"species {name!r} is listed twice")
+        if "\0" in name:
+            raise ValueError(f"species name {name!r} contains a NUL character")
+        name_ids[name] = len(names)
+        if pokemon_type not in type_ids:
+            type_ids[pokemon_type] = len(types)
+            types.append(pokemon_type)
+        names.append(name)
+        type_id.append(type_ids[pokemon_type])
+        for stat, value in zip(STATS, stats):
+            columns[stat].append(value)
+
+    def lookup(name: str) -> int:
+        if name not in name_ids:
+            raise KeyError(f"unknown species {name!r}")
+        return name_ids[name]
+
+    counts = [0] * len(types)
+    for index in type_id:
+        counts[index] += 1
+    type_offsets = array("I", [0])
+    for count in counts:
+        type_offsets.append(type_offsets[-1] + count)
+    type_order = array("I", bytes(4 * len(names)))
+    cursor = list(type_offsets[:-1])
+    for species, index in enumerate(type_id):
+        type_order[cursor[index]] = species
+        cursor[index] += 1
+
+    stat_order, stat_values = {}, {}
+    for stat in STATS:
+        column = columns[stat]
+        order = sorted(range(len(names)), key=column.__getitem__)
+        stat_order[stat] = id_array(order)
+        stat_values[stat] = array("H", (column[species] for species in order))
+
+    groups = {group: id_array(lookup(name) for name in members)
+              for group, members in data.get("groups", {}).items()}
+    teams = tuple(id_array(lookup(name) for name in team) for team in data.get("trainer_teams", ()))
+    return SpeciesCatalog(names, types, type_id, columns, type_order, type_offsets,
+                          stat_order, stat_values, groups, teams)
+
+def column_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+def read_column(typecode: str, buffer, offset: int, count: int) -> Tuple[array, int]:
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(buffer[offset:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
+
+def pack_ids(ids: array) -> bytes:
+    return COUNT.pack(len(ids)) + column_bytes(ids)
+
+def unpack_ids(buffer, offset: int) -> Tuple[array, int]:
+    (count,) = COUNT.unpack_from(buffer, offset)
+    return read_column("I", buffer, offset + COUNT.size, count)
+
+def encode_catalog(catalog: SpeciesCatalog, source_mtime: int, source_size: int) -> bytes:
+    parts = [CACHE_HEADER.pack(MAGIC, VERSION, 0, source_mtime, source_size, len(catalog)),
+             COUNT.pack(len(catalog.types))]
+    parts += [pack_string(pokemon_type) for pokemon_type in catalog.types]
+    names = "\0".join(catalog.names).encode("utf-8")
+    parts += [COUNT.pack(len(names)), names]
+    parts.append(column_bytes(catalog.type_id))
+    for stat in STATS:
+        parts += [column_bytes(catalog.columns[stat]), column_bytes(catalog.stat_order[stat]),
+                  column_bytes(catalog.stat_values[stat])]
+    parts += [column_bytes(catalog.type_order), column_bytes(catalog.type_offsets)]
+    parts.append(COUNT.pack(len(catalog.groups)))
+    for group, ids in catalog.groups.items():
+        parts += [pack_string(group), pack_ids(ids)]
+    parts.append(COUNT.pack(len(catalog.teams)))
+    parts += [pack_ids(team) for team in catalog.teams]
+    return b"".join(parts)
+
+def decode_catalog(buffer, source_mtime: int, source_size: int) -> Optional[SpeciesCatalog]:
+    """Rebuild a catalog from cache bytes, or None if they are stale or from another version."""
+    if len(buffer) < CACHE_HEADER.size:
+        return None
+    magic, version, _, mtime, size, count = CACHE_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION or mtime != source_mtime or size != source_size:
+        return None
+
+    offset = CACHE_HEADER.size
+    (type_count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    types = []
+    for _ in range(type_count):
+        pokemon_type, offset = unpack_string(buffer, offset)
+        types.append(pokemon_type)
+    (length,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    names = bytes(buffer[offset:offset + length]).decode("utf-8").split("\0") if count else []
+    offset += length
+
+    type_id, offset = read_column("B", buffer, offset, count)
+    columns, stat_order, stat_values = {}, {}, {}
+    for stat in STATS:
+        columns[stat], offset = read_column("H", buffer, offset, count)
+        stat_order[stat], offset = read_column("I", buffer, offset, count)
+        stat_values[stat], offset = read_column("H", buffer, offset, count)
+    type_order, offset = read_column("I", buffer, offset, count)
+    type_offsets, offset = read_column("I", buffer, offset, type_count + 1)
+
+    groups = {}
+    (group_count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    for _ in range(group_count):
+        group, offset = unpack_string(buffer, offset)
+        groups[group], offset = unpack_ids(buffer, offset)
+    (team_count,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    teams = []
+    for _ in range(team_count):
+        team, offset = unpack_ids(buffer, offset)
+        teams.append(team)
+
+    return SpeciesCatalog(names, types, type_id, columns, type_order, type_offsets,
+                          stat_order, stat_values, groups, tuple(teams))
+
+def default_cache_path(path: str) -> str:
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, "__pycache__", f"{os.path.splitext(filename)[0]}.v{VERSION}.bin")
+
+def load_catalog(path: str = SPECIES_PATH, cache_path: Optional[str] = None) -> SpeciesCatalog:
+    """Load the species file, reusing the binary cache unless the file has changed since.
+
+    The cache is stamped with the source's size and modification time, like
+    a ``.pyc``; a stale or unreadable cache is rebuilt, and one that can't be
+    written (read-only checkout) is skipped.
+    """
+    cache_path = cache_path or default_cache_path(path)
+    source = os.stat(path)
+    try:
+        with open(cache_path, "rb") as handle:
+            catalog = decode_catalog(handle.read(), source.st_mtime_ns, source.st_size)
+        if catalog is not None:
+            return catalog
+    except (OSError, ValueError, struct.error):
+        pass
+
+    with open(path, encoding="utf-8") as handle:
+        catalog = build_catalog(json.load(handle))
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(encode_catalog(catalog, source.st_mtime_ns, source.st_size))
+        os.replace(temporary, cache_path)
+    except OSError:
+        pass
+    return catalog
+
+CATALOG = load_catalog()
+
+def synthetic_species(count: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    types = ("Normal", "Fire", "Water", "Electric", "Grass", "Ice", "Fighting", "Poison", "Ground",
+             "Flying", "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy")
+    species = [[f"Species{index}", rng.choice(types), rng.randint(40, 255), rng.randint(5, 190),
+                rng.randint(5, 230), rng.randint(5, 180)] for index in range(count)]
+    return {"species": species, "groups": {"wild": [row[0] for row in species[::7]]}}
+
+def benchmark_catalog(count: int = 20_000, queries: int = 2_000) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "species.json")
+        data = synthetic_species(count)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        cache_path = os.path.join(directory, "species.bin")
+
+        start = time.perf_counter()
+        load_catalog(path, cache_path)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        catalog = load_catalog(path, cache_path)
+        cached = time.perf_counter() - start
+
+    rows = [tuple(row) for row in data["species"]]
+    start = time.perf_counter()
+    for index in range(queries):
+        [row for row in rows if row[1] == "Water"]
+        [row for row in rows if 100 <= row[5] <= 110 + index % 10]
+    scan = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for index in range(queries):
+        catalog.of_type("Water")
+        catalog.with_stat("speed", 100, 110 + index % 10)
+    indexed = (time.perf_counter() - start) / queries
+
+    return {"species": count, "cold_load_ms": cold * 1e3, "cached_load_ms": cached * 1e3,
+            "scan_query_us": scan * 1e6, "indexed_query_us": indexed * 1e6}
+
+def test_species_catalog():
+    print(f"📚 {len(CATALOG)} species, types: {', '.join(CATALOG.types)}")
+    fast = [CATALOG[index][0] for index in CATALOG.with_stat("speed", 80, 255)]
+    print(f"💨 Speed 80+: {', '.join(fast)}")
+
+    results = benchmark_catalog()
+    print(f"🗂️  {results['species']} species: cold load {results['cold_load_ms']:.1f} ms, "
+          f"cached load {results['cached_load_ms']:.1f} ms")
+    print(f"🔎 Type + speed range query: scan {results['scan_query_us']:.0f} us, "
+          f"indexed {results['indexed_query_us']:.1f} us")
+
+if __name__ == "__main__":
+    print("🧪 Testing Species Catalog")
+    test_species_catalog()
@@ -1,9 +1,11 @@
 import asyncio
-import random
 from enum import Enum
 from dataclasses import dataclass
 from typing import Dict, List
 
+from pacing import resolve_clock
+from rng_streams import resolve_rng
+
 class StatusType(Enum):
     POISON = "poison"
     BURN = "burn"
@@ -19,141 +21,224 @@ class StatusEffect:
     severity: int = 1
     message: str = ""
 
-class AdvancedStatusManager:
-    """Handles all Pokemon status conditions during battle."""
-    
-    def __init__(self):
-        self.effect_messages = {
-            StatusType.POISON: "💜 {name} is hurt by poison!",
-            StatusType.BURN: "🔥 {name} is hurt by burn!",
-            StatusType.PARALYSIS: "⚡ {name} is paralyzed!",
-            StatusType.SLEEP: "😴 {name} is fast asleep!",
-            StatusType.FREEZE: "🧊 {name} is frozen solid!",
-            StatusType.CONFUSION: "😵 {name} is confused!",
-        }
-    
-    async def apply_status_effects(self, pokemon) -> bool:
-        if not hasattr(pokemon, 'status_effects'):
-            pokemon.status_effects = []
+STATUS_ORDER = tuple(StatusType)
+# Keyed by value, so members of a second copy of the enum (the module run as __main__) still match.
+STATUS_INDEX = {status_type.value: index for index, status_type in enumerate(STATUS_ORDER)}
+NEVER = float("inf")
+
+class StatusStore:
+    """A Pokemon's active status conditions as a bitmask.
+    
+    Bit ``i`` of ``mask`` is set while ``STATUS_ORDER[i]`` is active, with the
+    turn it runs out and its severity kept in small per-slot lists. Expiry is
+    stored as an absolute turn on the store's own counter, so ``tick()``
+    ages every condition at once and only looks at the slots when the
+    earliest expiry comes due. Adding a condition that is already active
+    keeps the longer duration and the higher severity.
+    
+    The store still behaves like the list of ``StatusEffect`` it replaces:
+    iterating yields ``StatusEffect`` snapshots in ``STATUS_ORDER``, and
+    ``append``/``remove``/``len``/``in`` work as before.
+    """
+    
+    __slots__ = ("mask", "expires", "severity", "clock", "next_expiry")
+    
+    def __init__(self, effects=()):
+        self.mask = 0
+        self.expires = [0] * len(STATUS_ORDER)
+        self.severity = [0] * len(STATUS_ORDER)
+        self.clock = 0
+        self.next_expiry = NEVER
+        for effect in effects:
+            self.append(effect)
+    
+    def has(self, status_type: StatusType) -> bool:
+        return bool(self.mask >> STATUS_INDEX[status_type.value] & 1)
+    
+    def turns_remaining(self, status_type: StatusType) -> int:
+        if not self.has(status_type):
+            return 0
+        return self.expires[STATUS_INDEX[status_type.value]] - self.clock
+    
+    def add(self, status_type: StatusType, turns: int, severity: int = 1) -> bool:
+        index = STATUS_INDEX[status_type.value]
+        expires = self.clock + turns
         
-        can_act = True
-        effects_to_remove = []
+        if self.mask >> index & 1:
+            self.expires[index] = max(self.expires[index], expires)
+            self.severity[index] = max(self.severity[index], severity)
+            return False
         
-        for effect in pokemon.status_effects:
-            result = await self.process_single_effect(pokemon, effect)
-            
-            if result == "prevent_action":
-                can_act = False
-            
-            effect.turns_remaining -= 1
-            if effect.turns_remaining <= 0:
-                effects_to_remove.append(effect)
+        self.mask |= 1 << index
+        self.expires[index] = expires
+        self.severity[index] = severity
+        if expires < self.next_expiry:
+            self.next_expiry = expires
+        return True
+    
+    def discard(self, status_type: StatusType) -> bool:
+        bit = 1 << STATUS_INDEX[status_type.value]
+        if not self.mask & bit:
+            return False
+        self.mask &= ~bit
+        return True
+    
+    def clear(self):
+        self.mask = 0
+        self.next_expiry = NEVER
+
+    def copy(self) -> "StatusStore":
+        store = StatusStore.__new__(StatusStore)
+        store.mask = self.mask
+        store.expires = self.expires[:]
+        store.severity = self.severity[:]
+        store.clock = self.clock
+        store.next_expiry = self.next_expiry
+        return store
+    
+    def tick(self) -> tuple:
+        """Age every condition by one turn and return the types that ran out."""
+        self.clock += 1
+        if self.clock < self.next_expiry:
+            return ()
         
-        for effect in effects_to_remove:
-            pokemon.status_effects.remove(effect)
-            await self.show_recovery_message(pokemon, effect)
+        expired = []
+        next_expiry = NEVER
+        for index, status_type in enumerate(STATUS_ORDER):
+            if self.mask >> index & 1:
+                expires = self.expires[index]
+                if expires <= self.clock:
+                    self.mask &= ~(1 << index)
+                    expired.append(status_type)
+                elif expires < next_expiry:
+                    next_expiry = expires
+        self.next_expiry = next_expiry
+        return tuple(expired)
+    
+    def append(self, effect: StatusEffect):
+        self.add(effect.effect_type, effect.turns_remaining, effect.severity)
+    
+    def remove(self, effect: StatusEffect):
+        if not self.discard(effect.effect_type):
+            raise ValueError(f"{effect.effect_type.value} is not active")
+    
+    def __iter__(self):
+        mask = self.mask
+        for index, status_type in enumerate(STATUS_ORDER):
+            if mask >> index & 1:
+                yield StatusEffect(status_type, self.expires[index] - self.clock, self.severity[index])
+    
+    def __len__(self) -> int:
+        return bin(self.mask).count("1")
+    
+    def __bool__(self) -> bool:
+        return self.mask != 0
+    
+    def __contains__(self, item) -> bool:
+        if isinstance(item, StatusEffect):
+            return self.has(item.effect_type)
+        return self.has(item)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (StatusStore, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"StatusStore({list(self)!r})"
+
+class AdvancedStatusManager:
+    """Handles all Pokemon status conditions during battle.
+    
+    Messages come pre-built from the compiled ``effect_rules.RULES``; events
+    are mapped back to their rule by the status value they carry.
+    """
+    
+    def __init__(self, clock=None, rng=None, metrics=None):
+        from effect_rules import RULES
+        from metrics import resolve_metrics
         
-        return can_act
+        self.clock = resolve_clock(clock)
+        self.rng = resolve_rng(rng)
+        self.metrics = resolve_metrics(metrics)
+        self.rules = RULES
+        self.last_events = []
     
-    async def process_single_effect(self, pokemon, effect: StatusEffect) -> str:
-        if effect.effect_type == StatusType.POISON:
-            damage = max(1, pokemon.max_hp // (16 - effect.severity))
-            await self.animated_status_damage(pokemon, damage, "poison")
-            return "continue"
+    async def apply_status_effects(self, pokemon, side: int = 0) -> bool:
+        from battle_rules import resolve_status_effects
         
-        elif effect.effect_type == StatusType.BURN:
-            damage = max(1, pokemon.max_hp // (16 - effect.severity))
-            await self.animated_status_damage(pokemon, damage, "burn")
-            return "continue"
+        if not hasattr(pokemon, 'status_effects'):
+            pokemon.status_effects = []
         
-        elif effect.effect_type == StatusType.PARALYSIS:
-            print(f"⚡ {pokemon.name} is paralyzed!")
-            if random.random() < 0.25:
-                print(f"   {pokemon.name} can't move!")
-                await asyncio.sleep(1)
-                return "prevent_action"
-            return "continue"
+        events = []
+        started = self.metrics.start()
+        can_act = resolve_status_effects(pokemon, side, events, self.rng)
+        self.metrics.stop("status", started)
+        self.last_events = events
+        await self.render_status_events(pokemon, events)
         
-        elif effect.effect_type == StatusType.SLEEP:
-            print(f"😴 {pokemon.name} is fast asleep!")
-            await asyncio.sleep(0.8)
-            return "prevent_action"
+        return can_act
+    
+    async def process_single_effect(self, pokemon, effect: StatusEffect) -> str:
+        from battle_rules import resolve_single_effect
         
-        elif effect.effect_type == StatusType.FREEZE:
-            print(f"🧊 {pokemon.name} is frozen solid!")
-            if random.random() < 0.2:
-                pokemon.status_effects.remove(effect)
-                print(f"🔥 {pokemon.name} thawed out!")
-                await asyncio.sleep(0.5)
-                return "continue"
-            return "prevent_action"
+        events = []
+        can_act = resolve_single_effect(pokemon, 0, effect, events, self.rng)
+        await self.render_status_events(pokemon, events)
         
-        elif effect.effect_type == StatusType.CONFUSION:
-            print(f"😵 {pokemon.name} is confused!")
-            if random.random() < 0.33:
-                damage = pokemon.attack // 2
-                print(f"   {pokemon.name} hurt itself in its confusion!")
-                await self.animated_status_damage(pokemon, damage, "confusion")
-                return "prevent_action"
-            return "continue"
+        return "continue" if can_act else "prevent_action"
+    
+    async def render_status_events(self, pokemon, events):
+        from battle_rules import EventType
         
-        return "continue"
+        rules = self.rules
+        for event in events:
+            kind = event.kind
+            
+            if kind == EventType.STATUS_ACTIVE:
+                rule = rules.by_value[event.detail]
+                print(rule.active.format(name=pokemon.name))
+                if rule.active_pause:
+                    await self.clock.sleep(rule.active_pause)
+            elif kind == EventType.FULLY_PARALYZED:
+                print(rules.blocked.format(name=pokemon.name))
+                await self.clock.sleep(1)
+            elif kind == EventType.STATUS_CURED:
+                print(rules.by_value[event.detail].cured.format(name=pokemon.name))
+                await self.clock.sleep(0.5)
+            elif kind == EventType.SELF_HIT:
+                print(rules.self_hit.format(name=pokemon.name))
+            elif kind == EventType.STATUS_DAMAGE:
+                await self.animated_status_damage(pokemon, event.value, event.detail)
+            elif kind == EventType.STATUS_EXPIRED:
+                await self.show_recovery_message(pokemon, StatusEffect(rules.by_value[event.detail].status, 0))
     
     async def animated_status_damage(self, pokemon, damage, effect_type):
-        symbols = {
-            "poison": "💜",
-            "burn": "🔥", 
-            "confusion": "😵"
-        }
-        
-        symbol = symbols.get(effect_type, "💥")
-        print(f"{symbol} {pokemon.name} takes {damage} damage from {effect_type}!")
-        
-        old_hp = pokemon.current_hp
-        pokemon.current_hp = max(0, pokemon.current_hp - damage)
+        rule = self.rules.by_value[effect_type]
+        print(rule.damage.format(name=pokemon.name, damage=damage))
         
-        await asyncio.sleep(0.5)
-        print(f"❤️  {pokemon.name}: {pokemon.current_hp}/{pokemon.max_hp} HP")
-        await asyncio.sleep(0.3)
+        await self.clock.sleep(0.5)
+        print(self.rules.hp.format(name=pokemon.name, hp=pokemon.current_hp, max_hp=pokemon.max_hp))
+        await self.clock.sleep(0.3)
     
     async def show_recovery_message(self, pokemon, effect):
-        recovery_messages = {
-            StatusType.POISON: f"✨ {pokemon.name} recovered from poison!",
-            StatusType.BURN: f"✨ {pokemon.name} recovered from burn!",
-            StatusType.PARALYSIS: f"⚡ {pokemon.name} is no longer paralyzed!",
-            StatusType.SLEEP: f"😊 {pokemon.name} woke up!",
-            StatusType.FREEZE: f"🔥 {pokemon.name} thawed out!",
-            StatusType.CONFUSION: f"🧠 {pokemon.name} snapped out of confusion!",
-        }
-        
-        message = recovery_messages.get(effect.effect_type, f"✨ {pokemon.name} recovered!")
-        print(message)
-        await asyncio.sleep(0.8)
+        rule = self.rules.statuses[STATUS_INDEX[effect.effect_type.value]]
+        print(rule.recovered.format(name=pokemon.name))
+        await self.clock.sleep(0.8)
     
     def add_status_effect(self, pokemon, effect_type: StatusType, turns: int, severity: int = 1):
+        from battle_rules import add_status
+        
         if not hasattr(pokemon, 'status_effects'):
             pokemon.status_effects = []
         
-        for existing_effect in pokemon.status_effects:
-            if existing_effect.effect_type == effect_type:
-                existing_effect.turns_remaining = max(existing_effect.turns_remaining, turns)
-                existing_effect.severity = max(existing_effect.severity, severity)
-                return
-        
-        new_effect = StatusEffect(effect_type, turns, severity)
-        pokemon.status_effects.append(new_effect)
+        if not add_status(pokemon, effect_type, turns, severity):
+            return
         
-        effect_names = {
-            StatusType.POISON: "poisoned",
-            StatusType.BURN: "burned", 
-            StatusType.PARALYSIS: "paralyzed",
-            StatusType.SLEEP: "put to sleep",
-            StatusType.FREEZE: "frozen",
-            StatusType.CONFUSION: "confused",
-        }
-        
-        effect_name = effect_names.get(effect_type, "affected")
-        print(f"🌟 {pokemon.name} was {effect_name}!")
+        self.announce_status(pokemon, effect_type)
+    
+    def announce_status(self, pokemon, effect_type: StatusType):
+        print(self.rules.statuses[STATUS_INDEX[effect_type.value]].announce.format(name=pokemon.name))
 
 async def test_status_system():
     from pokemon import Pokemon
@@ -0,0 +1,266 @@
+import random
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from battle_rules import BattleEvent, EventType, resolve_attack, tick_status_effects, turn_order
+from moves import MOVES
+from pokemon import Pokemon
+from type_chart import TYPE_CHART
+
+MAX_TEAM_SIZE = 6
+# ``TeamBattleState.winner`` when both teams run out of Pokemon on the same turn.
+DRAW = -1
+
+class Switch(NamedTuple):
+    """A turn action that swaps the active Pokemon for team member ``member``."""
+    member: int
+
+class TeamSide:
+    """One trainer's team: its members, which one is active and how many can still fight.
+
+    ``members`` is fixed for the whole battle, so a turn never rebuilds a
+    list; switching just moves ``active``.
+    """
+
+    __slots__ = ("members", "active", "remaining")
+
+    def __init__(self, members: Sequence):
+        self.members = tuple(members)
+        if not 1 <= len(self.members) <= MAX_TEAM_SIZE:
+            raise ValueError(f"a team has 1 to {MAX_TEAM_SIZE} Pokemon, not {len(self.members)}")
+        self.remaining = sum(1 for member in self.members if member.current_hp > 0)
+        if not self.remaining:
+            raise ValueError("a team needs at least one Pokemon that can fight")
+        self.active = self.next_alive()
+
+    @property
+    def pokemon(self):
+        return self.members[self.active]
+
+    def can_switch_to(self, member: int) -> bool:
+        return (0 <= member < len(self.members) and member != self.active
+                and self.members[member].current_hp > 0)
+
+    def bench(self) -> List[int]:
+        """Members that could be switched in right now."""
+        return [member for member in range(len(self.members)) if self.can_switch_to(member)]
+
+    def next_alive(self) -> Optional[int]:
+        for member, pokemon in enumerate(self.members):
+            if pokemon.current_hp > 0:
+                return member
+        return None
+
+class TeamBattleState:
+    """Two teams of up to six, plus turn bookkeeping; the team version of ``BattleState``.
+
+    ``winner`` is the winning side, or ``DRAW`` if both teams were wiped out together.
+    """
+
+    __slots__ = ("sides", "turn", "winner")
+
+    def __init__(self, team1: Sequence, team2: Sequence, turn: int = 1):
+        self.sides = (TeamSide(team1), TeamSide(team2))
+        self.turn = turn
+        self.winner = None
+
+    @property
+    def finished(self) -> bool:
+        return self.winner is not None
+
+    @property
+    def active(self) -> Tuple:
+        return self.sides[0].pokemon, self.sides[1].pokemon
+
+def switch_in(state: TeamBattleState, side: int, member: int, events: List[BattleEvent]):
+    team = state.sides[side]
+    if not team.can_switch_to(member):
+        raise ValueError(f"side {side} can't switch to team member {member}")
+    team.active = member
+    pokemon = team.members[member]
+    events.append(BattleEvent(EventType.SWITCH, side, member, pokemon.name, pokemon.current_hp))
+
+def best_multiplier(attacker, defender) -> float:
+    """The type chart's best multiplier among ``attacker``'s moves against ``defender``."""
+    ids = MOVES.ids
+    return max(TYPE_CHART.move_multiplier(attacker, defender, ids.get(move)) for move in attacker.moves)
+
+def team_turn_order(pokemon1, pokemon2, rng=random) -> Tuple[int, int]:
+    """``turn_order``, except a speed tie goes to a random side instead of always side 0."""
+    if pokemon1.speed == pokemon2.speed:
+        return (0, 1) if rng.random() < 0.5 else (1, 0)
+    return turn_order(pokemon1, pokemon2)
+
+def first_alive(state: TeamBattleState, side: int) -> int:
+    """Replace a fainted Pokemon with the first one in team order that can fight."""
+    return state.sides[side].next_alive()
+
+def best_matchup(state: TeamBattleState, side: int) -> int:
+    """Replace a fainted Pokemon with the member whose moves hit the opposing Pokemon hardest."""
+    foe = state.sides[1 - side].pokemon
+    team = state.sides[side]
+    return max(team.bench(), key=lambda member: best_multiplier(team.members[member], foe))
+
+def matchup_policy(state: TeamBattleState, side: int, rng=random):
+    """Attack with a random move, but switch out of a matchup where every move is resisted.
+
+    The switch goes to a bench member with a super-effective move, if there
+    is one; it then has a good matchup itself, so the policy never swaps
+    back and forth.
+    """
+    team = state.sides[side]
+    foe = state.sides[1 - side].pokemon
+    if team.remaining > 1 and best_multiplier(team.pokemon, foe) < 1.0:
+        for member in team.bench():
+            if best_multiplier(team.members[member], foe) > 1.0:
+                return Switch(member)
+    return None
+
+def settle_faints(state: TeamBattleState) -> bool:
+    """Count the active Pokemon that fainted this turn and pick a winner once a side is out.
+
+    A turn that knocks out both teams' last Pokemon is a ``DRAW``. Returns
+    whether the battle goes on; if it does, every side whose active Pokemon
+    fainted must switch in a replacement before the next turn.
+    """
+    sides = state.sides
+    for team in sides:
+        if team.pokemon.current_hp <= 0:
+            team.remaining -= 1
+    if not sides[0].remaining or not sides[1].remaining:
+        if sides[0].remaining:
+            state.winner = 0
+        elif sides[1].remaining:
+            state.winner = 1
+        else:
+            state.winner = DRAW
+        return False
+    return True
+
+def step_team(state: TeamBattleState, actions: Optional[Sequence] = None, rng=random, roller=None,
+              replace: Callable = first_alive,
+              events: Optional[List[BattleEvent]] = None) -> Tuple[TeamBattleState, List[BattleEvent]]:
+    """Advance a team battle by one turn in place and return it with the turn's events.
+
+    Each side's action is a move name, ``None`` for a random move, or a
+    ``Switch``. Switches happen first, then the active Pokemon attack in
+    speed order as in ``battle_rules.step``, except that ``rng`` breaks
+    speed ties so mirror matchups aren't won by side 0. A Pokemon that faints
+    loses its attack for the turn; at the end of the turn each side whose
+    active Pokemon fainted sends in ``replace(state, side)``. Pass an
+    ``events`` list to reuse it; it is appended to, not cleared.
+    """
+    if events is None:
+        events = []
+    if state.finished:
+        return state, events
+    if actions is None:
+        actions = (None, None)
+    sides = state.sides
+
+    events.append(BattleEvent(EventType.TURN_START, 0, state.turn))
+
+    first, second = turn_order(sides[0].pokemon, sides[1].pokemon)
+    for side in (first, second):
+        action = actions[side]
+        if type(action) is Switch:
+            switch_in(state, side, action.member, events)
+
+    first, second = team_turn_order(sides[0].pokemon, sides[1].pokemon, rng)
+    for side in (first, second):
+        action = actions[side]
+        if type(action) is Switch:
+            continue
+        attacker, defender = sides[side].pokemon, sides[1 - side].pokemon
+        if attacker.current_hp > 0 and defender.current_hp > 0:
+            resolve_attack(attacker, defender, side, action, events, rng, roller)
+
+    for side in (first, second):
+        pokemon = sides[side].pokemon
+        if pokemon.current_hp > 0:
+            tick_status_effects(pokemon, side, events)
+            if pokemon.current_hp <= 0:
+                events.append(BattleEvent(EventType.FAINT, side, hp=0))
+
+    events.append(BattleEvent(EventType.TURN_END, 0, state.turn))
+    state.turn += 1
+
+    if not settle_faints(state):
+        return state, events
+    for side in (0, 1):
+        if sides[side].pokemon.current_hp <= 0:
+            switch_in(state, side, replace(state, side), events)
+    return state, events
+
+def run_team_battle(team1: Sequence, team2: Sequence, rng=random, policy: Optional[Callable] = None,
+                    replace: Callable = first_alive, max_turns: int = 1000, roller=None) -> TeamBattleState:
+    """Play a team battle headlessly; ``policy(state, side, rng)`` picks each side's action."""
+    state = TeamBattleState(team1, team2)
+    events = []
+    actions = [None, None]
+    while not state.finished and state.turn <= max_turns:
+        if policy is not None:
+            actions[0] = policy(state, 0, rng)
+            actions[1] = policy(state, 1, rng)
+        step_team(state, actions, rng, roller, replace, events)
+        events.clear()
+    return state
+
+def team_win_rate(team1: Sequence[tuple], team2: Sequence[tuple], battles: int, seed: int = 0,
+                  policy: Optional[Callable] = None, replace: Callable = first_alive) -> float:
+    """How often ``team1`` beats ``team2``, given as species rows for ``Pokemon(*row)``."""
+    from rng_streams import BattleRNG
+
+    wins = 0
+    for battle in range(battles):
+        rng = BattleRNG(seed, battle)
+        state = run_team_battle([Pokemon(*row) for row in team1], [Pokemon(*row) for row in team2],
+                                rng, policy, replace)
+        wins += state.winner == 0
+    return wins / battles if battles else 0.0
+
+def random_teams(rng, count: int, size: int = MAX_TEAM_SIZE) -> List[Tuple[tuple, ...]]:
+    from species_catalog import CATALOG
+
+    species = list(CATALOG)
+    return [tuple(rng.choice(species) for _ in range(size)) for _ in range(count)]
+
+def benchmark_team_battles(battles: int = 1_000, seed: int = 2) -> dict:
+    """Headless 6v6 battles per minute on one core, with and without switching."""
+    from rng_streams import BattleRNG
+
+    teams = random_teams(random.Random(seed), 64)
+    results = {}
+    for name, policy, replace in (("random", None, first_alive), ("matchup", matchup_policy, best_matchup)):
+        turns = 0
+        start = time.perf_counter()
+        for battle in range(battles):
+            rng = BattleRNG(seed, battle)
+            first, second = teams[battle % 64], teams[(battle * 7 + 1) % 64]
+            state = run_team_battle([Pokemon(*row) for row in first], [Pokemon(*row) for row in second],
+                                    rng, policy, replace)
+            turns += state.turn
+        elapsed = time.perf_counter() - start
+        results[name] = {"battles_per_minute": battles / elapsed * 60, "mean_turns": turns / battles,
+                         "battle_us": elapsed / battles * 1e6}
+    return results
+
+def test_team_battle():
+    rng = random.Random(4)
+    first, second = random_teams(rng, 2)
+    print(f"👥 {', '.join(row[0] for row in first)}")
+    print(f"👥 {', '.join(row[0] for row in second)}")
+    for name, policy, replace in (("random moves", None, first_alive),
+                                  ("type-aware switching", matchup_policy, best_matchup)):
+        rate = team_win_rate(first, second, 500, seed=1, policy=policy, replace=replace)
+        swapped = team_win_rate(second, first, 500, seed=1, policy=policy, replace=replace)
+        print(f"🏆 {name:<21} team 1 wins {rate:.1%}; with sides swapped team 2 wins {swapped:.1%}")
+    print(f"🪞 mirror match: side 0 wins {team_win_rate(first, first, 500, seed=1):.1%}")
+
+    for name, result in benchmark_team_battles().items():
+        print(f"🚀 {name:<8} {result['battles_per_minute']:>9,.0f} 6v6 battles/min/core "
+              f"({result['battle_us']:.0f} us, {result['mean_turns']:.1f} turns each)")
+
+if __name__ == "__main__":
+    print("🧪 Testing Team Battles")
+    test_team_battle()
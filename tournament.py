@@ -0,0 +1,155 @@
+import argparse
+import csv
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+
+from pokemon import Pokemon
+from battle_rules import run_battle
+from rng_streams import BattleRNG
+
+def tournament_species() -> List[tuple]:
+    from species_catalog import CATALOG
+
+    return list(CATALOG)
+
+def chunk_pairs(species_count: int, chunk_size: int) -> List[List[Tuple[int, int]]]:
+    pairs = [(i, j) for i in range(species_count) for j in range(species_count) if i != j]
+    return [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+
+PAIR_PREFETCH = 1024
+
+def pair_stream_id(species_count: int, i: int, j: int) -> int:
+    return i * species_count + j
+
+def run_chunk(species: Sequence[tuple], pairs: Sequence[Tuple[int, int]], battles: int,
+              seed: int, chunk_id: int, engine: str = "scalar"):
+    """``(i, j, wins)`` for each pair; the ``exact`` engine plays no battles and gives ``(i, j, win_rate)``."""
+    if engine == "numpy":
+        import numpy as np
+        from batch_sim import BatchBattleSimulator
+
+        simulator = BatchBattleSimulator(seed=np.random.SeedSequence(seed, spawn_key=(chunk_id,)))
+        results = simulator.simulate_pairs([(species[i], species[j]) for i, j in pairs], battles)
+        return [(i, j, int(result.wins[0])) for (i, j), result in zip(pairs, results)]
+
+    if engine == "exact":
+        from win_probability import win_probability
+
+        return [(i, j, win_probability(Pokemon(*species[i]), Pokemon(*species[j])).win_probability)
+                for i, j in pairs]
+
+    tables = None
+    if engine == "tables":
+        from damage_tables import load_tables
+
+        tables = load_tables(species)
+
+    chunk_results = []
+    for i, j in pairs:
+        wins = 0
+        rng = BattleRNG(seed, pair_stream_id(len(species), i, j), PAIR_PREFETCH)
+        roller = None if tables is None else tables.roller(i, j)
+        for _ in range(battles):
+            state = run_battle(Pokemon(*species[i]), Pokemon(*species[j]), rng, roller=roller)
+            wins += state.winner == 0
+        chunk_results.append((i, j, wins))
+    return chunk_results
+
+def wilson_interval(wins: int, battles: int, z: float = 1.96) -> Tuple[float, float]:
+    if battles == 0:
+        return 0.0, 1.0
+    rate = wins / battles
+    denominator = 1 + z * z / battles
+    center = (rate + z * z / (2 * battles)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / battles + z * z / (4 * battles * battles)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def run_tournament(battles: int = 100, workers: int = None, chunk_size: int = 8,
+                   seed: int = 0, engine: str = "scalar", species=None) -> dict:
+    species = list(species or tournament_species())
+    count = len(species)
+    chunks = chunk_pairs(count, chunk_size)
+    wins = [[None] * count for _ in range(count)]
+    if engine == "tables":
+        from damage_tables import load_tables
+
+        # Build the disk cache once here, so the workers only ever read it.
+        load_tables(species)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_chunk, species, pairs, battles, seed, chunk_id, engine)
+                   for chunk_id, pairs in enumerate(chunks)]
+        for future in futures:
+            for i, j, pair_wins in future.result():
+                wins[i][j] = pair_wins
+    elapsed = time.perf_counter() - start
+
+    results = {
+        "species": [data[0] for data in species],
+        "battles_per_pair": battles,
+        "seed": seed,
+        "engine": engine,
+        "elapsed_seconds": elapsed,
+    }
+    if engine == "exact":
+        # Exact probabilities, not counts: no battles are played, so there are no wins to report.
+        win_rate = wins
+        results.update(
+            battles_per_pair=None,
+            wins=None,
+            win_rate=win_rate,
+            confidence_95=[[None if rate is None else (rate, rate) for rate in row] for row in win_rate],
+            pairs_per_second=count * (count - 1) / elapsed if elapsed > 0 else None,
+        )
+        return results
+
+    results.update(
+        wins=wins,
+        win_rate=[[None if wins[i][j] is None else wins[i][j] / battles for j in range(count)]
+                  for i in range(count)],
+        confidence_95=[[None if wins[i][j] is None else wilson_interval(wins[i][j], battles)
+                        for j in range(count)] for i in range(count)],
+        battles_per_second=battles * count * (count - 1) / elapsed if elapsed > 0 else None,
+    )
+    return results
+
+def write_results(results: dict, out_dir: str):
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(out_dir, "tournament.json"), "w") as handle:
+        json.dump(results, handle, indent=2)
+
+    names = results["species"]
+    with open(os.path.join(out_dir, "win_rates.csv"), "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["attacker"] + names)
+        for name, row in zip(names, results["win_rate"]):
+            writer.writerow([name] + ["" if rate is None else f"{rate:.4f}" for rate in row])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin species tournament")
+    parser.add_argument("--battles", type=int, default=200, help="battles per ordered pair")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=8, help="pairs per work unit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=("scalar", "tables", "numpy", "exact"), default="scalar")
+    parser.add_argument("--out", default="tournament_results")
+    args = parser.parse_args(argv)
+
+    print(f"🏟️  Running tournament: {args.battles} battles per pair, engine={args.engine}")
+    results = run_tournament(args.battles, args.workers, args.chunk_size, args.seed, args.engine)
+    write_results(results, args.out)
+
+    if args.engine == "exact":
+        print(f"✅ {results['pairs_per_second']:,.0f} pairs/s in {results['elapsed_seconds']:.2f}s")
+    else:
+        print(f"✅ {results['battles_per_second']:,.0f} battles/s in {results['elapsed_seconds']:.2f}s")
+    print(f"📁 Results written to {args.out}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import contextvars
+import functools
+import importlib
+import json
+import time
+import weakref
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# (battle_id, turn) of the battle the current task is playing; copied into every span.
+battle_context = contextvars.ContextVar("battle_context", default=(None, None))
+
+def set_battle_turn(battle_id: Optional[int], turn: Optional[int]):
+    battle_context.set((battle_id, turn))
+
+# (module, class, coroutine method) wrapped in a span while a Tracer is installed.
+TRACED_COROUTINES = (
+    ("pokemon", "Pokemon", "use_move_async"),
+    ("pokemon", "Pokemon", "status_effect_tick"),
+    ("status_effects", "AdvancedStatusManager", "apply_status_effects"),
+    ("special_moves", "SpecialMoveSystem", "use_special_move"),
+    ("special_moves", "SpecialMoveSystem", "move_cinematic"),
+    ("special_moves", "SpecialMoveSystem", "side_effect"),
+    ("async_ui", "AsyncUI", "type_message"),
+    ("async_ui", "AsyncUI", "display_message"),
+    ("async_ui", "AsyncUI", "display_battle_menu"),
+    ("async_ui", "AsyncUI", "display_move_menu"),
+    ("async_ui", "AsyncUI", "get_user_input"),
+    ("battle_ai", "BattleAI", "choose_move_async"),
+    ("enhanced_battle", "EnhancedBattleSystem", "single_pokemon_battle"),
+    ("enhanced_battle", "EnhancedBattleSystem", "trainer_battle"),
+    ("enhanced_battle", "EnhancedBattleSystem", "render_events"),
+    ("enhanced_battle", "EnhancedBattleSystem", "use_move_with_effects"),
+    ("enhanced_battle", "EnhancedBattleSystem", "animated_damage"),
+    ("final_pokemon_game", "CompletePokemonGame", "enhanced_battle"),
+    ("final_pokemon_game", "CompletePokemonGame", "player_enhanced_turn"),
+    ("final_pokemon_game", "CompletePokemonGame", "ai_enhanced_turn"),
+    ("final_pokemon_game", "CompletePokemonGame", "execute_regular_move"),
+    ("final_pokemon_game", "CompletePokemonGame", "replace_fainted"),
+    ("pacing", "RealTimeClock", "sleep"),
+    ("pacing", "ScaledClock", "sleep"),
+    ("pacing", "VirtualClock", "sleep"),
+)
+
+class Span:
+    """Drives one coroutine and times its resumptions and suspensions.
+
+    Each ``send`` into the coroutine is time spent running (including any
+    spans it awaits directly); each time it yields to the event loop is an
+    await, timed until the loop resumes it.
+    """
+
+    __slots__ = ("tracer", "name", "category", "coroutine")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, coroutine):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.coroutine = coroutine
+
+    def __await__(self):
+        clock = time.perf_counter_ns
+        coroutine = self.coroutine
+        battle_id, turn = battle_context.get()
+        started = clock()
+        running = suspended = awaits = 0
+        value, error = None, None
+        try:
+            while True:
+                resumed = clock()
+                try:
+                    if error is None:
+                        yielded = coroutine.send(value)
+                    else:
+                        yielded = coroutine.throw(error)
+                except StopIteration as stop:
+                    running += clock() - resumed
+                    return stop.value
+                paused = clock()
+                running += paused - resumed
+                awaits += 1
+                try:
+                    value, error = (yield yielded), None
+                except BaseException as thrown:
+                    value, error = None, thrown
+                suspended += clock() - paused
+        finally:
+            self.tracer.add_span(self.name, self.category, started, clock() - started,
+                                 {"battle_id": battle_id, "turn": turn, "awaits": awaits,
+                                  "running_us": running / 1e3, "suspended_us": suspended / 1e3})
+
+class TracedLock:
+    """An async context manager whose acquire is recorded as a ``display_lock`` span."""
+
+    __slots__ = ("tracer", "inner")
+
+    def __init__(self, tracer: "Tracer", inner):
+        self.tracer = tracer
+        self.inner = inner
+
+    async def __aenter__(self):
+        return await Span(self.tracer, "display_lock", "lock", self.inner.__aenter__())
+
+    async def __aexit__(self, *exc_info):
+        return await self.inner.__aexit__(*exc_info)
+
+class Tracer:
+    """Records the game's coroutines as Chrome trace-event spans.
+
+    While installed (``with tracer:``) the coroutines in ``TRACED_COROUTINES``
+    and ``AsyncUI.display`` are patched on their classes, so every instance in
+    the process is traced; uninstalling restores the originals and the game
+    runs with no tracing cost at all. Each asyncio task gets its own track.
+    The result opens in Perfetto or ``chrome://tracing``.
+    """
+
+    def __init__(self, targets: Tuple[Tuple[str, str, str], ...] = TRACED_COROUTINES):
+        self.targets = targets
+        self.events: List[dict] = []
+        self.tracks = weakref.WeakKeyDictionary()
+        self.track_count = 0
+        self.originals = []
+        self.origin = time.perf_counter_ns()
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def install(self):
+        if self.originals:
+            raise RuntimeError("tracer is already installed")
+        for module_name, class_name, method_name in self.targets:
+            owner = getattr(importlib.import_module(module_name), class_name)
+            if method_name in vars(owner):
+                self.patch(owner, method_name, self.traced(vars(owner)[method_name],
+                                                           f"{class_name}.{method_name}", module_name))
+        from async_ui import AsyncUI
+        display = AsyncUI.display
+        self.patch(AsyncUI, "display", lambda ui: TracedLock(self, display(ui)))
+
+    def patch(self, owner, name: str, replacement):
+        self.originals.append((owner, name, vars(owner)[name]))
+        setattr(owner, name, replacement)
+
+    def uninstall(self):
+        while self.originals:
+            owner, name, original = self.originals.pop()
+            setattr(owner, name, original)
+
+    def traced(self, function, name: str, category: str):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            return await Span(self, name, category, function(*args, **kwargs))
+        return wrapper
+
+    def track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return 0
+        track = self.tracks.get(task)
+        if track is None:
+            self.track_count += 1
+            track = self.tracks[task] = self.track_count
+            self.events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": track,
+                                "args": {"name": task.get_name()}})
+        return track
+
+    def add_span(self, name: str, category: str, started_ns: int, duration_ns: int, args: dict):
+        self.events.append({"name": name, "cat": category, "ph": "X", "pid": 1, "tid": self.track(),
+                            "ts": (started_ns - self.origin) / 1e3, "dur": duration_ns / 1e3,
+                            "args": args})
+
+    def spans(self) -> List[dict]:
+        return [event for event in self.events if event["ph"] == "X"]
+
+    def trace_events(self) -> dict:
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.trace_events(), handle)
+
+    def breakdown(self, parent: str) -> Dict[str, float]:
+        """Microseconds spent inside ``parent`` spans, split by their direct child spans.
+
+        Time not covered by any child is reported as ``"self"``.
+        """
+        totals = defaultdict(float)
+        by_track = defaultdict(list)
+        for span in self.spans():
+            by_track[span["tid"]].append(span)
+        for spans in by_track.values():
+            # Parents sort before the children they contain.
+            spans.sort(key=lambda span: (span["ts"], -span["dur"]))
+            stack = []
+            for span in spans:
+                while stack and span["ts"] >= stack[-1]["ts"] + stack[-1]["dur"]:
+                    stack.pop()
+                if stack and stack[-1]["name"] == parent:
+                    totals[span["name"]] += span["dur"]
+                stack.append(span)
+        total = sum(span["dur"] for span in self.spans() if span["name"] == parent)
+        totals["self"] = total - sum(totals.values())
+        return dict(totals)
+
+async def trace_game(tracer: Tracer, battles: int = 3, seed: int = 0, scale: float = 0.0) -> dict:
+    from final_pokemon_game import CompletePokemonGame
+    from load_driver import BotInput, LoadStats, NullOutput
+    from pacing import ScaledClock, VirtualClock
+
+    clock = ScaledClock(scale) if scale else VirtualClock()
+    stats = LoadStats()
+    with tracer:
+        game = CompletePokemonGame(clock=clock, seed=seed, output=NullOutput())
+        game.ui.attach_input(BotInput(game.ui, game.rng, battles, stats))
+        await game.start_game()
+    return {"battles": stats.battles, "turns": stats.turns, "spans": len(tracer.spans())}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trace a headless game as Chrome trace-event JSON")
+    parser.add_argument("--battles", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=0.0,
+                        help="play pauses at this fraction of real time (default: virtual clock)")
+    parser.add_argument("--output", default="battle.trace.json")
+    parser.add_argument("--breakdown", default="CompletePokemonGame.execute_regular_move",
+                        help="span whose time to split by child span")
+    args = parser.parse_args(argv)
+
+    tracer = Tracer()
+    result = asyncio.run(trace_game(tracer, args.battles, args.seed, args.scale))
+    tracer.save(args.output)
+    print(f"🔍 {result['battles']} battles, {result['turns']} turns, {result['spans']:,} spans "
+          f"written to {args.output}")
+    breakdown = tracer.breakdown(args.breakdown)
+    total = sum(breakdown.values())
+    if total:
+        print(f"⏱️  {args.breakdown}: {total / 1e3:.2f} ms")
+        for name, duration in sorted(breakdown.items(), key=lambda item: -item[1]):
+            print(f"   {name:<40} {duration / 1e3:8.2f} ms {duration / total:6.1%}")
+
+if __name__ == "__main__":
+    main()
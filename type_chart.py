@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from array import array
+from typing import Tuple
+
+from moves import MOVES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TYPE_CHART_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "type_chart.json")
+# The typing of anything without a known type: no STAB, and every move hits it neutrally.
+NEUTRAL = 0
+
+class TypeChart:
+    """Type effectiveness and STAB for every typing pair, as one flat matrix.
+
+    Types are interned as move type ids (``types``) and Pokemon typings,
+    single or dual, as typing ids (``typings``; 0 is ``NEUTRAL``). Entry
+    ``(attacker * size + defender) * move_type_count + move_type`` of
+    ``multipliers`` is the whole damage multiplier for that hit: STAB times
+    the move's effectiveness against each of the defender's types.
+    ``move_types`` maps move ids to move type ids, so a hit costs two index
+    operations and no dict lookups. A dual typing the chart hasn't seen yet
+    is added, and the matrix rebuilt, the first time ``typing`` is asked
+    for it; unknown type names are ``NEUTRAL``. A rebuild publishes the new
+    ``(size, multipliers)`` pair as one ``matrix`` attribute, so readers in
+    other threads see the old matrix or the new one, never half of each.
+    """
+
+    __slots__ = ("types", "type_ids", "effectiveness", "stab", "digest", "typings", "typing_ids",
+                 "move_type_count", "move_types", "matrix", "_members", "_array", "_lock")
+
+    def __init__(self, types: Tuple[str, ...], typings: Tuple[Tuple[int, ...], ...],
+                 effectiveness: Tuple[Tuple[float, ...], ...], stab: float, move_types: Tuple[int, ...]):
+        self.types = types
+        self.type_ids = {name: index for index, name in enumerate(types)}
+        self.effectiveness = effectiveness
+        self.stab = stab
+        # Identifies the chart's rules, whichever typings have been interned so far.
+        self.digest = hashlib.sha256(json.dumps([types, effectiveness, stab]).encode("utf-8")).hexdigest()
+        self.move_type_count = len(types)
+        self.move_types = move_types
+        self.typings = ()
+        self.typing_ids = {}
+        self._members = []
+        self._lock = threading.Lock()
+        self._array = None
+        for typing in typings:
+            self._add_typing(typing)
+        self._build()
+
+    def _add_typing(self, typing: Tuple[int, ...]) -> int:
+        typing_id = len(self._members)
+        self._members.append(typing)
+        self.typings += ("/".join(self.types[index] for index in typing),)
+        for order in {typing, typing[::-1]}:
+            self.typing_ids["/".join(self.types[index] for index in order)] = typing_id
+        return typing_id
+
+    @property
+    def size(self) -> int:
+        return self.matrix[0]
+
+    @property
+    def multipliers(self) -> array:
+        return self.matrix[1]
+
+    def _build(self):
+        typings, effectiveness, stab = tuple(self._members), self.effectiveness, self.stab
+        size = len(typings)
+
+        # How hard each move type hits each typing, before STAB.
+        against = [[1.0] * size for _ in self.types]
+        for move_type in range(self.move_type_count):
+            for typing_id, typing in enumerate(typings):
+                for defending in typing:
+                    against[move_type][typing_id] *= effectiveness[move_type][defending]
+
+        multipliers = array("d", (
+            (stab if move_type in attacker else 1.0) * against[move_type][defender]
+            for attacker in typings for defender in range(size) for move_type in range(self.move_type_count)))
+        self.matrix = (size, multipliers)
+
+    def typing(self, name) -> int:
+        """The typing id of ``"Water"`` or ``"Water/Flying"``; ``None``, ``""`` or an unknown type is ``NEUTRAL``.
+
+        Unknown parts of a dual typing are ignored, so ``"Water/Cosmic"`` hits
+        and is hit like ``"Water"``.
+        """
+        if not name:
+            return NEUTRAL
+        typing_id = self.typing_ids.get(name)
+        if typing_id is not None:
+            return typing_id
+
+        parts = []
+        for part in name.split("/"):
+            type_id = self.type_ids.get(part.strip())
+            if type_id is not None and type_id not in parts:
+                parts.append(type_id)
+        typing = tuple(parts)
+        with self._lock:
+            typing_id = self.typing_ids.get("/".join(self.types[index] for index in typing)) if typing else NEUTRAL
+            if typing_id is None:
+                typing_id = self._add_typing(typing)
+                self._build()
+            self.typing_ids[name] = typing_id
+        return typing_id
+
+    def multiplier(self, attacker_typing: int, defender_typing: int, move_type: int) -> float:
+        size, multipliers = self.matrix
+        return multipliers[(attacker_typing * size + defender_typing) * self.move_type_count + move_type]
+
+    def move_multiplier(self, attacker, defender, move_id) -> float:
+        """The multiplier for ``attacker`` hitting ``defender`` with move ``move_id``; 1.0 for unknown moves."""
+        if move_id is None:
+            return 1.0
+        size, multipliers = self.matrix
+        return multipliers[(getattr(attacker, 'typing', NEUTRAL) * size
+                            + getattr(defender, 'typing', NEUTRAL)) * self.move_type_count
+                           + self.move_types[move_id]]
+
+    def array(self) -> "np.ndarray":
+        """The multipliers as a read-only ``(attacker, defender, move type)`` NumPy view."""
+        if np is None:
+            raise RuntimeError("TypeChart.array needs numpy installed")
+        matrix = self.matrix
+        cached = self._array
+        if cached is None or cached[0] is not matrix:
+            size, multipliers = matrix
+            table = np.frombuffer(multipliers, dtype=np.float64).reshape(size, size, self.move_type_count)
+            table.flags.writeable = False
+            cached = self._array = (matrix, table)
+        return cached[1]
+
+def scale_damage(damage: int, multiplier: float) -> int:
+    # A landed hit always deals some damage, so immunities can't stall a battle.
+    return max(1, int(damage * multiplier))
+
+def build_chart(data: dict) -> TypeChart:
+    types = tuple(data["types"])
+    type_ids = {name: index for index, name in enumerate(types)}
+
+    def type_id(name: str) -> int:
+        if name not in type_ids:
+            raise ValueError(f"unknown type {name!r} in type chart")
+        return type_ids[name]
+
+    multipliers = data["multipliers"]
+    effectiveness = [[1.0] * len(types) for _ in types]
+    for attacking, matchups in data["types"].items():
+        for kind, defenders in matchups.items():
+            if kind not in multipliers:
+                raise ValueError(f"unknown matchup {kind!r} for {attacking}")
+            for defending in defenders:
+                effectiveness[type_ids[attacking]][type_id(defending)] = multipliers[kind]
+
+    typings = [()] + [(index,) for index in range(len(types))]
+    for dual in data.get("dual_types", ()):
+        parts = tuple(type_id(name) for name in dual.split("/"))
+        if len(parts) != 2 or parts[0] == parts[1]:
+            raise ValueError(f"dual type {dual!r} must name two different types")
+        typings.append(parts)
+
+    move_types = tuple(type_id(move.move_type) for move in MOVES)
+    return TypeChart(types, tuple(typings), tuple(map(tuple, effectiveness)), data["stab"], move_types)
+
+def load_chart(path: str = TYPE_CHART_PATH) -> TypeChart:
+    with open(path, encoding="utf-8") as handle:
+        return build_chart(json.load(handle))
+
+TYPE_CHART = load_chart()
+
+def benchmark_type_chart(hits: int = 200_000, seed: int = 11) -> dict:
+    """Per-hit multiplier lookups from nested dicts versus the flat matrix."""
+    with open(TYPE_CHART_PATH, encoding="utf-8") as handle:
+        data = json.load(handle)
+    chart_dict = {attacking: {defending: data["multipliers"][kind]
+                              for kind, defenders in matchups.items() for defending in defenders}
+                  for attacking, matchups in data["types"].items()}
+    rng = random.Random(seed)
+    singles = TYPE_CHART.types
+    move_names = [move.name for move in MOVES]
+    samples = [(rng.choice(singles), rng.choice(singles), rng.choice(move_names)) for _ in range(1_000)]
+
+    start = time.perf_counter()
+    for index in range(hits):
+        attacking, defending, move_name = samples[index % 1_000]
+        move_type = MOVES[move_name].move_type
+        stab = data["stab"] if move_type == attacking else 1.0
+        stab * chart_dict[move_type].get(defending, 1.0)
+    dict_time = (time.perf_counter() - start) / hits
+
+    chart = TYPE_CHART
+    interned = [(chart.typing(attacking), chart.typing(defending), MOVES.ids[move_name])
+                for attacking, defending, move_name in samples]
+    (size, multipliers), count, move_types = chart.matrix, chart.move_type_count, chart.move_types
+    start = time.perf_counter()
+    for index in range(hits):
+        attacker, defender, move_id = interned[index % 1_000]
+        multipliers[(attacker * size + defender) * count + move_types[move_id]]
+    matrix_time = (time.perf_counter() - start) / hits
+
+    results = {"dict_ns": dict_time * 1e9, "matrix_ns": matrix_time * 1e9}
+    if np is not None:
+        generator = np.random.default_rng(seed)
+        attackers = generator.integers(0, chart.size, hits)
+        defenders = generator.integers(0, chart.size, hits)
+        moves = generator.integers(0, count, hits)
+        table = chart.array()
+        start = time.perf_counter()
+        table[attackers, defenders, moves]
+        results["numpy_ns"] = (time.perf_counter() - start) / hits * 1e9
+    return results
+
+def test_type_chart():
+    chart = TYPE_CHART
+    for attacking, move, defending in (("Electric", "Thunder Shock", "Water"), ("Fire", "Ember", "Water"),
+                                       ("Normal", "Tackle", "Ghost"), ("Water", "Blizzard", "Water/Flying"),
+                                       ("Grass", "Razor Leaf", "Rock/Ground")):
+        if move not in MOVES.ids:
+            continue
+        value = chart.multiplier(chart.typing(attacking), chart.typing(defending), chart.move_types[MOVES.ids[move]])
+        print(f"🔢 {attacking:>8} {move:<13} → {defending:<12} x{value:g}")
+
+    results = benchmark_type_chart()
+    print(f"🐢 nested dicts: {results['dict_ns']:6.1f} ns/hit")
+    print(f"🚀 flat matrix:  {results['matrix_ns']:6.1f} ns/hit")
+    if "numpy_ns" in results:
+        print(f"🧮 numpy gather: {results['numpy_ns']:6.1f} ns/hit")
+
+if __name__ == "__main__":
+    print("🧪 Testing Type Chart")
+    test_type_chart()
@@ -0,0 +1,248 @@
+import bisect
+import functools
+import itertools
+import math
+import sys
+import time
+from typing import NamedTuple, Tuple
+
+from battle_rules import (CRITICAL_CHANCE, CRITICAL_MULTIPLIER, DAMAGE_ROLL_HIGH, DAMAGE_ROLL_LOW,
+                          DEFAULT_MOVES, MOVE_STATUS_CHANCE, MOVE_STATUS_EFFECTS, MOVE_STATUS_TURNS,
+                          PARALYSIS_SKIP_CHANCE, BattleState, move_effect, status_store, step,
+                          turn_order)
+from moves import MOVES
+from status_effects import StatusType
+from type_chart import TYPE_CHART, scale_damage
+
+# Only these conditions change the outcome of a step() battle; sleep and the
+# rest are tracked by the engine but never consulted.
+TRACKED_STATUSES = (StatusType.POISON, StatusType.BURN, StatusType.PARALYSIS)
+POISON, BURN, PARALYSIS = range(len(TRACKED_STATUSES))
+NO_STATUS = -1
+
+class MatchupOdds(NamedTuple):
+    win_probability: float
+    loss_probability: float
+    expected_turns: float
+
+class AttackBranch(NamedTuple):
+    """The damage a landed attack can deal, given which status it inflicts.
+
+    ``damages`` is ascending and ``chances`` already include the chance of
+    the status; ``at_least[k]`` is the chance of dealing ``damages[k]`` or more.
+    """
+    slot: int
+    damages: Tuple[int, ...]
+    chances: Tuple[float, ...]
+    at_least: Tuple[float, ...]
+
+def make_branch(slot: int, damage: dict, status_chance: float = 1.0) -> AttackBranch:
+    damages = tuple(sorted(damage))
+    chances = tuple(damage[amount] * status_chance for amount in damages)
+    at_least = tuple(itertools.accumulate(reversed(chances), initial=0.0))[::-1]
+    return AttackBranch(slot, damages, chances, at_least)
+
+# A paralysed Pokemon that cannot move is an attack that deals no damage.
+MISSED_TURN = make_branch(NO_STATUS, {0: 1.0})
+
+def attack_branches(attacker, defender) -> Tuple[AttackBranch, ...]:
+    low = int(attacker.attack * DAMAGE_ROLL_LOW)
+    high = int(attacker.attack * DAMAGE_ROLL_HIGH)
+    rolls = high - low + 1
+
+    # Each move is picked uniformly and scales the roll by its own type multiplier.
+    moves = getattr(attacker, 'moves', DEFAULT_MOVES)
+    statuses = {NO_STATUS: {}}
+    for move in moves:
+        multiplier = TYPE_CHART.move_multiplier(attacker, defender, MOVES.ids.get(move))
+        status_type = move_effect(MOVE_STATUS_EFFECTS, move)
+        if status_type in TRACKED_STATUSES:
+            outcomes = ((NO_STATUS, 1.0 - MOVE_STATUS_CHANCE),
+                        (TRACKED_STATUSES.index(status_type), MOVE_STATUS_CHANCE))
+        else:
+            outcomes = ((NO_STATUS, 1.0),)
+        for slot, status_chance in outcomes:
+            damage = statuses.setdefault(slot, {})
+            chance = status_chance / len(moves) / rolls
+            for roll in range(low, high + 1):
+                hit = scale_damage(roll, multiplier)
+                damage[hit] = damage.get(hit, 0.0) + chance * (1 - CRITICAL_CHANCE)
+                critical = int(hit * CRITICAL_MULTIPLIER)
+                damage[critical] = damage.get(critical, 0.0) + chance * CRITICAL_CHANCE
+
+    return tuple(make_branch(slot, damage) for slot, damage in statuses.items() if damage)
+
+def tracked_status(pokemon) -> Tuple[int, ...]:
+    store = status_store(pokemon)
+    return tuple(max(0, store.turns_remaining(status_type)) for status_type in TRACKED_STATUSES)
+
+class MatchupSolver:
+    """Exact outcome of a step() battle between two Pokemon, as a Markov chain.
+
+    A state is both HP values plus the turns left on each side's poison, burn
+    and paralysis. Every state reached from the start is solved once and kept
+    in an LRU cache, split at the two attacks of a turn so each state only
+    expands one attacker's outcomes; damage rolls that knock the defender out
+    are summed in one step instead of being expanded. HP only goes down and
+    statuses only run out unless a hit lands, and every landed hit deals at
+    least 1 damage, so the chain has no cycles.
+    """
+
+    def __init__(self, pokemon1, pokemon2, cache_size: int = None):
+        self.pokemon = (pokemon1, pokemon2)
+        self.first, self.second = turn_order(pokemon1, pokemon2)
+        self.tick_damage = (pokemon1.max_hp // 16, pokemon2.max_hp // 16)
+        branches = (attack_branches(pokemon1, pokemon2), attack_branches(pokemon2, pokemon1))
+        self.min_damage = tuple(min(branch.damages[0] for branch in side) for side in branches)
+        self.attacks = tuple(tuple((1.0, branch) for branch in side) for side in branches)
+        self.paralyzed_attacks = tuple(
+            ((PARALYSIS_SKIP_CHANCE, MISSED_TURN),) +
+            tuple((1.0 - PARALYSIS_SKIP_CHANCE, branch) for branch in side)
+            for side in branches)
+
+        self.turn_start = functools.lru_cache(maxsize=cache_size)(self._turn_start)
+        self.second_attack = functools.lru_cache(maxsize=cache_size)(self._second_attack)
+
+    def solve(self) -> MatchupOdds:
+        pokemon1, pokemon2 = self.pokemon
+        hp = (pokemon1.current_hp, pokemon2.current_hp)
+        if hp[0] <= 0 or hp[1] <= 0:
+            return MatchupOdds(float(hp[0] > 0), float(hp[0] <= 0), 0.0)
+
+        min_damage = self.min_damage
+        longest = math.ceil(hp[0] / min_damage[1]) + math.ceil(hp[1] / min_damage[0])
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 4 * (longest + 2 * MOVE_STATUS_TURNS) + 200))
+        try:
+            win, turns = self.turn_start(hp[0], hp[1], tracked_status(pokemon1), tracked_status(pokemon2))
+        finally:
+            sys.setrecursionlimit(limit)
+        return MatchupOdds(win, 1.0 - win, turns)
+
+    def cache_info(self):
+        return self.turn_start.cache_info(), self.second_attack.cache_info()
+
+    def attacks_of(self, side: int, status: tuple):
+        return self.paralyzed_attacks[side] if status[PARALYSIS] else self.attacks[side]
+
+    def tick(self, side: int, status: tuple) -> int:
+        return ((status[POISON] > 0) + (status[BURN] > 0)) * self.tick_damage[side]
+
+    def _turn_start(self, hp0: int, hp1: int, status0: tuple, status1: tuple) -> Tuple[float, float]:
+        first = self.first
+        if first == 0:
+            attacker_status, defender_hp, defender_status = status0, hp1, status1
+        else:
+            attacker_status, defender_hp, defender_status = status1, hp0, status0
+
+        win = turns = 0.0
+        for weight, branch in self.attacks_of(first, attacker_status):
+            status = inflict(defender_status, branch.slot)
+            knockouts = bisect.bisect_left(branch.damages, defender_hp)
+            knockout = weight * branch.at_least[knockouts]
+            turns += knockout
+            if first == 0:
+                win += knockout
+
+            for damage, chance in zip(branch.damages[:knockouts], branch.chances):
+                if first == 0:
+                    branch_win, branch_turns = self.second_attack(hp0, defender_hp - damage, status0, status)
+                else:
+                    branch_win, branch_turns = self.second_attack(defender_hp - damage, hp1, status, status1)
+                win += weight * chance * branch_win
+                turns += weight * chance * branch_turns
+
+        return win, turns
+
+    def _second_attack(self, hp0: int, hp1: int, status0: tuple, status1: tuple) -> Tuple[float, float]:
+        first, second = self.first, self.second
+        if first == 0:
+            defender_hp, defender_status, attacker_hp, attacker_status = hp0, status0, hp1, status1
+        else:
+            defender_hp, defender_status, attacker_hp, attacker_status = hp1, status1, hp0, status0
+
+        # Both sides take their poison and burn damage after the second attack.
+        attacker_hp -= self.tick(second, attacker_status)
+        attacker_aged = age(attacker_status)
+
+        win = turns = 0.0
+        for weight, branch in self.attacks_of(second, attacker_status):
+            status = inflict(defender_status, branch.slot)
+            remaining = defender_hp - self.tick(first, status)
+            knockouts = bisect.bisect_left(branch.damages, remaining)
+            knockout = weight * branch.at_least[knockouts]
+            turns += knockout
+            if first == 1 and attacker_hp > 0:
+                win += knockout
+
+            if attacker_hp <= 0:
+                survived = weight * (branch.at_least[0] - branch.at_least[knockouts])
+                turns += survived
+                if first == 0:
+                    win += survived
+                continue
+
+            aged = age(status)
+            for damage, chance in zip(branch.damages[:knockouts], branch.chances):
+                if first == 0:
+                    branch_win, branch_turns = self.turn_start(remaining - damage, attacker_hp, aged, attacker_aged)
+                else:
+                    branch_win, branch_turns = self.turn_start(attacker_hp, remaining - damage, attacker_aged, aged)
+                win += weight * chance * branch_win
+                turns += weight * chance * (1.0 + branch_turns)
+
+        return win, turns
+
+def inflict(status: tuple, slot: int) -> tuple:
+    if slot == NO_STATUS or status[slot] >= MOVE_STATUS_TURNS:
+        return status
+    return status[:slot] + (MOVE_STATUS_TURNS,) + status[slot + 1:]
+
+def age(status: tuple) -> tuple:
+    if not any(status):
+        return status
+    return tuple(turns - 1 if turns > 0 else 0 for turns in status)
+
+def win_probability(pokemon1, pokemon2) -> MatchupOdds:
+    return MatchupSolver(pokemon1, pokemon2).solve()
+
+def monte_carlo(spec1, spec2, battles: int, seed: int = 0) -> MatchupOdds:
+    from pokemon import Pokemon
+    from rng_streams import BattleRNG
+
+    rng = BattleRNG(seed, 0, prefetch=1024)
+    wins = turns = 0
+    for _ in range(battles):
+        state = BattleState(Pokemon(*spec1), Pokemon(*spec2))
+        while not state.finished:
+            step(state, None, rng)
+            turns += 1
+        wins += state.winner == 0
+    return MatchupOdds(wins / battles, 1 - wins / battles, turns / battles)
+
+def test_win_probability():
+    from pokemon import Pokemon
+
+    matchups = [
+        (("Pikachu", "Electric", 100, 55, 40, 90), ("Geodude", "Rock", 90, 60, 70, 20)),
+        (("Charmander", "Fire", 95, 52, 43, 65), ("Squirtle", "Water", 98, 48, 55, 43)),
+        (("Magikarp", "Water", 60, 10, 55, 80), ("Gyarados", "Water", 150, 90, 79, 81)),
+        (("Caterpie", "Bug", 75, 30, 35, 45), ("Pidgy", "Flying", 85, 50, 40, 56)),
+    ]
+    for spec1, spec2 in matchups:
+        start = time.perf_counter()
+        exact = win_probability(Pokemon(*spec1), Pokemon(*spec2))
+        exact_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        sampled = monte_carlo(spec1, spec2, 20_000)
+        sampled_ms = (time.perf_counter() - start) * 1000
+
+        print(f"🎯 {spec1[0]:>10} vs {spec2[0]:<8} exact {exact.win_probability:.4f} "
+              f"({exact.expected_turns:.3f} turns, {exact_ms:6.1f} ms) | "
+              f"20k Monte Carlo {sampled.win_probability:.4f} ({sampled.expected_turns:.3f} turns, "
+              f"{sampled_ms:6.0f} ms)")
+
+if __name__ == "__main__":
+    print("🧪 Testing Exact Win Probability")
+    test_win_probability()